@@ -0,0 +1,115 @@
+"""
+    bench_decoder.py -- Micro-benchmark of the Decoder used by the readers.
+    Decode large sets of bindings, as make_person and make_position
+    see them, with the Decoder and with a chain of comparisons, one per
+    field, as the readers did before.  Report the time per triple of each
+
+        python bench_decoder.py [sizes]
+
+    sizes are the numbers of bindings, separated by commas.  The default is
+    1000,100000,1000000
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import PERSON_DECODER
+from vivopeople import POSITION_DECODER
+from vivopeople import POSITION_TYPES
+from datetime import datetime
+import random
+import sys
+import time
+
+OTHER_PREDICATES = [
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#type",
+    "http://vitro.mannlib.cornell.edu/ns/vitro/0.7#mostSpecificType",
+    "http://vivoweb.org/ontology/core#relatedBy",
+    "http://vivo.ufl.edu/ontology/vivo-ufl/dateHarvested"
+    ]
+
+def make_bindings(decoder, size):
+    """
+    Return size bindings, half with the predicates of decoder and half
+    with other predicates
+    """
+    random.seed(size)
+    predicates = sorted(decoder.predicates) + OTHER_PREDICATES
+    objects = sorted(decoder.objects) + \
+        ["http://vivo.ufl.edu/individual/n" + str(k) for k in range(20)]
+    bindings = []
+    for k in range(size):
+        p = random.choice(predicates)
+        o = random.choice(objects)
+        bindings.append({'p': {'type': 'uri', 'value': unicode(p)},
+                         'o': {'type': 'uri', 'value': unicode(o)}})
+    return {'results': {'bindings': bindings}}
+
+def chain_decode(decoder, triples):
+    """
+    Decode triples the way the readers did before the Decoder:  for each
+    triple, compare its predicate with each field in turn, then its
+    object with each object in turn
+    """
+    schema = []
+    for predicate in decoder.predicates:
+        for (field, rule) in decoder.predicates[predicate]:
+            schema.append((predicate, field, rule))
+    objects = list(decoder.objects.items())
+    record = {}
+    for field in decoder.lists:
+        record[field] = []
+    count = len(triples["results"]["bindings"])
+    i = 0
+    while i < count:
+        b = triples["results"]["bindings"][i]
+        p = b['p']['value']
+        o = b['o']['value']
+        for (predicate, field, rule) in schema:
+            if p == predicate:
+                if rule == 'single':
+                    record[field] = o
+                else:
+                    record[field].append(o)
+        for (value, field) in objects:
+            if o == value:
+                record[field] = o
+        i = i + 1
+    return record
+
+def best_of(function, repeat):
+    best = None
+    for k in range(repeat):
+        start = time.time()
+        function()
+        seconds = time.time() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best
+
+sizes = [1000, 100000, 1000000]
+if len(sys.argv) > 1:
+    sizes = [int(size) for size in sys.argv[1].split(',')]
+
+print datetime.now(), "Start"
+print len(POSITION_TYPES), "position types"
+print "\n", "decoder".ljust(10), "bindings".rjust(9), "chain ns".rjust(10), \
+    "decoder ns".rjust(11), "speedup".rjust(8), "  same"
+for (name, decoder) in [('person', PERSON_DECODER),
+                        ('position', POSITION_DECODER)]:
+    for size in sizes:
+        triples = make_bindings(decoder, size)
+        repeat = max(1, 100000 / size)
+        chain = best_of(lambda: chain_decode(decoder, triples), repeat)
+        table = best_of(lambda: decoder.decode(triples), repeat)
+        same = chain_decode(decoder, triples) == decoder.decode(triples)
+        print name.ljust(10), str(size).rjust(9), \
+            str(round(chain * 1e9 / size, 1)).rjust(10), \
+            str(round(table * 1e9 / size, 1)).rjust(11), \
+            str(round(chain / table, 2)).rjust(8), " ", same
+print datetime.now(), "Finish"
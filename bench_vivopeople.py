@@ -0,0 +1,190 @@
+"""
+    bench_vivopeople.py -- Benchmark the readers and writers of vivopeople:
+    get_person, get_position, update_person, add_person and
+    make_ufid_dictionary, at 1, 1,000 and 50,000 people.  For each, report
+    wall time, the number of queries and the peak memory used.
+
+    Record the queries of a run against VIVO once, then benchmark offline,
+    as often as needed, by replaying the recording:
+
+        python bench_vivopeople.py record bench_vivopeople.jsonl
+        python bench_vivopeople.py replay bench_vivopeople.jsonl
+
+    Optional arguments follow the recording:  the sizes, separated by
+    commas, and for replay the latency to add to each query, in seconds.
+    A replay stops at the first query that was not recorded.  New uris come
+    from a URIAllocator seeded the same way for every run, so that replays
+    ask for the same uris as the recording.  Results are written next to
+    the recording, to bench_vivopeople.json for bench_vivopeople.jsonl.  If
+    the file is there from an earlier run, the change in wall time and
+    queries is shown
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import RecordingTransport
+from vivopeople import ReplayTransport
+from vivopeople import URIAllocator
+from vivopeople import get_person
+from vivopeople import get_position_uris
+from vivopeople import get_position
+from vivopeople import update_person
+from vivopeople import add_person
+from vivopeople import make_ufid_dictionary
+from multiprocessing import Process
+from multiprocessing import Queue
+from datetime import datetime
+import json
+import os
+import random
+import resource
+import sys
+import time
+import traceback
+
+def source_person(k, homedept_uri='http://vivo.ufl.edu/individual/n8763427'):
+    """
+    Return the kth source person for add_person and update_person
+    """
+    return {'person_type': 'http://vivoweb.org/ontology/core#FacultyMember',
+            'hr_position': True,
+            'ufid': str(90000000 + k),
+            'display_name': 'Alligator, Albert ' + str(k),
+            'gatorlink': 'albert' + str(k),
+            'homedept_uri': homedept_uri,
+            'last_name': 'Alligator',
+            'first_name': 'Albert',
+            'family_name': 'Alligator',
+            'given_name': 'Albert',
+            'primary_email': 'albert' + str(k) + '@ufl.edu',
+            'phone': '(352) 392-1234',
+            'start_date': datetime(2014, 1, 1),
+            'end_date': None,
+            'position_label': 'Mascot',
+            'position_type':
+            'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+            'position_orguri': homedept_uri
+            }
+
+def bench_get_person(person_uris):
+    for person_uri in person_uris:
+        get_person(person_uri)
+
+def bench_get_position(person_uris):
+    for person_uri in person_uris:
+        for position_uri in get_position_uris(person_uri):
+            get_position(position_uri)
+
+def bench_update_person(person_uris):
+    for k, person_uri in enumerate(person_uris):
+        person = get_person(person_uri)
+        update_person(person, source_person(k, person.get('homedept_uri',
+            'http://vivo.ufl.edu/individual/n8763427')))
+
+def bench_add_person(person_uris):
+    for k in range(len(person_uris)):
+        add_person(source_person(k))
+
+def bench_make_ufid_dictionary(person_uris):
+    make_ufid_dictionary()
+
+def run(name, function, person_uris, transport, queue):
+    """
+    Run one benchmark in its own process, so its peak memory is its own,
+    and put the results, or the error, on the queue.  When recording, the
+    process opens the recording itself, so that it does not record again
+    the queries recorded by the processes before it
+    """
+    try:
+        if mode == 'record':
+            transport = RecordingTransport(recording)
+        allocator = URIAllocator()
+        allocator.random.seed(name + str(len(person_uris)))
+        start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start_requests = transport.requests
+        start = time.time()
+        with transport, allocator:
+            function(person_uris)
+        seconds = time.time() - start
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if mode == 'record':
+            transport.close()
+        queue.put({'benchmark': name, 'people': len(person_uris),
+                   'seconds': round(seconds, 3),
+                   'queries': transport.requests - start_requests,
+                   'peak_mb': round((peak_memory - start_memory) / 1024.0,
+                                    1)})
+    except Exception:
+        queue.put({'benchmark': name, 'people': len(person_uris),
+                   'error': traceback.format_exc()})
+
+benchmarks = [
+    ('get_person', bench_get_person),
+    ('get_position', bench_get_position),
+    ('update_person', bench_update_person),
+    ('add_person', bench_add_person)
+    ]
+
+mode = sys.argv[1]
+recording = sys.argv[2]
+sizes = [1, 1000, 50000]
+if len(sys.argv) > 3:
+    sizes = [int(size) for size in sys.argv[3].split(',')]
+latency = 0.0
+if len(sys.argv) > 4:
+    latency = float(sys.argv[4])
+results_file = os.path.splitext(recording)[0] + '.json'
+
+print datetime.now(), "Start", mode, recording
+if mode == 'record':
+    transport = RecordingTransport(recording)
+else:
+    transport = ReplayTransport(recording, latency=latency)
+with transport:
+    person_uris = sorted(make_ufid_dictionary().values())
+if mode == 'record':
+    transport.close()
+print datetime.now(), len(person_uris), "people"
+runs = [('make_ufid_dictionary', bench_make_ufid_dictionary, person_uris)]
+for size in sizes:
+    for (name, function) in benchmarks:
+        runs.append((name, function, person_uris[0:size]))
+results = []
+for (name, function, uris) in runs:
+    queue = Queue()
+    process = Process(target=run, args=(name, function, uris, transport,
+                                        queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if 'error' in result:
+        print datetime.now(), name, len(uris), "people failed\n", \
+            result['error']
+        sys.exit(1)
+    results.append(result)
+    print datetime.now(), json.dumps(result, sort_keys=True)
+
+previous = {}
+if os.path.exists(results_file):
+    for result in json.load(open(results_file)):
+        previous[(result['benchmark'], result['people'])] = result
+print "\n", "benchmark".ljust(22), "people".rjust(7), "seconds".rjust(9), \
+    "queries".rjust(9), "peak MB".rjust(8), "  change from last run"
+for result in results:
+    change = ""
+    before = previous.get((result['benchmark'], result['people']), None)
+    if before is not None and before['seconds'] > 0:
+        change = "time x" + str(round(result['seconds'] / before['seconds'],
+                                      2)) + \
+            ", queries " + str(result['queries'] - before['queries'])
+    print result['benchmark'].ljust(22), str(result['people']).rjust(7), \
+        str(result['seconds']).rjust(9), str(result['queries']).rjust(9), \
+        str(result['peak_mb']).rjust(8), " ", change
+json.dump(results, open(results_file, 'w'), indent=4)
+print datetime.now(), "Finish"
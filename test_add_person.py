@@ -0,0 +1,50 @@
+"""
+    test_add_person.py -- given a person structure, generate the RDF to add
+    the person, the person's vcard and the person's position to VIVO.
+    Generate the RDF as a string, into an RDFBuffer and into an RDFFile
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import add_person
+from vivopeople import RDFBuffer
+from vivopeople import RDFFile
+from datetime import datetime
+
+print datetime.now(), "Start"
+person = {'person_type': 'http://vivoweb.org/ontology/core#FacultyMember',
+          'ufid': '99999999',
+          'display_name': 'Alligator, Albert',
+          'gatorlink': 'albert',
+          'homedept_uri': 'http://vivo.ufl.edu/individual/n8763427',
+          'last_name': 'Alligator',
+          'first_name': 'Albert',
+          'primary_email': 'albert@ufl.edu',
+          'phone': '(352) 392-1234',
+          'fax': '(352) 392-4321',
+          'preferred_title': 'Mascot',
+          'start_date': datetime(2014, 1, 1),
+          'position_label': 'Mascot',
+          'position_type': 'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+          'position_orguri': 'http://vivo.ufl.edu/individual/n8763427'
+          }
+
+[add, person_uri] = add_person(person)
+print "\nCase 1. RDF as a string for", person_uri, "\n", add
+
+ardf = RDFBuffer()
+[ardf, person_uri] = add_person(person, ardf)
+[ardf, person_uri] = add_person(person, ardf)
+print "\nCase 2. RDF for two people in one buffer\n", ardf.getvalue()
+
+with RDFFile('test_add_person.rdf') as ardf:
+    for k in range(10):
+        add_person(person, ardf)
+print "\nCase 3. RDF for ten people written to test_add_person.rdf"
+print datetime.now(), "Finish"
@@ -0,0 +1,66 @@
+"""
+    test_aget.py -- Read people, vcards, positions and degrees with the
+    asynchronous readers, all requests under way at once.  Each result must
+    be the same as the one returned by the synchronous reader
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import aget_person
+from vivopeople import aget_vcard
+from vivopeople import aget_position
+from vivopeople import aget_position_uris
+from vivopeople import aget_degree
+from vivopeople import get_person
+from vivopeople import get_vcard
+from vivopeople import get_position
+from vivopeople import get_position_uris
+from vivopeople import get_degree
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+degree_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n195825",
+        "http://vivo.ufl.edu/individual/n31642"
+    ]
+people = [aget_person(person_uri) for person_uri in person_uris]
+profiles = [aget_person(person_uri, get_positions=True)
+            for person_uri in person_uris]
+position_uris = [aget_position_uris(person_uri)
+                 for person_uri in person_uris]
+degrees = [aget_degree(degree_uri) for degree_uri in degree_uris]
+print datetime.now(), "All requests under way"
+
+for person_uri, person, profile, uris in \
+        zip(person_uris, people, profiles, position_uris):
+    person = person.get(60)
+    profile = profile.get(60)
+    uris = uris.get(60)
+    print "\n", person_uri, person.get('display_name', '')
+    print "Person same as get_person", person == get_person(person_uri)
+    print "Vcard same as get_vcard", \
+        aget_vcard(person['vcard_uri']).get(60) == \
+        get_vcard(person['vcard_uri'])
+    print "Position uris same as get_position_uris", \
+        uris == get_position_uris(person_uri)
+    positions = [aget_position(position_uri) for position_uri in uris]
+    print len(uris), "positions same as get_position", \
+        [x.get(60) for x in positions] == [get_position(x) for x in uris]
+    print "Profile has", len(profile['positions']), "positions"
+for degree_uri, degree in zip(degree_uris, degrees):
+    print "\n", degree_uri, "same as get_degree", \
+        degree.get(60) == get_degree(degree_uri)
+print datetime.now(), "Finish"
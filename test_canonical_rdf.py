@@ -0,0 +1,35 @@
+"""
+    test_canonical_rdf.py -- Put ADD and SUB RDF in canonical form.  Triples
+    added twice are added once.  A triple both removed and added is in
+    neither.  The same update in any order gives the same N-Triples
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import canonical_rdf
+from vivofoundation import assert_resource_property
+from vivofoundation import assert_data_property
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uri = "http://vivo.ufl.edu/individual/n25674"
+faculty = assert_resource_property(person_uri, 'rdf:type',
+    'http://vivoweb.org/ontology/core#FacultyMember')
+label = assert_data_property(person_uri, 'rdfs:label', 'Conlon, Michael')
+old_label = assert_data_property(person_uri, 'rdfs:label', 'Conlon, Mike')
+home = assert_resource_property(person_uri, 'ufv:homeDept',
+    'http://vivo.ufl.edu/individual/n8763427')
+
+ardf = faculty + label + faculty + home
+srdf = old_label + home
+[add, sub] = canonical_rdf(ardf, srdf)
+print "\nADD\n", add, "\nSUB\n", sub
+print "Same in any order", [add, sub] == \
+    canonical_rdf(home + label + faculty, home + old_label)
+print datetime.now(), "Finish"
@@ -0,0 +1,53 @@
+"""
+    test_deref.py -- Dereference calls that dereference again.  A reader
+    run by the dereferencing pool may itself dereference in parallel.  With
+    fewer pool threads than calls, the nested calls must be made, one at a
+    time, rather than wait on the pool, and the results must be the same
+    as dereferencing one at a time
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import deref
+from vivopeople import set_parallel_deref
+from vivopeople import get_person
+from vivopeople import get_degree
+from vivopeople import get_degree_uris
+from datetime import datetime
+
+def square_all(numbers):
+    return deref([(square, (n,)) for n in numbers], parallel=True)
+
+def square(n):
+    return n * n
+
+print datetime.now(), "Start"
+set_parallel_deref(True, workers=2, connections=2)
+nested = deref([(square_all, (range(k, k + 3),)) for k in range(6)])
+print "Nested squares", nested
+print "Same as one at a time", nested == \
+    [[n * n for n in range(k, k + 3)] for k in range(6)]
+
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+degree_uris = []
+for person_uri in person_uris:
+    degree_uris = degree_uris + get_degree_uris(person_uri)
+people = deref([(get_person, (uri,)) for uri in person_uris])
+degrees = deref([(get_degree, (uri,)) for uri in degree_uris])
+print datetime.now(), "Read", len(people), "people and", len(degrees), \
+    "degrees in the pool"
+set_parallel_deref(False)
+print "Same people", people == [get_person(uri) for uri in person_uris]
+print "Same degrees", degrees == [get_degree(uri) for uri in degree_uris]
+print datetime.now(), "Finish"
@@ -0,0 +1,38 @@
+"""
+    test_dti_index.py -- Load the datetime intervals of VIVO into an index,
+    then add positions.  Positions with the start and end of an interval in
+    VIVO refer to that interval.  The first position with a new start and
+    end makes a new interval, which is reused by the next
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import DTIIndex
+from vivopeople import add_position
+from datetime import datetime
+
+print datetime.now(), "Start"
+position = {'start_date': datetime(2014, 1, 1),
+            'position_label': 'Mascot',
+            'position_type':
+            'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+            'position_orguri': 'http://vivo.ufl.edu/individual/n8763427'
+            }
+with DTIIndex() as dti_index:
+    print datetime.now(), "Read", dti_index.load(), "datetime intervals"
+    print datetime.now(), "Index has", len(dti_index), "start and end pairs"
+    print "Interval for", position['start_date'], "is", \
+        dti_index.get(position['start_date'], None)
+    [ardf, position_uri] = add_position("http://vivo.ufl.edu/individual/n3715",
+                                        position)
+    print "\nFirst position", position_uri, "\n", ardf
+    [ardf, position_uri] = add_position("http://vivo.ufl.edu/individual/n3715",
+                                        position)
+    print "\nSecond position", position_uri, "makes no interval\n", ardf
+print datetime.now(), "Finish"
@@ -0,0 +1,53 @@
+"""
+    test_fingerprint_store.py -- Update people through a fingerprint store.
+    The first run updates everyone.  Once the fingerprints are committed, a
+    second run skips everyone.  A third run with one changed person updates
+    only that person
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import update_people
+from vivopeople import FingerprintStore
+from vivopeople import source_fingerprint
+from datetime import datetime
+import os
+
+print datetime.now(), "Start"
+if os.path.exists('test_fingerprint_store.db'):
+    os.remove('test_fingerprint_store.db')
+fingerprints = FingerprintStore('test_fingerprint_store.db')
+pairs = []
+for ufid, person_uri in [("80147616", "http://vivo.ufl.edu/individual/n3715"),
+                         ("02001000", "http://vivo.ufl.edu/individual/n4452"),
+                         ("57000000", "http://vivo.ufl.edu/individual/n3428")]:
+    source_person = {'hr_position': True,
+                     'ufid': ufid,
+                     'display_name': 'Alligator, Albert',
+                     'position_label': 'Mascot',
+                     'start_date': datetime(2014, 1, 1),
+                     'end_date': None,
+                     'position_type':
+                     'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+                     'position_orguri':
+                     'http://vivo.ufl.edu/individual/n8763427',
+                     'date_harvested': datetime.now().isoformat()
+                     }
+    print ufid, source_fingerprint(source_person)
+    pairs.append((person_uri, source_person))
+
+for run in range(3):
+    if run == 2:
+        pairs[1][1]['display_name'] = 'Gator, Alberta'
+    [ardf, srdf, errors] = update_people(pairs, fingerprints=fingerprints)
+    print "\nRun", run, "ADD", len(ardf), "SUB", len(srdf), "errors", \
+        len(errors), "people updated", fingerprints.commit()
+print "\nFingerprints in store", len(fingerprints)
+fingerprints.close()
+print datetime.now(), "Finish"
@@ -0,0 +1,51 @@
+"""
+    test_get_datetime_intervals.py -- Read the datetime intervals of some
+    positions and degrees in batches, and one at a time with
+    get_datetime_interval.  Each interval must have the same keys and the
+    same values both ways
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import get_datetime_intervals
+from vivopeople import get_position_uris
+from vivopeople import get_degree_uris
+from vivofoundation import get_datetime_interval
+from vivofoundation import get_vivo_value
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+dti_uris = []
+for person_uri in person_uris:
+    for uri in get_position_uris(person_uri) + get_degree_uris(person_uri):
+        dti_uri = get_vivo_value(uri, 'vivo:dateTimeInterval')
+        if dti_uri is not None:
+            dti_uris.append(dti_uri)
+print len(dti_uris), "datetime intervals"
+
+for batch_size in [1, 2, 500]:
+    datetime_intervals = get_datetime_intervals(dti_uris, batch_size)
+    same = 0
+    for dti_uri in dti_uris:
+        batch = datetime_intervals[dti_uri]
+        single = get_datetime_interval(dti_uri)
+        if batch == single:
+            same = same + 1
+        else:
+            print "\n", dti_uri
+            print "Batch ", sorted(batch.items())
+            print "Single", sorted(single.items())
+    print "Batch size", batch_size, same, "of", len(dti_uris), "the same"
+print datetime.now(), "Finish"
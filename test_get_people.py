@@ -0,0 +1,33 @@
+"""
+    test_get_people.py -- Given a list of URIs of person entities in VIVO,
+    return a list of python structures containing attributes of the people.
+    The structures must be the same as those returned by get_person
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import get_people
+from vivopeople import get_person
+from datetime import datetime
+import json
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+people = get_people(person_uris, get_contact=False)
+print "\n", json.dumps(people, indent=4)
+people = get_people(person_uris)
+print "\n", json.dumps(people, indent=4)
+for person_uri, person in zip(person_uris, people):
+    print person_uri, "same as get_person", person == get_person(person_uri)
+print datetime.now(), "Finish"
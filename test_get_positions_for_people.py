@@ -0,0 +1,35 @@
+"""
+    test_get_positions_for_people.py -- Given a list of URIs of person
+    entities in VIVO, return a dictionary of the positions of each person.
+    The positions must be the same as those returned by get_position
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import get_positions_for_people
+from vivopeople import get_position_uris
+from vivopeople import get_position
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+positions = get_positions_for_people(person_uris)
+for person_uri in person_uris:
+    print "\n", person_uri, len(positions[person_uri]), "positions"
+    for position in positions[person_uri]:
+        print position
+    same = positions[person_uri] == \
+        [get_position(x) for x in sorted(get_position_uris(person_uri))]
+    print person_uri, "same as get_position", same
+print datetime.now(), "Finish"
@@ -0,0 +1,33 @@
+"""
+    test_get_vcard_parallel.py -- Given the URI of a vcard, return values and
+    uris associated with the vcard, dereferencing the name, title, telephones
+    and email addresses concurrently.  The result must be the same as
+    dereferencing them one at a time.
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import get_vcard
+from vivopeople import set_parallel_deref
+from datetime import datetime
+import json
+
+print datetime.now(), "Start"
+vcard = get_vcard("http://vivo.ufl.edu/individual/n6754", parallel=False)
+print datetime.now(), "One at a time"
+parallel_vcard = get_vcard("http://vivo.ufl.edu/individual/n6754",
+                           parallel=True)
+print datetime.now(), "Concurrently"
+print "\n", json.dumps(parallel_vcard, indent=4)
+print "\nSame", vcard == parallel_vcard
+
+set_parallel_deref(True, workers=4, connections=2)
+print "\nSame with two connections", \
+    vcard == get_vcard("http://vivo.ufl.edu/individual/n6754")
+print datetime.now(), "Finish"
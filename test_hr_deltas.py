@@ -0,0 +1,56 @@
+"""
+    test_hr_deltas.py -- Compare two HR extracts.  Only the people inserted,
+    changed and removed are reported, with the fields that changed.  A
+    change in date_harvested alone is not a change, nor is a UFID read as
+    a number in one extract and as a string in the other.  The people
+    inserted are then added to VIVO
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import hr_deltas
+from vivopeople import apply_hr_deltas
+from datetime import datetime
+
+def source_person(k, date_harvested):
+    return {'person_type': 'http://vivoweb.org/ontology/core#FacultyMember',
+            'hr_position': True,
+            'ufid': str(90000000 + k),
+            'display_name': 'Alligator, Albert ' + str(k),
+            'homedept_uri': 'http://vivo.ufl.edu/individual/n8763427',
+            'last_name': 'Alligator',
+            'first_name': 'Albert',
+            'start_date': datetime(2014, 1, 1),
+            'end_date': None,
+            'position_label': 'Mascot',
+            'position_type':
+            'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+            'position_orguri': 'http://vivo.ufl.edu/individual/n8763427',
+            'date_harvested': date_harvested
+            }
+
+print datetime.now(), "Start"
+yesterday = [source_person(k, '2015-01-01') for k in range(10000)]
+yesterday[3]['ufid'] = 90000003
+today = [source_person(k, '2015-01-02') for k in range(10000) if k != 5]
+today_for = dict([(person['ufid'], person) for person in today])
+today_for['90000002']['position_label'] = 'Chief Mascot'
+today_for['90000009']['end_date'] = datetime(2015, 1, 1)
+today.append(source_person(10000, '2015-01-02'))
+deltas = list(hr_deltas(iter(yesterday), iter(today), partitions=16))
+print len(deltas), "deltas from", len(yesterday), "and", len(today), \
+    "people"
+for delta in deltas:
+    print delta['action'], delta['key'], delta['fields']
+
+[ardf, srdf, removed, errors] = apply_hr_deltas(
+    [delta for delta in deltas if delta['action'] == 'insert'], {})
+print "\nADD\n", ardf
+print "Removed", len(removed), "Errors", errors
+print datetime.now(), "Finish"
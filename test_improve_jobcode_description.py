@@ -0,0 +1,512 @@
+"""
+    test_improve_jobcode_description.py -- given an HR job title, expand
+    the abbreviations in it.  The golden titles below were produced by the
+    original chain of replacements.  The rule table must reproduce them
+    exactly, one title at a time and in bulk.
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import improve_jobcode_description
+from vivopeople import improve_jobcode_descriptions
+from datetime import datetime
+
+golden = [
+    ('ASST PROF', 'Assistantt Professor'),
+    ('ASSOC PROF', 'Assistantoc Professor'),
+    ('PROF', 'Professor'),
+    ('DIST PROF', 'Distinguished Professor'),
+    ('ASST DIR-RES PROGS', 'Assistantt Director-Research Programs'),
+    ('ASST DN-ADMIN AFF', 'Assistantt Dean-Administrative Affiliate'),
+    ('CLIN ASST PROF', 'Clinical Assistantt Professor'),
+    ('ASST IN', 'Assistantt In'),
+    ('ASST SCIENTIST', 'Assistantt Scientist'),
+    ('ASO PROF', 'Associate Professor'),
+    ('ASST CHAIR', 'Assistantt Chair'),
+    ('VIS ASST PROF', 'Visiting Assistantt Professor'),
+    ('ADJ PROF', 'Adjunct Professor'),
+    ('CO ASSOC PROF', 'Courtesy Assistantoc Professor'),
+    ('CO ASST PROF', 'Courtesy Assistantt Professor'),
+    ('RES ASST PROF', 'Research Assistantt Professor'),
+    ('RSCH ASST PROF', 'Research Assistantt Professor'),
+    ('POSTDOC ASSOC', 'Postdoctoral Assistantoc'),
+    ('SR LECT', 'Senior Lect'),
+    ('LECT', 'Lect'),
+    ('ASST SR LIB', 'Assistantt Senior Lib'),
+    ('UNIV LIBRARIAN', 'University Librarian'),
+    ('CHR & PROF', 'Chair & Professor'),
+    ('PROF & CHR', 'Professor & Chair'),
+    ('SR VP-HLTH AFF', 'Senior Vice President-Healthh Affiliate'),
+    ('VP INFO TECH & CIO', 'Vice President Information Technician & Chief Information Officer'),
+    ('DIR', 'Director'),
+    ('ASSOC DIR', 'Assistantoc Director'),
+    ('ASST DIR', 'Assistantt Director'),
+    ('PROG ASST', 'Programmer Assistantt'),
+    ('OFFICE ASST', 'Office Assistantt'),
+    ('SR SECRETARY', 'Senior Secretary'),
+    ('ADMIN ASST II', 'Administrative Assistantt II'),
+    ('ADMIN ASST III', 'Administrative Assistantt III'),
+    ('ADMIN ASST IV', 'Administrative Assistantt IV'),
+    ('ADMIN SUPPORT ASST', 'Administrative Support Assistantt'),
+    ('COORD ADMIN SVCS', 'Coordinator Administrative Services'),
+    ('COORD ACA PROGS', 'Coordinator Academic Programs'),
+    ('COORD STU SVCS', 'Coordinator Studentent Services'),
+    ('COORD, FISCAL OPS', 'Coordinator, Fiscal Ops'),
+    ('BUSINESS MGR', 'Business Manager'),
+    ('FIN ANAL', 'Financial Analyst'),
+    ('FINAN ANAL II', 'Financialan Analyst II'),
+    ('SR FIN ANAL', 'Senior Financial Analyst'),
+    ('IT PROF', 'Information Technology Professor'),
+    ('IT SUPPORT SPEC', 'Information Technology Support Specialist'),
+    ('IT EXPERT', 'Information Technology Expert'),
+    ('IT MGR', 'Information Technology Manager'),
+    ('COMPUTER PROG ANAL', 'Computer Programmer Analyst'),
+    ('SR COMPUTER PROG ANAL', 'Senior Computer Programmer Analyst'),
+    ('NETWORK ANAL', 'Network Analyst'),
+    ('LAB TECH', 'Lab Technician'),
+    ('SR LAB TECH', 'Senior Lab Technician'),
+    ('ENG TECH', 'Engineer Technician'),
+    ('RADIOL TECHNOL', 'Radiology Technologist'),
+    ('CHEM II', 'Chemist II'),
+    ('SR CHEM', 'Senior Chemist'),
+    ('RES PROG COORD', 'Research Programmer Coordinator'),
+    ('RES PROG ASST', 'Research Programmer Assistantt'),
+    ('RES COORD/HLTH SCI', 'Research Coordinator/Healthh Scientist'),
+    ('CLRK TYPIST', 'Clerk Typist'),
+    ('SR CLRK', 'Senior Clerk'),
+    ('CUSTODIAL SUPV', 'Custodial Supervisor'),
+    ('GROUNDS SPV', 'Grounds Supervisor'),
+    ('MAINT MECH', 'Maint Mech'),
+    ('TELE SPEC', 'Telecommunications Specialist'),
+    ('TV PROD SPEC', 'TV Prod Specialist'),
+    ('PKY TEACHER', 'PK Yonge Teacher'),
+    ('STU ASST', 'Studentent Assistantt'),
+    ('GRD ASST', 'Graduate Assistantt'),
+    ('AST-R', 'Research Assistant'),
+    ('AST-G', 'Grading Assistant'),
+    ('AST-T', 'Teaching Assistant'),
+    ('GRAD ASST-R', 'Grad Assistantt-R'),
+    ('MSTR ADV', 'Master Advisory'),
+    ('COUNS II', 'Counselor II'),
+    ('JNT PROF', 'Joint Professor'),
+    ('EMER PROF', 'Emeritus Professor'),
+    ('EMIN SCHOLAR', 'Eminent Scholar'),
+    ('EXT AGENT II', 'Extension Agent II'),
+    ('CTY EXT DIR', 'County Extension Director'),
+    ('ENVIRON SPEC', 'Environmental Specialist'),
+    ('AGRIC ECON', 'Agricultural Econ'),
+    ('GEN COUNSEL', 'General Counsel'),
+    ('ASST GEN COUNSEL', 'Assistantt General Counsel'),
+    ('INT DIR', 'Interim Director'),
+    ('INT DN', 'Interim Dean'),
+    ('CFO', 'Chief Financial Officer'),
+    ('COO', 'Chief Operating Officer'),
+    ('ASST VP', 'Assistantt Vice President'),
+    ('ASSOC VP', 'Assistantoc Vice President'),
+    ('SR ASSOC DN', 'Senior Assistantoc Dean'),
+    ('ASSOC DN-RES', 'Assistantoc Dean-Research'),
+    ('DN', 'Dean'),
+    ('PRES', 'President'),
+    ('PRES5', 'President 5'),
+    ('PRES6', 'President 6'),
+    ('VP', 'Vice President'),
+    ('PROV', 'Provisional'),
+    ('PHAS RET', 'Phased Retirement'),
+    ('ADV, COLL', 'Advisory, Coll'),
+    ('DIR, RES PROGS/SVCS', 'Director, Research Programs/Services'),
+    ('ALUMN AFF DIR', 'Alumni Affairs Director'),
+    ('DEV DIR', 'Development Director'),
+    ('DEVEL OFFICER', 'Development Officer'),
+    ('SR DEVEL DIR', 'Senior Development Director'),
+    ('ASSOC DIR DEV', 'Assistantoc Director Development'),
+    ('STU SVCS SPEC', 'Studentent Services Specialist'),
+    ('ACA ADV II', 'Academic Advisory II'),
+    ('ACT CHR', 'Acting Chair'),
+    ('ADVANC PRACT REG NURSE', 'Advanced Practitioner Reg Nurse'),
+    ('AFFL PROF', 'Affiliate Professor'),
+    ('ASOC PROF', 'Associate Professor'),
+    ('BIO SCI', 'Biological Scientist'),
+    ('COMM SPEC', 'Communications Specialist'),
+    ('COMMUNIC SPEC', 'Communicationsunic Specialist'),
+    ('CRD, PROG', 'Coordinator, Programmer'),
+    ('DIS PROF', 'Distinguished Professor'),
+    ('EDUC SPEC', 'Education Specialist'),
+    ('ENFORCE OFFICER', 'Enforcement Officer'),
+    ('FACIL MGR', 'Facility Manager'),
+    ('HLT EDUC', 'Health Education'),
+    ('HLTH PROF', 'Healthh Professor'),
+    ('JR DEV', 'Junior Development'),
+    ('MGT ANAL', 'Management Analyst'),
+    ('OPR', 'Operator'),
+    ('PRG ASST', 'Program Assistantt'),
+    ('PROG COORD', 'Programmer Coordinator'),
+    ('RADIOL TECH', 'Radiology Technician'),
+    ('RCV CLRK', 'Receiving Clerk'),
+    ('REGISTR CLRK', 'Registration Clerk'),
+    ('REP, STU SVCS', 'Representative, Studentent Services'),
+    ('RSRH COORD', 'Research Coordinator'),
+    ('SCH PSYCH', 'School Psych'),
+    ('SCI II', 'Scientist II'),
+    ('SCTST', 'Scientist'),
+    ('SER REP', 'Service Representative'),
+    ('SERV MGR', 'Service Manager'),
+    ('SPC', 'Specialist'),
+    ('SUPP SPEC', 'Support Specialist'),
+    ('SUPT', 'Superintendant'),
+    ('TCH ASST', 'Teaching Assistantt'),
+    ('TECH II', 'Technician II'),
+    ('UNIV SECRETARY', 'University Secretary'),
+    ('CHAIR', 'Chair'),
+    ('  ASST   PROF  ', ' Assistantt  Professor '),
+    ('ASST//PROF', 'Assistantt//Professor'),
+    ('A,,B', 'A,,B'),
+    ('A, ,B', 'A,B'),
+    ('-LEADING', '-Leading'),
+    ('TRAILING-', 'Trailing-'),
+    ('MIXED Case Prof', 'Mixed Case Professor'),
+    ('/', '/'),
+    ('/ PROF', '/ Professor'),
+    ('SR / II', 'Senior / II'),
+    (',', ','),
+    (', PROF', ', Professor'),
+    ('SR , II', 'Senior , II'),
+    ('-', '-'),
+    ('- PROF', '- Professor'),
+    ('SR - II', 'Senior - II'),
+    ('ACA', 'Academic'),
+    ('ACA PROF', 'Academic Professor'),
+    ('SR ACA II', 'Senior Academic II'),
+    ('ACT', 'Acting'),
+    ('ACT PROF', 'Acting Professor'),
+    ('SR ACT II', 'Senior Acting II'),
+    ('ADVANC', 'Advanced'),
+    ('ADVANC PROF', 'Advanced Professor'),
+    ('SR ADVANC II', 'Senior Advanced II'),
+    ('ADV', 'Advisory'),
+    ('ADV PROF', 'Advisory Professor'),
+    ('SR ADV II', 'Senior Advisory II'),
+    ('AGRIC', 'Agricultural'),
+    ('AGRIC PROF', 'Agricultural Professor'),
+    ('SR AGRIC II', 'Senior Agricultural II'),
+    ('ALUMN AFF', 'Alumni Affairs'),
+    ('ALUMN AFF PROF', 'Alumni Affairs Professor'),
+    ('SR ALUMN AFF II', 'Senior Alumni Affairs II'),
+    ('ANAL', 'Analyst'),
+    ('ANAL PROF', 'Analyst Professor'),
+    ('SR ANAL II', 'Senior Analyst II'),
+    ('ASS', 'Assistant'),
+    ('ASS PROF', 'Assistant Professor'),
+    ('SR ASS II', 'Senior Assistant II'),
+    ('AST #R', 'Research Assistant'),
+    ('AST #R PROF', 'Research Assistant Professor'),
+    ('SR AST #R II', 'Senior Research Assistant II'),
+    ('AST #G', 'Grading Assistant'),
+    ('AST #G PROF', 'Grading Assistant Professor'),
+    ('SR AST #G II', 'Senior Grading Assistant II'),
+    ('AST #T', 'Teaching Assistant'),
+    ('AST #T PROF', 'Teaching Assistant Professor'),
+    ('SR AST #T II', 'Senior Teaching Assistant II'),
+    ('AST', 'Assistant'),
+    ('AST PROF', 'Assistant Professor'),
+    ('SR AST II', 'Senior Assistant II'),
+    ('AFFL', 'Affiliate'),
+    ('SR AFFL II', 'Senior Affiliate II'),
+    ('ASO', 'Associate'),
+    ('SR ASO II', 'Senior Associate II'),
+    ('ASOC', 'Associate'),
+    ('SR ASOC II', 'Senior Associate II'),
+    ('ASSOC', 'Assistantoc'),
+    ('SR ASSOC II', 'Senior Assistantoc II'),
+    ('BIO', 'Biological'),
+    ('BIO PROF', 'Biological Professor'),
+    ('SR BIO II', 'Senior Biological II'),
+    ('PROF PROF', 'Professor Professor'),
+    ('SR PROF II', 'Senior Professor II'),
+    ('MSTR', 'Master'),
+    ('MSTR PROF', 'Master Professor'),
+    ('SR MSTR II', 'Senior Master II'),
+    ('COUNS', 'Counselor'),
+    ('COUNS PROF', 'Counselor Professor'),
+    ('SR COUNS II', 'Senior Counselor II'),
+    ('ADJ', 'Adjunct'),
+    ('SR ADJ II', 'Senior Adjunct II'),
+    ('DIST', 'Distinguished'),
+    ('SR DIST II', 'Senior Distinguished II'),
+    ('CHEM', 'Chemist'),
+    ('CHEM PROF', 'Chemist Professor'),
+    ('SR CHEM II', 'Senior Chemist II'),
+    ('CHR', 'Chair'),
+    ('CHR PROF', 'Chair Professor'),
+    ('SR CHR II', 'Senior Chair II'),
+    ('CIO', 'Chief Information Officer'),
+    ('CIO PROF', 'Chief Information Officer Professor'),
+    ('SR CIO II', 'Senior Chief Information Officer II'),
+    ('COMM', 'Communications'),
+    ('COMM PROF', 'Communications Professor'),
+    ('SR COMM II', 'Senior Communications II'),
+    ('COO PROF', 'Chief Operating Officer Professor'),
+    ('SR COO II', 'Senior Chief Operating Officer II'),
+    ('COORD', 'Coordinator'),
+    ('COORD PROF', 'Coordinator Professor'),
+    ('SR COORD II', 'Senior Coordinator II'),
+    ('CO', 'Courtesy'),
+    ('CO PROF', 'Courtesy Professor'),
+    ('SR CO II', 'Senior Courtesy II'),
+    ('CLIN', 'Clinical'),
+    ('CLIN PROF', 'Clinical Professor'),
+    ('SR CLIN II', 'Senior Clinical II'),
+    ('CLRK', 'Clerk'),
+    ('CLRK PROF', 'Clerk Professor'),
+    ('SR CLRK II', 'Senior Clerk II'),
+    ('DN PROF', 'Dean Professor'),
+    ('SR DN II', 'Senior Dean II'),
+    ('FIN', 'Financial'),
+    ('FIN PROF', 'Financial Professor'),
+    ('SR FIN II', 'Senior Financial II'),
+    ('FINAN', 'Financialan'),
+    ('FINAN PROF', 'Financialan Professor'),
+    ('SR FINAN II', 'Senior Financialan II'),
+    ('STU', 'Studentent'),
+    ('STU PROF', 'Studentent Professor'),
+    ('SR STU II', 'Senior Studentent II'),
+    ('PRG', 'Program'),
+    ('PRG PROF', 'Program Professor'),
+    ('SR PRG II', 'Senior Program II'),
+    ('DEV', 'Development'),
+    ('DEV PROF', 'Development Professor'),
+    ('SR DEV II', 'Senior Development II'),
+    ('AFF', 'Affiliate'),
+    ('AFF PROF', 'Affiliate Professor'),
+    ('SR AFF II', 'Senior Affiliate II'),
+    ('SVCS', 'Services'),
+    ('SVCS PROF', 'Services Professor'),
+    ('SR SVCS II', 'Senior Services II'),
+    ('DEVEL', 'Development'),
+    ('DEVEL PROF', 'Development Professor'),
+    ('SR DEVEL II', 'Senior Development II'),
+    ('TECH', 'Technician'),
+    ('TECH PROF', 'Technician Professor'),
+    ('SR TECH II', 'Senior Technician II'),
+    ('PROGS', 'Programs'),
+    ('PROGS PROF', 'Programs Professor'),
+    ('SR PROGS II', 'Senior Programs II'),
+    ('FACIL', 'Facility'),
+    ('FACIL PROF', 'Facility Professor'),
+    ('SR FACIL II', 'Senior Facility II'),
+    ('HLT', 'Health'),
+    ('HLT PROF', 'Health Professor'),
+    ('SR HLT II', 'Senior Health II'),
+    ('HLTH', 'Healthh'),
+    ('SR HLTH II', 'Senior Healthh II'),
+    ('INT', 'Interim'),
+    ('INT PROF', 'Interim Professor'),
+    ('SR INT II', 'Senior Interim II'),
+    ('SCTST PROF', 'Scientist Professor'),
+    ('SR SCTST II', 'Senior Scientist II'),
+    ('SUPP', 'Support'),
+    ('SUPP PROF', 'Support Professor'),
+    ('SR SUPP II', 'Senior Support II'),
+    ('CTY', 'County'),
+    ('CTY PROF', 'County Professor'),
+    ('SR CTY II', 'Senior County II'),
+    ('EXT', 'Extension'),
+    ('EXT PROF', 'Extension Professor'),
+    ('SR EXT II', 'Senior Extension II'),
+    ('EMER', 'Emeritus'),
+    ('SR EMER II', 'Senior Emeritus II'),
+    ('ENFORCE', 'Enforcement'),
+    ('ENFORCE PROF', 'Enforcement Professor'),
+    ('SR ENFORCE II', 'Senior Enforcement II'),
+    ('ENVIRON', 'Environmental'),
+    ('ENVIRON PROF', 'Environmental Professor'),
+    ('SR ENVIRON II', 'Senior Environmental II'),
+    ('GEN', 'General'),
+    ('GEN PROF', 'General Professor'),
+    ('SR GEN II', 'Senior General II'),
+    ('GRD', 'Graduate'),
+    ('GRD PROF', 'Graduate Professor'),
+    ('SR GRD II', 'Senior Graduate II'),
+    ('JNT', 'Joint'),
+    ('SR JNT II', 'Senior Joint II'),
+    ('JR', 'Junior'),
+    ('JR PROF', 'Junior Professor'),
+    ('SR JR II', 'Senior Junior II'),
+    ('ENG', 'Engineer'),
+    ('ENG PROF', 'Engineer Professor'),
+    ('SR ENG II', 'Senior Engineer II'),
+    ('CTR', 'Center'),
+    ('CTR PROF', 'Center Professor'),
+    ('SR CTR II', 'Senior Center II'),
+    ('OPR PROF', 'Operator Professor'),
+    ('SR OPR II', 'Senior Operator II'),
+    ('ADMIN', 'Administrative'),
+    ('ADMIN PROF', 'Administrative Professor'),
+    ('SR ADMIN II', 'Senior Administrative II'),
+    ('DIS', 'Distinguished'),
+    ('SR DIS II', 'Senior Distinguished II'),
+    ('SER', 'Service'),
+    ('SER PROF', 'Service Professor'),
+    ('SR SER II', 'Senior Service II'),
+    ('REP', 'Representative'),
+    ('REP PROF', 'Representative Professor'),
+    ('SR REP II', 'Senior Representative II'),
+    ('RADIOL', 'Radiology'),
+    ('RADIOL PROF', 'Radiology Professor'),
+    ('SR RADIOL II', 'Senior Radiology II'),
+    ('TECHNOL', 'Technologist'),
+    ('TECHNOL PROF', 'Technologist Professor'),
+    ('SR TECHNOL II', 'Senior Technologist II'),
+    ('PRES PROF', 'President Professor'),
+    ('SR PRES II', 'Senior President II'),
+    ('PRES5 PROF', 'President 5 Professor'),
+    ('SR PRES5 II', 'Senior President 5 II'),
+    ('PRES6 PROF', 'President 6 Professor'),
+    ('SR PRES6 II', 'Senior President 6 II'),
+    ('EMIN', 'Eminent'),
+    ('EMIN PROF', 'Eminent Professor'),
+    ('SR EMIN II', 'Senior Eminent II'),
+    ('CFO PROF', 'Chief Financial Officer Professor'),
+    ('SR CFO II', 'Senior Chief Financial Officer II'),
+    ('PROV PROF', 'Provisional Professor'),
+    ('SR PROV II', 'Senior Provisional II'),
+    ('ADM', 'Administrator'),
+    ('ADM PROF', 'Administrator Professor'),
+    ('SR ADM II', 'Senior Administrator II'),
+    ('INFO', 'Information'),
+    ('INFO PROF', 'Information Professor'),
+    ('SR INFO II', 'Senior Information II'),
+    ('IT', 'Information Technology'),
+    ('SR IT II', 'Senior Information Technology II'),
+    ('MGR', 'Manager'),
+    ('MGR PROF', 'Manager Professor'),
+    ('SR MGR II', 'Senior Manager II'),
+    ('MGT', 'Management'),
+    ('MGT PROF', 'Management Professor'),
+    ('SR MGT II', 'Senior Management II'),
+    ('VIS', 'Visiting'),
+    ('VIS PROF', 'Visiting Professor'),
+    ('SR VIS II', 'Senior Visiting II'),
+    ('PHAS', 'Phased'),
+    ('PHAS PROF', 'Phased Professor'),
+    ('SR PHAS II', 'Senior Phased II'),
+    ('PROG', 'Programmer'),
+    ('PROG PROF', 'Programmer Professor'),
+    ('SR PROG II', 'Senior Programmer II'),
+    ('PRACT', 'Practitioner'),
+    ('PRACT PROF', 'Practitioner Professor'),
+    ('SR PRACT II', 'Senior Practitioner II'),
+    ('REGISTR', 'Registration'),
+    ('REGISTR PROF', 'Registration Professor'),
+    ('SR REGISTR II', 'Senior Registration II'),
+    ('RSCH', 'Research'),
+    ('RSCH PROF', 'Research Professor'),
+    ('SR RSCH II', 'Senior Research II'),
+    ('RSRH', 'Research'),
+    ('RSRH PROF', 'Research Professor'),
+    ('SR RSRH II', 'Senior Research II'),
+    ('RET', 'Retirement'),
+    ('RET PROF', 'Retirement Professor'),
+    ('SR RET II', 'Senior Retirement II'),
+    ('SCH', 'School'),
+    ('SCH PROF', 'School Professor'),
+    ('SR SCH II', 'Senior School II'),
+    ('SCI', 'Scientist'),
+    ('SCI PROF', 'Scientist Professor'),
+    ('SR SCI II', 'Senior Scientist II'),
+    ('SERV', 'Service'),
+    ('SERV PROF', 'Service Professor'),
+    ('SR SERV II', 'Senior Service II'),
+    ('TCH', 'Teaching'),
+    ('TCH PROF', 'Teaching Professor'),
+    ('SR TCH II', 'Senior Teaching II'),
+    ('TELE', 'Telecommunications'),
+    ('TELE PROF', 'Telecommunications Professor'),
+    ('SR TELE II', 'Senior Telecommunications II'),
+    ('TV', 'TV'),
+    ('TV PROF', 'TV Professor'),
+    ('SR TV II', 'Senior TV II'),
+    ('UNIV', 'University'),
+    ('UNIV PROF', 'University Professor'),
+    ('SR UNIV II', 'Senior University II'),
+    ('EDUC', 'Education'),
+    ('EDUC PROF', 'Education Professor'),
+    ('SR EDUC II', 'Senior Education II'),
+    ('CRD', 'Coordinator'),
+    ('CRD PROF', 'Coordinator Professor'),
+    ('SR CRD II', 'Senior Coordinator II'),
+    ('RES', 'Research'),
+    ('RES PROF', 'Research Professor'),
+    ('SR RES II', 'Senior Research II'),
+    ('DIR PROF', 'Director Professor'),
+    ('SR DIR II', 'Senior Director II'),
+    ('PKY', 'PK Yonge'),
+    ('PKY PROF', 'PK Yonge Professor'),
+    ('SR PKY II', 'Senior PK Yonge II'),
+    ('RCV', 'Receiving'),
+    ('RCV PROF', 'Receiving Professor'),
+    ('SR RCV II', 'Senior Receiving II'),
+    ('SR', 'Senior'),
+    ('SR PROF', 'Senior Professor'),
+    ('SR SR II', 'Senior Senior II'),
+    ('SPEC', 'Specialist'),
+    ('SPEC PROF', 'Specialist Professor'),
+    ('SR SPEC II', 'Senior Specialist II'),
+    ('SPC PROF', 'Specialist Professor'),
+    ('SR SPC II', 'Senior Specialist II'),
+    ('SPV', 'Supervisor'),
+    ('SPV PROF', 'Supervisor Professor'),
+    ('SR SPV II', 'Senior Supervisor II'),
+    ('SUPV', 'Supervisor'),
+    ('SUPV PROF', 'Supervisor Professor'),
+    ('SR SUPV II', 'Senior Supervisor II'),
+    ('SUPT PROF', 'Superintendant Professor'),
+    ('SR SUPT II', 'Senior Superintendant II'),
+    ('STUD', 'Student'),
+    ('STUD PROF', 'Student Professor'),
+    ('SR STUD II', 'Senior Student II'),
+    ('II', 'II'),
+    ('II PROF', 'II Professor'),
+    ('SR II II', 'Senior II II'),
+    ('III', 'III'),
+    ('III PROF', 'III Professor'),
+    ('SR III II', 'Senior III II'),
+    ('IV', 'IV'),
+    ('IV PROF', 'IV Professor'),
+    ('SR IV II', 'Senior IV II'),
+    ('COMMUNIC', 'Communicationsunic'),
+    ('COMMUNIC PROF', 'Communicationsunic Professor'),
+    ('SR COMMUNIC II', 'Senior Communicationsunic II'),
+    ('POSTDOC', 'Postdoctoral'),
+    ('POSTDOC PROF', 'Postdoctoral Professor'),
+    ('SR POSTDOC II', 'Senior Postdoctoral II'),
+    ('VP PROF', 'Vice President Professor'),
+    ('SR VP II', 'Senior Vice President II'),
+    ('', ''),
+    (' ', ''),
+    ('X', 'X'),
+    ('352', '352'),
+    ('IIII', 'Iiii'),
+    ('III IV', 'III IV'),
+    ('ASST/ASSOC/FULL PROF', 'Assistantt/Assistantoc/Full Professor'),
+    ]
+
+print datetime.now(), "Start"
+failures = 0
+for (before, after) in golden:
+    improved = improve_jobcode_description(before)
+    if improved != after:
+        failures = failures + 1
+        print "Before", before.ljust(30), "Expected", after.ljust(40), \
+            "Got", improved
+improved = improve_jobcode_descriptions([before for (before, after) in golden])
+if improved != [after for (before, after) in golden]:
+    failures = failures + 1
+    print "Bulk improvement differs from golden titles"
+print len(golden), "titles", failures, "failures"
+print datetime.now(), "Finish"
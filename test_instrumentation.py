@@ -0,0 +1,70 @@
+"""
+    test_instrumentation.py -- Read people from VIVO with instrumentation in
+    use.  Each reader called must be reported with its calls, time,
+    queries, bytes received by the transport and latency histogram.  Once
+    instrumentation is turned off, nothing more is recorded and the readers
+    are no longer wrapped.  With parallel dereferencing, each reader must be
+    reported with the same queries
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import Instrumentation
+from vivopeople import SparqlTransport
+from vivopeople import VIVO_SPARQL
+from vivopeople import set_parallel_deref
+from datetime import datetime
+import json
+import vivopeople
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+with SparqlTransport(VIVO_SPARQL), Instrumentation() as instrumentation:
+    for person_uri in person_uris:
+        vivopeople.get_person(person_uri)
+report = instrumentation.report()
+print "\n", report['queries'], "queries", report['bytes'], "bytes in", \
+    report['seconds'], "seconds"
+print "\n", "function".ljust(28), "calls".rjust(6), "seconds".rjust(10), \
+    "queries".rjust(8), "bytes".rjust(10)
+for function in report['functions']:
+    print function['function'].ljust(28), str(function['calls']).rjust(6), \
+        str(function['seconds']).rjust(10), \
+        str(function['queries']).rjust(8), str(function['bytes']).rjust(10)
+print "\nget_person histogram"
+for function in report['functions']:
+    if function['function'] == 'get_person':
+        print json.dumps(function['histogram'], indent=4)
+print "\nEvents", report['events']
+
+set_parallel_deref(True)
+with SparqlTransport(VIVO_SPARQL), Instrumentation() as parallel:
+    for person_uri in person_uris:
+        vivopeople.get_person(person_uri)
+set_parallel_deref(False)
+queries = dict([(function['function'], function['queries'])
+                for function in report['functions']])
+parallel_queries = dict([(function['function'], function['queries'])
+                         for function in parallel.report()['functions']])
+print "\nSame queries per function with parallel deref", \
+    parallel_queries == queries
+
+vivopeople.get_person(person_uris[0])
+print "\nCalls after instrumentation is off", \
+    instrumentation.report()['functions'][0]['calls'] == \
+    report['functions'][0]['calls']
+print "Readers wrapped after instrumentation is off", \
+    hasattr(vivopeople.get_person, 'uninstrumented')
+instrumentation.write('test_instrumentation.json')
+print datetime.now(), "Finish"
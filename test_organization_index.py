@@ -0,0 +1,32 @@
+"""
+    test_organization_index.py -- Load the organizations of VIVO into an
+    index, full and compact, and read positions using the index.  The
+    positions must be the same as those read without the index
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import OrganizationIndex
+from vivopeople import get_position_uris
+from vivopeople import get_position
+from datetime import datetime
+
+print datetime.now(), "Start"
+position_uris = get_position_uris("http://vivo.ufl.edu/individual/n25674")
+positions = [get_position(position_uri) for position_uri in position_uris]
+print datetime.now(), "Read", len(positions), "positions without the index"
+for compact in [False, True]:
+    with OrganizationIndex(compact=compact) as organization_index:
+        print datetime.now(), "Compact", compact, "index has", \
+            len(organization_index), "organizations"
+        print "UF is an organization", \
+            "http://vivo.ufl.edu/individual/n8763427" in organization_index
+        print "Same positions", positions == \
+            [get_position(position_uri) for position_uri in position_uris]
+print datetime.now(), "Finish"
@@ -0,0 +1,55 @@
+"""
+    test_person.py -- Read people lazily.  A Person reads nothing until it
+    is used, and then only the part used.  People prefetched a batch at a
+    time must be the same as people read one part at a time, and the same
+    as get_person, get_positions_for_people and get_degrees_for_people
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import Person
+from vivopeople import get_lazy_people
+from vivopeople import get_person
+from vivopeople import get_positions_for_people
+from vivopeople import get_degrees_for_people
+from vivopeople import get_degree_uris
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+person = Person(person_uris[0])
+print "\nRead before use", [part for part in Person.PARTS
+                            if person.is_loaded(part)]
+print person_uris[0], person.get('ufid'), person.get('homedept_uri')
+print "Read after ufid", [part for part in Person.PARTS
+                          if person.is_loaded(part)]
+print "Degree uris", get_degree_uris(person_uris[0])
+print len(person.degrees), "degrees"
+print "Read after degrees", [part for part in Person.PARTS
+                             if person.is_loaded(part)]
+
+people = get_lazy_people(person_uris,
+                         prefetch=['vcard', 'positions', 'degrees'])
+positions_for = get_positions_for_people(person_uris)
+degrees_for = get_degrees_for_people(person_uris)
+for person in people:
+    print "\n", person.person_uri, person.get('display_name', '')
+    print "Same as get_person", person.to_dict() == \
+        get_person(person.person_uri)
+    print "Same positions", person.positions == \
+        positions_for[person.person_uri]
+    print "Same degrees", person.degrees == degrees_for[person.person_uri]
+    print "Same as read one part at a time", \
+        person.to_dict() == Person(person.person_uri).to_dict()
+print datetime.now(), "Finish"
@@ -0,0 +1,81 @@
+"""
+    test_records.py -- Read people and their positions as compact records.
+    Each record must read like the dict returned by get_people and
+    get_positions_for_people, and take less memory, with uris as unicode.
+    Records must survive pickling, and to_dict() must give json a dict.  A
+    RecordTable of the positions, compared with itself and with a changed
+    copy, must find just the changes, and a missing uri must be the same
+    in any table
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import get_people
+from vivopeople import get_positions_for_people
+from vivopeople import PositionRecord
+from vivopeople import RecordTable
+from datetime import datetime
+import json
+import pickle
+import sys
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+people = get_people(person_uris)
+records = get_people(person_uris, records=True)
+for person, record in zip(people, records):
+    print "\n", record['person_uri'], record.get('display_name', '')
+    print "Same as get_people", record == person
+    print "Bytes as dict", sys.getsizeof(person), "as record", \
+        sys.getsizeof(record)
+    print "Uris unicode, as read from VIVO", \
+        all([isinstance(record[key], unicode) for key in record
+             if key.endswith('_uri')])
+    print "Same after pickling", \
+        pickle.loads(pickle.dumps(record, 0)) == person, \
+        pickle.loads(pickle.dumps(record, 2)) == person
+    print "Same as json", json.loads(json.dumps(record.to_dict())) == \
+        json.loads(json.dumps(person))
+
+positions_for = get_positions_for_people(person_uris)
+records_for = get_positions_for_people(person_uris, records=True)
+positions = []
+records = []
+for person_uri in person_uris:
+    positions = positions + positions_for[person_uri]
+    records = records + records_for[person_uri]
+print "\n", len(records), "positions same as get_positions_for_people", \
+    records == positions
+
+table = RecordTable(PositionRecord, records)
+print len(table), "rows.  Differences with itself", \
+    table.differences(table, 'position_uri')
+changed = [dict(position) for position in positions]
+if len(changed) > 0:
+    changed[0]['hr_title'] = 'CHANGED'
+print "Differences with a changed copy"
+for difference in table.differences(RecordTable(PositionRecord, changed),
+                                    'position_uri'):
+    print difference
+
+uri = "http://vivo.ufl.edu/individual/n"
+listed = RecordTable(PositionRecord,
+                     [{'position_uri': uri + '1', 'position_orguri': None},
+                      {'position_uri': uri + '2',
+                       'position_orguri': 'http://x.org/a'}])
+arrayed = RecordTable(PositionRecord,
+                      [{'position_uri': uri + '1', 'position_orguri': None}])
+print "Missing orguri in a list and in an array the same", \
+    listed.differences(arrayed, 'position_uri', ['position_orguri']) == []
+print datetime.now(), "Finish"
@@ -0,0 +1,40 @@
+"""
+    test_repair_phone_numbers.py -- given a column of phone numbers, attempt
+    to improve each of them.  The results must be the same as repairing
+    the phone numbers one at a time
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import repair_phone_numbers
+from vivopeople import repair_phone_number
+from datetime import datetime
+
+print datetime.now(), "Start"
+befores = [
+    "27737",
+    "2-7737",
+    "352 484 2999",
+    "377 9999",
+    "3-4882 X 9943",
+    "+1 352 388 2888",
+    "888388",
+    "272 2822 ext. 2999",
+    "bd282",
+    "27737",
+    "(1) 352 392 1234",
+    "+1-352-273-9999 x12",
+    "352.392.1234x55",
+    ""
+    ]
+afters = repair_phone_numbers(befores)
+for before, after in zip(befores, afters):
+    print "Before", before.ljust(20), "After", after.ljust(30), \
+        after == repair_phone_number(before)
+print datetime.now(), "Finish"
@@ -0,0 +1,40 @@
+"""
+    test_replay_transport.py -- Record the queries made reading people from
+    VIVO, then read the people again from the recording, without VIVO, with
+    and without added latency.  The people must be the same
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import RecordingTransport
+from vivopeople import ReplayTransport
+from vivopeople import get_person
+from datetime import datetime
+import os
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+if os.path.exists('test_replay_transport.jsonl'):
+    os.remove('test_replay_transport.jsonl')
+with RecordingTransport('test_replay_transport.jsonl') as recorder:
+    people = [get_person(person_uri) for person_uri in person_uris]
+recorder.close()
+print datetime.now(), "Recorded", recorder.stats()
+for latency in [0.0, 0.04]:
+    with ReplayTransport('test_replay_transport.jsonl',
+                         latency=latency) as replay:
+        print datetime.now(), "Latency", latency, "same people", people == \
+            [get_person(person_uri) for person_uri in person_uris], \
+            replay.stats()
+print datetime.now(), "Finish"
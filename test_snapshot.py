@@ -0,0 +1,56 @@
+"""
+    test_snapshot.py -- Read the people, vcard, position, degree and datetime
+    interval subgraph of VIVO into a snapshot, then read people and their
+    positions from the snapshot.  The people and positions must be the same
+    as those read from VIVO
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import Snapshot
+from vivopeople import get_person
+from vivopeople import get_position_uris
+from vivopeople import get_position
+from datetime import datetime
+
+
+def contact_order(person):
+    """
+    VIVO does not order the telephones and email addresses of a vcard.  Put
+    them in order of uri to compare people
+    """
+    vcard = person.get('vcard', {})
+    vcard.get('telephones', []).sort(key=lambda x: x['telephone_uri'])
+    vcard.get('email_addresses', []).sort(key=lambda x: x['email_uri'])
+    return person
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+people = [contact_order(get_person(person_uri)) for person_uri in
+          person_uris]
+positions = [[get_position(position_uri) for position_uri in
+              get_position_uris(person_uri)] for person_uri in person_uris]
+print datetime.now(), "Read", len(people), "people from VIVO"
+
+snapshot = Snapshot()
+print datetime.now(), "Read", snapshot.load_vivo(), "triples from VIVO"
+with snapshot:
+    for person_uri, person, person_positions in zip(person_uris, people,
+                                                    positions):
+        print person_uri, "same person", \
+            person == contact_order(get_person(person_uri)), \
+            "same positions", person_positions == \
+            [get_position(position_uri) for position_uri in
+             get_position_uris(person_uri)]
+print datetime.now(), "Finish"
@@ -0,0 +1,40 @@
+"""
+    test_sparql_transport.py -- Read people through a pooled, keep-alive,
+    gzipped SPARQL transport, one at a time and with parallel
+    dereferencing.  The people must be the same as those read without the
+    transport, and the queries share a few connections
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import SparqlTransport
+from vivopeople import set_parallel_deref
+from vivopeople import get_person
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+people = [get_person(person_uri) for person_uri in person_uris]
+print datetime.now(), "Read", len(people), "people without the transport"
+with SparqlTransport('http://sparql.vivo.ufl.edu:3030/VIVO/sparql',
+                     connections=4) as transport:
+    print "Same people", people == \
+        [get_person(person_uri) for person_uri in person_uris]
+    print datetime.now(), transport.stats()
+    set_parallel_deref(True, connections=4)
+    print "Same people in parallel", people == \
+        [get_person(person_uri) for person_uri in person_uris]
+    print datetime.now(), transport.stats()
+    transport.close()
+print datetime.now(), "Finish"
@@ -0,0 +1,85 @@
+"""
+    test_sparql_update_loader.py -- Load ADD and SUB RDF into a local stand-in
+    for the VIVO SPARQL update API.  The stand-in fails the first request, so
+    the loader must try it again.  Each chunk removes the SUB triples of its
+    subjects before adding the ADD triples
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import SparqlUpdateLoader
+from vivopeople import add_person
+from datetime import datetime
+from BaseHTTPServer import BaseHTTPRequestHandler
+from BaseHTTPServer import HTTPServer
+from SocketServer import ThreadingMixIn
+from urlparse import parse_qs
+import threading
+
+updates = []
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])))
+        updates.append(form['update'][0])
+        status = 200
+        if len(updates) == 1:
+            status = 503
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+print datetime.now(), "Start"
+server = StandInServer(('127.0.0.1', 0), StandIn)
+thread = threading.Thread(target=server.serve_forever)
+thread.daemon = True
+thread.start()
+url = 'http://127.0.0.1:' + str(server.server_address[1]) + \
+    '/api/sparqlUpdate'
+
+person = {'person_type': 'http://vivoweb.org/ontology/core#FacultyMember',
+          'ufid': '99999999',
+          'display_name': 'Alligator, Albert',
+          'gatorlink': 'albert',
+          'homedept_uri': 'http://vivo.ufl.edu/individual/n8763427',
+          'last_name': 'Alligator',
+          'first_name': 'Albert',
+          'primary_email': 'albert@ufl.edu',
+          'phone': '(352) 392-1234',
+          'start_date': datetime(2014, 1, 1),
+          'position_label': 'Mascot',
+          'position_type': 'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+          'position_orguri': 'http://vivo.ufl.edu/individual/n8763427'
+          }
+[ardf, person_uri] = add_person(person)
+srdf = """    <rdf:Description rdf:about="http://vivo.ufl.edu/individual/n8763427">
+        <rdfs:label>University of Florida</rdfs:label>
+    </rdf:Description>
+"""
+loader = SparqlUpdateLoader(url, 'vivo_root@school.edu', 'password',
+                            chunk_size=10, workers=4, backoff=0.1)
+chunks = loader.chunks(ardf, srdf)
+print datetime.now(), len(chunks), "chunks"
+result = loader.load(ardf, srdf)
+loader.close()
+print datetime.now(), "Loaded", result['triples'], "triples in", \
+    result['chunks'], "chunks.", len(result['failed']), "chunks failed.", \
+    len(updates), "requests"
+for update in updates:
+    print "\n", update
+server.shutdown()
+print datetime.now(), "Finish"
@@ -0,0 +1,56 @@
+"""
+    test_transport_readers.py -- With a SparqlTransport in use, the
+    organizations and datetime intervals of positions are made from their
+    triples rather than by vivofoundation.  Each interval must be the same
+    as get_datetime_interval, and each organization must have the uri and
+    label returned by get_organization
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import SparqlTransport
+from vivopeople import VIVO_SPARQL
+from vivopeople import read_organization
+from vivopeople import read_datetime_interval
+from vivopeople import get_position_uris
+from vivopeople import get_position
+from vivofoundation import get_organization
+from vivofoundation import get_datetime_interval
+from vivofoundation import get_vivo_value
+from datetime import datetime
+
+print datetime.now(), "Start"
+person_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n3715",
+        "http://vivo.ufl.edu/individual/n4452",
+        "http://vivo.ufl.edu/individual/n3428"
+    ]
+organization_uris = set()
+dti_uris = set()
+for person_uri in person_uris:
+    for position_uri in get_position_uris(person_uri):
+        organization_uri = get_position(position_uri).get('position_orguri')
+        if organization_uri is not None:
+            organization_uris.add(organization_uri)
+        dti_uri = get_vivo_value(position_uri, 'vivo:dateTimeInterval')
+        if dti_uri is not None:
+            dti_uris.add(dti_uri)
+
+with SparqlTransport(VIVO_SPARQL):
+    for organization_uri in sorted(organization_uris):
+        organization = get_organization(organization_uri)
+        expected = dict([(key, organization[key]) for key in
+                         ['organization_uri', 'label'] if key in organization])
+        print organization_uri, "same uri and label", \
+            read_organization(organization_uri) == expected
+    for dti_uri in sorted(dti_uris):
+        print dti_uri, "same interval", \
+            read_datetime_interval(dti_uri) == get_datetime_interval(dti_uri)
+print datetime.now(), "Finish"
@@ -0,0 +1,43 @@
+"""
+    test_triple_cache.py -- read positions and degrees with a triple cache
+    in use.  Organizations, types and datetime intervals shared by the
+    positions are read from VIVO once.  Results must be the same as without
+    the cache.
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import TripleCache
+from vivopeople import get_position
+from vivopeople import get_degree
+from datetime import datetime
+
+print datetime.now(), "Start"
+position_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n7320",
+        "http://vivo.ufl.edu/individual/n6535"
+    ]
+degree_uris = \
+    [
+        "http://vivo.ufl.edu/individual/n195825",
+        "http://vivo.ufl.edu/individual/n31642"
+    ]
+positions = [get_position(position_uri) for position_uri in position_uris]
+degrees = [get_degree(degree_uri) for degree_uri in degree_uris]
+with TripleCache(max_size=1000, ttl=600) as cache:
+    for k in range(3):
+        print "Positions same", positions == \
+            [get_position(position_uri) for position_uri in position_uris]
+        print "Degrees same", degrees == \
+            [get_degree(degree_uri) for degree_uri in degree_uris]
+        print cache.stats()
+    cache.invalidate(position_uris)
+    print "After invalidating positions", cache.stats()
+print datetime.now(), "Finish"
@@ -0,0 +1,38 @@
+"""
+    test_ufid_index.py -- open a persistent ufid index, bring it up to date
+    with VIVO and find people by ufid.  A second refresh reads only the
+    people harvested since the first.
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import UfidIndex
+from vivopeople import find_person
+from datetime import datetime
+
+print datetime.now(), "Start"
+ufid_index = UfidIndex('test_ufid_index.db')
+print datetime.now(), "Refreshing ufid index"
+print datetime.now(), "Read", ufid_index.refresh(debug=True), "people"
+print datetime.now(), "ufid index has", len(ufid_index), "entries"
+print datetime.now(), "Harvested since", ufid_index.harvested_since()
+print datetime.now(), "Refreshing ufid index again"
+print datetime.now(), "Read", ufid_index.refresh(), "people"
+ufids = \
+    [
+        "02001000",
+        "57000000",
+        "80147616",
+        "33100000"
+    ]
+for ufid in ufids:
+    [found, uri] = find_person(ufid, ufid_index)
+    print str(found).ljust(5), ufid, uri
+ufid_index.close()
+print datetime.now(), "Finished"
@@ -0,0 +1,46 @@
+"""
+    test_update_people.py -- Given pairs of VIVO people and source people,
+    generate the ADD and SUB RDF to update the VIVO people.  The RDF must be
+    the same, in the same order, for any number of workers, in threads or
+    processes.  A person that fails is reported and does not stop the batch
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import update_people
+from datetime import datetime
+
+print datetime.now(), "Start"
+source_person = {'hr_position': True,
+                 'display_name': 'Alligator, Albert',
+                 'given_name': 'Albert',
+                 'family_name': 'Alligator',
+                 'position_label': 'Mascot',
+                 'start_date': datetime(2014, 1, 1),
+                 'end_date': None,
+                 'position_type':
+                 'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+                 'position_orguri': 'http://vivo.ufl.edu/individual/n8763427'
+                 }
+pairs = \
+    [
+        ("http://vivo.ufl.edu/individual/n3715", source_person),
+        ("http://vivo.ufl.edu/individual/n4452", {'hr_position': True}),
+        ("http://vivo.ufl.edu/individual/n3428", source_person)
+    ]
+[ardf, srdf, errors] = update_people(pairs, workers=1)
+print "\nADD\n", ardf, "\nSUB\n", srdf
+for error in errors:
+    print "\nError", error['index'], error['person_uri'], "\n", error['error']
+for mode in ['thread', 'process']:
+    [add, sub, errs] = update_people(pairs, workers=3, mode=mode)
+    print "\n", mode, "same SUB as one worker", sub == srdf, \
+        "same errors", [x['index'] for x in errs] == \
+        [x['index'] for x in errors]
+print datetime.now(), "Finish"
@@ -0,0 +1,63 @@
+"""
+    test_uri_allocator.py -- Add people with uris from a URIAllocator.  The
+    uris of all the people are checked against VIVO with one query per
+    block, and no uri is handed out twice.  Uris handed out by the worker
+    processes of update_people are merged back into the allocator
+
+    Version 0.1 MC 2026-10-18
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2015, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import URIAllocator
+from vivopeople import add_person
+from vivopeople import update_people
+from datetime import datetime
+import re
+
+print datetime.now(), "Start"
+person = {'person_type': 'http://vivoweb.org/ontology/core#FacultyMember',
+          'ufid': '99999999',
+          'display_name': 'Alligator, Albert',
+          'gatorlink': 'albert',
+          'homedept_uri': 'http://vivo.ufl.edu/individual/n8763427',
+          'last_name': 'Alligator',
+          'first_name': 'Albert',
+          'primary_email': 'albert@ufl.edu',
+          'phone': '(352) 392-1234',
+          'fax': '(352) 392-4321',
+          'preferred_title': 'Mascot',
+          'start_date': datetime(2014, 1, 1),
+          'position_label': 'Mascot',
+          'position_type': 'http://vivoweb.org/ontology/core#Non-AcademicPosition',
+          'position_orguri': 'http://vivo.ufl.edu/individual/n8763427'
+          }
+with URIAllocator(block_size=1000) as allocator:
+    person_uris = []
+    for k in range(100):
+        [ardf, person_uri] = add_person(person)
+        person_uris.append(person_uri)
+    print datetime.now(), "Added", len(person_uris), "people with", \
+        len(allocator.issued), "uris in", allocator.queries, "queries"
+    print "First person", person_uris[0]
+    print "All uris different", len(set(person_uris)) == len(person_uris)
+
+    person_uris = ["http://vivo.ufl.edu/individual/n3715",
+                   "http://vivo.ufl.edu/individual/n4452",
+                   "http://vivo.ufl.edu/individual/n3428"]
+    [ardf, srdf, errors] = update_people([(person_uri,
+                                           dict(person, hr_position=True,
+                                                end_date=None)) for
+                                          person_uri in person_uris],
+                                         workers=3, mode='process')
+    uris = set(re.findall(r'http://vivo.ufl.edu/individual/n[0-9]+', ardf))
+    new_uris = [uri for uri in uris if uri not in person_uris and
+                uri != person['position_orguri']]
+    print datetime.now(), "Worker processes made", len(new_uris), \
+        "uris.  All merged into the allocator", \
+        set(new_uris) <= allocator.issued
+print datetime.now(), "Finish"
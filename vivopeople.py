@@ -10,7 +10,6 @@
     get_name
     add_position
     add_vcard
-    add_person
     update_person
 
     Update:
@@ -27,6 +26,8 @@ __license__ = "BSD 3-Clause license"
 __version__ = "2.00"
 
 import re
+import sqlite3
+import threading
 
 def repair_email(email, exp = re.compile(r'\w+\.*\w+@\w+\.(\w+\.*)*\w+')):
     """
@@ -40,6 +41,11 @@ def repair_email(email, exp = re.compile(r'\w+\.*\w+@\w+\.(\w+\.*)*\w+')):
     else:
         return ""
 
+# Every character that is not a digit.  Deleting these with str.translate
+# leaves the digits of a string in a single pass
+
+NOT_DIGITS = "".join([chr(i) for i in range(256) if not chr(i).isdigit()])
+
 def repair_phone_number(phone, debug=False):
     """
     Given an arbitrary string that attempts to represent a phone number,
@@ -50,73 +56,71 @@ def repair_phone_number(phone, debug=False):
     phone_text = phone.encode('ascii', 'ignore')  # encode to ascii
     phone_text = phone_text.lower()
     phone_text = phone_text.strip()
-    extension_digits = None
+    extension_digits = ""
     #
     # strip off US international country code
     #
-    if phone_text.find('+1 ') == 0:
+    if phone_text.startswith('+1 '):
         phone_text = phone_text[3:]
-    if phone_text.find('+1-') == 0:
+    if phone_text.startswith('+1-'):
         phone_text = phone_text[3:]
-    if phone_text.find('(1)') == 0:
+    if phone_text.startswith('(1)'):
         phone_text = phone_text[3:]
-    digits = []
-    for c in list(phone_text):
-        if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-            digits.append(c)
-    if len(digits) > 10 or phone_text.rfind('x') > -1:
-        # pull off the extension
+    digits = phone_text.translate(None, NOT_DIGITS)
+    if len(digits) > 10 or 'x' in phone_text:
+        # pull off the extension, following the last blank or else the
+        # last x
         i = phone_text.rfind(' ')  # last blank
-        if i > 0:
-            extension = phone_text[i+1:]
-            extension_digits = []
-            for c in list(extension):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    extension_digits.append(c)
-            digits = []  # recalc the digits
-            for c in list(phone_text[:i+1]):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    digits.append(c)
-        elif phone_text.rfind('x') > 0:
+        if i <= 0:
             i = phone_text.rfind('x')
-            extension = phone_text[i+1:]
-            extension_digits = []
-            for c in list(extension):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    extension_digits.append(c)
-            digits = []  # recalc the digits
-            for c in list(phone_text[:i+1]):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    digits.append(c)
+        if i > 0:
+            extension_digits = phone_text[i+1:].translate(None, NOT_DIGITS)
+            digits = phone_text[:i+1].translate(None, NOT_DIGITS)
         else:
             extension_digits = digits[10:]
             digits = digits[:10]
     if len(digits) == 7:
         if phone[0:5] == '352392':
             updated_phone = '' # Damaged UF phone number, nothing to repair
-            extension_digits = None
+            extension_digits = ""
         elif phone[0:5] == '352273':
             updated_phone = '' # Another damaged phone number, not to repair
-            extension_digits = None
+            extension_digits = ""
         else:
-            updated_phone = '(352) ' + "".join(digits[0:3])+'-'+ \
-                "".join(digits[3:7])
+            updated_phone = '(352) ' + digits[0:3] + '-' + digits[3:7]
     elif len(digits) == 10:
-        updated_phone = '('+"".join(digits[0:3])+') '+"".join(digits[3:6])+ \
-            '-'+"".join(digits[6:10])
+        updated_phone = '(' + digits[0:3] + ') ' + digits[3:6] + '-' + \
+            digits[6:10]
     elif len(digits) == 5 and digits[0] == '2': # UF special
-        updated_phone = '(352) 392-' + "".join(digits[1:5])
+        updated_phone = '(352) 392-' + digits[1:5]
     elif len(digits) == 5 and digits[0] == '3': # another UF special
-        updated_phone = '(352) 273-' + "".join(digits[1:5])
+        updated_phone = '(352) 273-' + digits[1:5]
     else:
         updated_phone = '' # no repair
-        extension_digits = None
-    if extension_digits is not None and len(extension_digits) > 0:
-        updated_phone = updated_phone + ' ext. ' + "".join(extension_digits)
-    if debug:
-        print phone.ljust(25), updated_phone.ljust(25)
+        extension_digits = ""
+    if len(extension_digits) > 0:
+        updated_phone = updated_phone + ' ext. ' + extension_digits
+    trace('repair_phone_number', debug, phone.ljust(25),
+          updated_phone.ljust(25))
     return updated_phone
 
+def repair_phone_numbers(phones):
+    """
+    Given any iterable of phone number strings, such as a column of phone
+    or fax numbers from an HR file, return a list of the repaired numbers
+    in the same order.  Each distinct phone number string is repaired once
+    """
+    repaired = {}
+    updated_phones = []
+    for phone in phones:
+        try:
+            updated_phone = repaired[phone]
+        except KeyError:
+            updated_phone = repair_phone_number(phone)
+            repaired[phone] = updated_phone
+        updated_phones.append(updated_phone)
+    return updated_phones
+
 
 def get_position_type(salary_plan):
     """
@@ -168,143 +172,177 @@ def get_position_type(salary_plan):
     return position_type
 
 
+# The abbreviations HR uses in job titles, and their expansions.  The
+# rules are applied in order, each to the result of the one before, so the
+# order matters:  earlier rules can create or destroy text later rules
+# match.  The first rules protect "/", "," and "-" so abbreviations
+# can be found next to them; the last rules restore them.
+
+JOBCODE_RULES = [
+    (", ,", ","),
+    ("  ", " "),
+    ("/", " @"),
+    ("/", " @"), # might be two slashes in the input
+    (",", " !"),
+    ("-", " #"),
+    ("Aca ", "Academic "),
+    ("Act ", "Acting "),
+    ("Advanc ", "Advanced "),
+    ("Adv ", "Advisory "),
+    ("Agric ", "Agricultural "),
+    ("Alumn Aff ", "Alumni Affairs "),
+    ("Anal", "Analyst"),
+    ("Ass", "Assistant"),
+    ("Ast #R ", "Research Assistant "),
+    ("Ast #G ", "Grading Assistant "),
+    ("Ast #T ", "Teaching Assistant "),
+    ("Ast ", "Assistant "),
+    ("Affl ", "Affiliate "),
+    ("Aso ", "Associate "),
+    ("Asoc ", "Associate "),
+    ("Assoc ", "Associate "),
+    ("Bio ", "Biological "),
+    ("Prof ", "Professor "),
+    ("Mstr ", "Master "),
+    ("Couns ", "Counselor "),
+    ("Adj ", "Adjunct "),
+    ("Dist ", "Distinguished "),
+    ("Chem", "Chemist"),
+    ("Chr ", "Chair "),
+    ("Cio ", "Chief Information Officer "),
+    ("Comm", "Communications"),
+    ("Coo ", "Chief Operating Officer "),
+    ("Coord ", "Coordinator "),
+    ("Co ", "Courtesy "),
+    ("Clin ", "Clinical "),
+    ("Clrk", "Clerk"),
+    ("Dn ", "Dean "),
+    ("Fin", "Financial"),
+    ("Finan ", "Financial "),
+    ("Stu ", "Student "),
+    ("Prg ", "Program "),
+    ("Dev ", "Development "),
+    ("Aff ", "Affiliate "),
+    ("Svcs ", "Services "),
+    ("Devel ", "Development "),
+    ("Tech ", "Technician "),
+    ("Progs ", "Programs "),
+    ("Facil ", "Facility "),
+    ("Hlt", "Health"),
+    ("Hlth ", "Health "),
+    ("Int ", "Interim "),
+    ("Sctst ", "Scientist "),
+    ("Supp ", "Support "),
+    ("Cty ", "County "),
+    ("Ext ", "Extension "),
+    ("Emer ", "Emeritus "),
+    ("Enforce ", "Enforcement "),
+    ("Environ ", "Environmental "),
+    ("Gen ", "General "),
+    ("Grd", "Graduate"),
+    ("Jnt ", "Joint "),
+    ("Jr", "Junior"),
+    ("Eng ", "Engineer "),
+    ("Ctr ", "Center "),
+    ("Opr ", "Operator "),
+    ("Admin ", "Administrative "),
+    ("Dis ", "Distinguished "),
+    ("Ser ", "Service "),
+    ("Rep ", "Representative "),
+    ("Radiol ", "Radiology "),
+    ("Technol ", "Technologist "),
+    ("Pres ", "President "),
+    ("Pres5 ", "President 5 "),
+    ("Pres6 ", "President 6 "),
+    ("Emin ", "Eminent "),
+    ("Cfo ", "Chief Financial Officer "),
+    ("Prov ", "Provisional "),
+    ("Adm ", "Administrator "),
+    ("Info ", "Information "),
+    ("It ", "Information Technology "),
+    ("Mgr ", "Manager "),
+    ("Mgt ", "Management "),
+    ("Vis ", "Visiting "),
+    ("Phas ", "Phased "),
+    ("Prog ", "Programmer "),
+    ("Pract ", "Practitioner "),
+    ("Registr ", "Registration "),
+    ("Rsch ", "Research "),
+    ("Rsrh ", "Research "),
+    ("Ret ", "Retirement "),
+    ("Sch ", "School "),
+    ("Sci ", "Scientist "),
+    ("Svcs ", "Services "),
+    ("Serv ", "Service "),
+    ("Tch ", "Teaching "),
+    ("Tele ", "Telecommunications "),
+    ("Tv ", "TV "),
+    ("Univ ", "University "),
+    ("Educ ", "Education "),
+    ("Crd ", "Coordinator "),
+    ("Res ", "Research "),
+    ("Dir ", "Director "),
+    ("Pky ", "PK Yonge "),
+    ("Rcv ", "Receiving "),
+    ("Sr ", "Senior "),
+    ("Spec ", "Specialist "),
+    ("Spc ", "Specialist "),
+    ("Spv ", "Supervisor "),
+    ("Supv ", "Supervisor "),
+    ("Supt ", "Superintendant "),
+    ("Stud", "Student"),
+    ("Pky ", "P. K. Yonge "),
+    ("Ii ", "II "),
+    ("Iii ", "III "),
+    ("Iv ", "IV "),
+    ("Communic ", "Communications "),
+    ("Postdoc ", "Postdoctoral "),
+    ("Tech ", "Technician "),
+    ("Vp ", "Vice President "),
+    (" @", "/"), # restore /
+    (" @", "/"),
+    (" !", ","), # restore ,
+    (" #", "-"), # restore -
+    ]
+
+# Titles already improved, keyed by the title as given.  HR data repeats a
+# small number of job codes over every job row
+
+jobcode_descriptions = {}
+
 def improve_jobcode_description(s):
     """
     HR uses a series of abbreviations to fit job titles into limited text
     strings.
     Here we attempt to reverse the process -- a short title is turned into a
     longer one
-    """
 
-    s = s.lower() # convert to lower
-    s = s.title() # uppercase each word
-    s = s + ' '   # add a trailing space so we can find these abbreviated
+    Results are remembered, so each distinct title is improved only once
+    """
+    try:
+        return jobcode_descriptions[s]
+    except KeyError:
+        pass
+    t = s.lower() # convert to lower
+    t = t.title() # uppercase each word
+    t = t + ' '   # add a trailing space so we can find these abbreviated
                   # words throughout the string
-    t = s.replace(", ,", ",")
-    t = t.replace("  ", " ")
-    t = t.replace("/", " @")
-    t = t.replace("/", " @") # might be two slashes in the input
-    t = t.replace(",", " !")
-    t = t.replace("-", " #")
-    t = t.replace("Aca ", "Academic ")
-    t = t.replace("Act ", "Acting ")
-    t = t.replace("Advanc ", "Advanced ")
-    t = t.replace("Adv ", "Advisory ")
-    t = t.replace("Agric ", "Agricultural ")
-    t = t.replace("Alumn Aff ", "Alumni Affairs ")
-    t = t.replace("Anal", "Analyst")
-    t = t.replace("Ass", "Assistant")
-    t = t.replace("Ast #R ", "Research Assistant ")
-    t = t.replace("Ast #G ", "Grading Assistant ")
-    t = t.replace("Ast #T ", "Teaching Assistant ")
-    t = t.replace("Ast ", "Assistant ")
-    t = t.replace("Affl ", "Affiliate ")
-    t = t.replace("Aso ", "Associate ")
-    t = t.replace("Asoc ", "Associate ")
-    t = t.replace("Assoc ", "Associate ")
-    t = t.replace("Bio ", "Biological ")
-    t = t.replace("Prof ", "Professor ")
-    t = t.replace("Mstr ", "Master ")
-    t = t.replace("Couns ", "Counselor ")
-    t = t.replace("Adj ", "Adjunct ")
-    t = t.replace("Dist ", "Distinguished ")
-    t = t.replace("Chem", "Chemist")
-    t = t.replace("Chr ", "Chair ")
-    t = t.replace("Cio ", "Chief Information Officer ")
-    t = t.replace("Comm", "Communications")
-    t = t.replace("Coo ", "Chief Operating Officer ")
-    t = t.replace("Coord ", "Coordinator ")
-    t = t.replace("Co ", "Courtesy ")
-    t = t.replace("Clin ", "Clinical ")
-    t = t.replace("Clrk", "Clerk")
-    t = t.replace("Dn ", "Dean ")
-    t = t.replace("Fin", "Financial")
-    t = t.replace("Finan ", "Financial ")
-    t = t.replace("Stu ", "Student ")
-    t = t.replace("Prg ", "Program ")
-    t = t.replace("Dev ", "Development ")
-    t = t.replace("Aff ", "Affiliate ")
-    t = t.replace("Svcs ", "Services ")
-    t = t.replace("Devel ", "Development ")
-    t = t.replace("Tech ", "Technician ")
-    t = t.replace("Progs ", "Programs ")
-    t = t.replace("Facil ", "Facility ")
-    t = t.replace("Hlt", "Health")
-    t = t.replace("Hlth ", "Health ")
-    t = t.replace("Int ", "Interim ")
-    t = t.replace("Sctst ", "Scientist ")
-    t = t.replace("Supp ", "Support ")
-    t = t.replace("Cty ", "County ")
-    t = t.replace("Ext ", "Extension ")
-    t = t.replace("Emer ", "Emeritus ")
-    t = t.replace("Enforce ", "Enforcement ")
-    t = t.replace("Environ ", "Environmental ")
-    t = t.replace("Gen ", "General ")
-    t = t.replace("Grd", "Graduate")
-    t = t.replace("Jnt ", "Joint ")
-    t = t.replace("Jr", "Junior")
-    t = t.replace("Eng ", "Engineer ")
-    t = t.replace("Ctr ", "Center ")
-    t = t.replace("Opr ", "Operator ")
-    t = t.replace("Admin ", "Administrative ")
-    t = t.replace("Dis ", "Distinguished ")
-    t = t.replace("Ser ", "Service ")
-    t = t.replace("Rep ", "Representative ")
-    t = t.replace("Radiol ", "Radiology ")
-    t = t.replace("Technol ", "Technologist ")
-    t = t.replace("Pres ", "President ")
-    t = t.replace("Pres5 ", "President 5 ")
-    t = t.replace("Pres6 ", "President 6 ")
-    t = t.replace("Emin ", "Eminent ")
-    t = t.replace("Cfo ", "Chief Financial Officer ")
-    t = t.replace("Prov ", "Provisional ")
-    t = t.replace("Adm ", "Administrator ")
-    t = t.replace("Info ", "Information ")
-    t = t.replace("It ", "Information Technology ")
-    t = t.replace("Mgr ", "Manager ")
-    t = t.replace("Mgt ", "Management ")
-    t = t.replace("Vis ", "Visiting ")
-    t = t.replace("Phas ", "Phased ")
-    t = t.replace("Prog ", "Programmer ")
-    t = t.replace("Pract ", "Practitioner ")
-    t = t.replace("Registr ", "Registration ")
-    t = t.replace("Rsch ", "Research ")
-    t = t.replace("Rsrh ", "Research ")
-    t = t.replace("Ret ", "Retirement ")
-    t = t.replace("Sch ", "School ")
-    t = t.replace("Sci ", "Scientist ")
-    t = t.replace("Svcs ", "Services ")
-    t = t.replace("Serv ", "Service ")
-    t = t.replace("Tch ", "Teaching ")
-    t = t.replace("Tele ", "Telecommunications ")
-    t = t.replace("Tv ", "TV ")
-    t = t.replace("Univ ", "University ")
-    t = t.replace("Educ ", "Education ")
-    t = t.replace("Crd ", "Coordinator ")
-    t = t.replace("Res ", "Research ")
-    t = t.replace("Dir ", "Director ")
-    t = t.replace("Pky ", "PK Yonge ")
-    t = t.replace("Rcv ", "Receiving ")
-    t = t.replace("Sr ", "Senior ")
-    t = t.replace("Spec ", "Specialist ")
-    t = t.replace("Spc ", "Specialist ")
-    t = t.replace("Spv ", "Supervisor ")
-    t = t.replace("Supv ", "Supervisor ")
-    t = t.replace("Supt ", "Superintendant ")
-    t = t.replace("Stud", "Student")
-    t = t.replace("Pky ", "P. K. Yonge ")
-    t = t.replace("Ii ", "II ")
-    t = t.replace("Iii ", "III ")
-    t = t.replace("Iv ", "IV ")
-    t = t.replace("Communic ", "Communications ")
-    t = t.replace("Postdoc ", "Postdoctoral ")
-    t = t.replace("Tech ", "Technician ")
-    t = t.replace("Vp ", "Vice President ")
-    t = t.replace(" @", "/") # restore /
-    t = t.replace(" @", "/")
-    t = t.replace(" !", ",") # restore ,
-    t = t.replace(" #", "-") # restore -
-    return t[:-1] # Take off the trailing space
+    for (old, new) in JOBCODE_RULES:
+        if old in t:
+            t = t.replace(old, new)
+    t = t[:-1] # Take off the trailing space
+    if len(jobcode_descriptions) > 100000:
+        jobcode_descriptions.clear()
+    jobcode_descriptions[s] = t
+    return t
+
+
+def improve_jobcode_descriptions(descriptions):
+    """
+    Given any iterable of job titles, return a list of the improved titles,
+    in the same order
+    """
+    return [improve_jobcode_description(s) for s in descriptions]
 
 
 def get_position_uris(person_uri):
@@ -312,7 +350,12 @@ def get_position_uris(person_uri):
     Given a person_uri, return a list of the position_uris for that
     person.  If none, return an empty list
     """
-    from vivofoundation import vivo_sparql_query
+    if snapshot is not None:
+        from vivofoundation import untag_predicate
+        position = untag_predicate('vivo:Position')
+        return sorted(set([o['value'] for o in snapshot.objects(person_uri,
+            untag_predicate('vivo:personInPosition'))
+            if position in snapshot.types(o['value'])]))
     position_uris = []
     query = """
     #  Return the uri of positions for a person
@@ -323,334 +366,3099 @@ def get_position_uris(person_uri):
         ?position_uri rdf:type vivo:Position .
     }
     group by ?position_uri
+    order by ?position_uri
     """
     query = query.replace('person_uri', person_uri)
-    result = vivo_sparql_query(query)
-    try:
-        count = len(result["results"]["bindings"])
-    except:
-        count = 0
-    i = 0
-    while i < count:
-        b = result["results"]["bindings"][i]
+    for b in sparql_bindings(query):
         position_uris.append(b['position_uri']['value'])
-        i = i + 1
     return position_uris
 
-def get_telephone(telephone_uri):
+def get_degree_uris(person_uri):
     """
-    Given the uri of a telephone number, return the uri, number and type
+    Given a person_uri, return a list of the uris of the person's degrees
+    (educational training).  If none, return an empty list
+    """
+    if snapshot is not None:
+        from vivofoundation import untag_predicate
+        return sorted(set([o['value'] for o in snapshot.objects(person_uri,
+            untag_predicate('vivo:educationalTraining'))]))
+    degree_uris = []
+    query = """
+    #  Return the uri of degrees for a person
+
+    SELECT ?degree_uri
+      WHERE {
+        <person_uri> vivo:educationalTraining ?degree_uri .
+    }
+    group by ?degree_uri
+    order by ?degree_uri
+    """
+    query = query.replace('person_uri', person_uri)
+    for b in sparql_bindings(query):
+        degree_uris.append(b['degree_uri']['value'])
+    return degree_uris
+
+# Objects in use.  A cache, snapshot, index, transport, allocator or
+# instrumentation is put in use by its set_ function, which keeps it in a
+# global and returns the one in use before.  Each is also put in use for a
+# block with
+#
+#     with obj:
+#         ...
+#
+# which puts back whatever was in use before once the block is done.
+
+class InUse(object):
+    """
+    An object put in use by the set_ function named by setter, for the
+    duration of a with block
+    """
+    setter = None
+
+    def __enter__(self):
+        previous = self.__dict__.setdefault('previous', [])
+        previous.append(globals()[self.setter](self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        globals()[self.setter](self.previous.pop())
+        return False
+
+def swap_global(name, value):
+    """
+    Set the global name of vivopeople to value.  Return the value it had
+    """
+    module = globals()
+    previous = module[name]
+    module[name] = value
+    return previous
+
+# Reading from VIVO.  The readers get triples, types, values, organizations
+# and datetime intervals through the read_ functions below rather than
+# from vivofoundation directly.  Every query goes through read_query.  When
+# a TripleCache is in use, each is read from VIVO once and then served from
+# the cache.
+
+triple_cache = None
+
+class TripleCache(InUse):
+    """
+    A cache of what the readers have read from VIVO, keyed by uri.  The
+    least recently used entries are dropped once the cache holds max_size
+    entries.  If ttl is given, entries older than ttl seconds are read
+    again.
+
+    Entries are shared by every reader that reads them, so they are read
+    only.  Readers copy what they keep of an entry, such as a datetime
+    interval, into the records they return.
+
+    Use the cache for the duration of a run with
+
+        with TripleCache() as cache:
+            ...
+
+    or for the rest of the program with set_triple_cache(TripleCache()).
+    Once RDF has been written to VIVO, invalidate the uris it changed with
+    cache.invalidate(uris)
+    """
+    setter = 'set_triple_cache'
+
+    def __init__(self, max_size=100000, ttl=None):
+        from collections import OrderedDict
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.keys_for_uri = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Return [True, value] if key is in the cache, [False, None] if not
+        """
+        import time
+        with self.lock:
+            try:
+                (value, stored) = self.entries.pop(key)
+            except KeyError:
+                self.misses = self.misses + 1
+                return [False, None]
+            if self.ttl is not None and time.time() - stored > self.ttl:
+                self.forget(key)
+                self.misses = self.misses + 1
+                return [False, None]
+            self.entries[key] = (value, stored)  # most recently used
+            self.hits = self.hits + 1
+            return [True, value]
+
+    def put(self, key, value):
+        import time
+        with self.lock:
+            if key in self.entries:
+                del self.entries[key]
+            self.entries[key] = (value, time.time())
+            self.keys_for_uri.setdefault(key[1], set()).add(key)
+            while len(self.entries) > self.max_size:
+                (old_key, old_value) = self.entries.popitem(last=False)
+                self.forget(old_key)
+
+    def forget(self, key):
+        """
+        Remove key from the uri index.  Caller holds the lock
+        """
+        self.entries.pop(key, None)
+        keys = self.keys_for_uri.get(key[1], None)
+        if keys is not None:
+            keys.discard(key)
+            if len(keys) == 0:
+                del self.keys_for_uri[key[1]]
+
+    def invalidate(self, uris=None):
+        """
+        Drop everything cached for each of the uris.  With no uris, empty
+        the cache
+        """
+        with self.lock:
+            if uris is None:
+                self.entries.clear()
+                self.keys_for_uri.clear()
+                return
+            for uri in uris:
+                for key in list(self.keys_for_uri.get(uri, [])):
+                    self.forget(key)
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits,
+                'misses': self.misses}
+
+def set_triple_cache(cache):
+    """
+    Use cache for all reads from VIVO.  None stops caching.  Return the
+    cache that was in use
+    """
+    return swap_global('triple_cache', cache)
+
+def invalidate_triple_cache(uris=None):
+    """
+    Drop the given uris, or everything, from the cache in use, if any
+    """
+    if triple_cache is not None:
+        triple_cache.invalidate(uris)
+
+def cached_read(key, function, *args):
     """
-    from vivofoundation import get_triples
-    telephone = {'telephone_uri':telephone_uri}
-    type = ""
-    triples = get_triples(telephone_uri)
+    Return the value cached for key, or call function(*args) and cache
+    the result
+    """
+    cache = triple_cache
+    if cache is None:
+        return function(*args)
+    [found, value] = cache.get(key)
+    if not found:
+        value = function(*args)
+        cache.put(key, value)
+    return value
+
+def read_query(query):
+    """
+    Run a SPARQL query against VIVO and return the result, in the form
+    returned by vivo_sparql_query.  The query is sent by the transport in
+    use, or by vivo_sparql_query if there is none, and counted by the
+    instrumentation in use
+    """
+    current = transport
+    if current is None:
+        from vivofoundation import vivo_sparql_query
+        result = vivo_sparql_query(query)
+    else:
+        result = current.query(query)
+    counter = instrumentation
+    if counter is not None:
+        counter.query()
+    return result
+
+def sparql_bindings(query, page_size=10000):
+    """
+    Given a SPARQL SELECT query, yield its bindings one at a time.  The
+    query is run a page at a time, page_size bindings per page, using LIMIT
+    and OFFSET, so that no more than one page of results is held in memory
+    however large the result.  The query must ORDER BY every variable it
+    selects, so that VIVO returns the bindings in the same order for every
+    page and no binding is skipped or repeated between pages.  A page that
+    is not a SELECT result raises ValueError, rather than ending the
+    results early
+    """
+    offset = 0
+    while True:
+        result = read_query(query + """
+    LIMIT """ + str(page_size) + " OFFSET " + str(offset))
+        try:
+            bindings = result["results"]["bindings"]
+        except (KeyError, TypeError):
+            raise ValueError("Not a SPARQL SELECT result at offset " +
+                             str(offset) + ": " + repr(result)[:200])
+        result = None
+        for b in bindings:
+            yield b
+        if len(bindings) < page_size:
+            break
+        bindings = None
+        offset = offset + page_size
+
+def query_triples(uri):
+    """
+    Return the triples of uri, in the form returned by get_triples
+    """
+    query = """
+    #  Return the triples of an entity
+
+    SELECT ?p ?o
+      WHERE {
+        <entity_uri> ?p ?o .
+    }
+    """
+    return read_query(query.replace('entity_uri', uri))
+
+def query_types(uri):
+    """
+    Return the list of types of uri, as get_types does
+    """
+    query = """
+    #  Return the types of an entity
+
+    SELECT ?type
+      WHERE {
+        <entity_uri> rdf:type ?type .
+    }
+    """
+    result = read_query(query.replace('entity_uri', uri))
     try:
-        count = len(triples["results"]["bindings"])
-    except:
+        return [b['type']['value'] for b in result["results"]["bindings"]]
+    except KeyError:
+        return []
+
+def query_value(uri, predicate):
+    """
+    Return a value of the tagged predicate for uri, or None, as
+    get_vivo_value does
+    """
+    query = """
+    #  Return the values of a predicate of an entity
+
+    SELECT ?o
+      WHERE {
+        <entity_uri> tagged_predicate ?o .
+    }
+    """
+    query = query.replace('entity_uri', uri)
+    query = query.replace('tagged_predicate', predicate)
+    result = read_query(query)
+    try:
+        return result["results"]["bindings"][0]['o']['value']
+    except (KeyError, IndexError):
+        return None
+
+def read_triples(uri):
+    """
+    Return the triples of uri, in the form returned by get_triples
+    """
+    if snapshot is not None:
+        return snapshot.triples(uri)
+    return cached_read(('triples', uri), query_triples, uri)
+
+def read_types(uri):
+    """
+    Return the list of types of uri
+    """
+    if snapshot is not None:
+        return snapshot.types(uri)
+    return cached_read(('types', uri), query_types, uri)
+
+def read_value(uri, predicate):
+    """
+    Return a value of the tagged predicate for uri
+    """
+    if snapshot is not None:
+        return snapshot.value(uri, predicate)
+    return cached_read(('value', uri, predicate), query_value, uri,
+                       predicate)
+
+def read_organization(uri):
+    """
+    Return the organization at uri, as returned by get_organization.  From
+    a snapshot or a transport, the organization has only its uri and label
+    """
+    from vivofoundation import get_organization
+    if snapshot is not None:
+        return snapshot.organization(uri)
+    if transport is not None:
+        return make_organization(uri, read_value(uri, 'rdfs:label'))
+    return cached_read(('organization', uri), get_organization, uri)
+
+def make_organization(organization_uri, label):
+    """
+    Return the organization at organization_uri with label:  its uri, and
+    its label if it has one
+    """
+    organization = {'organization_uri': organization_uri}
+    if label is not None:
+        organization['label'] = label
+    return organization
+
+def read_datetime_interval(uri):
+    """
+    Return the datetime interval at uri, as returned by
+    get_datetime_interval.  From a snapshot or a transport, the interval
+    is made from its triples by make_datetime_interval
+    """
+    from vivofoundation import get_datetime_interval
+    if snapshot is not None:
+        return make_datetime_interval(uri, snapshot)
+    if transport is None:
+        return cached_read(('datetime_interval', uri), get_datetime_interval,
+                           uri)
+    triples_for = {uri: read_triples(uri)}
+    for value_uri in make_datetime_interval_values(triples_for[uri]).values():
+        triples_for[value_uri] = read_triples(value_uri)
+    return make_datetime_interval(uri, triples_for)
+
+# Offline snapshots.  A Snapshot holds the people, vcard, position, degree
+# and datetime interval subgraph of VIVO in memory, read once from an
+# N-Triples file or from VIVO.  While a snapshot is in use, the read_
+# functions, and so every get_ reader, answer from the snapshot and send
+# nothing to VIVO.
+
+snapshot = None
+
+VIVO_SPARQL = "http://sparql.vivo.ufl.edu:3030/VIVO/sparql"
+
+SNAPSHOT_TYPES = ['foaf:Person', 'foaf:Organization', 'vivo:Position',
+                  'vivo:EducationalTraining', 'vivo:AcademicDegree',
+                  'vivo:DateTimeInterval', 'vivo:DateTimeValue',
+                  'vcard:Individual', 'vcard:Name', 'vcard:Title',
+                  'vcard:Telephone', 'vcard:Email']
+
+NTRIPLE = re.compile(r'^(<[^>]*>|_:\S+)\s+<([^>]*)>\s+' +
+                     r'(<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"' +
+                     r'(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?)\s*\.\s*$')
+NTRIPLE_ESCAPE = re.compile(r'\\(?:u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)')
+NTRIPLE_ESCAPES = {'t': u'\t', 'b': u'\b', 'n': u'\n', 'r': u'\r',
+                   'f': u'\f', '"': u'"', "'": u"'", '\\': u'\\'}
+
+def ntriples_unescape(match):
+    """
+    Return the character for an escape in an N-Triples literal
+    """
+    escape = match.group(0)
+    if escape[1] in 'uU':
+        code = int(escape[2:], 16)
+        try:
+            return unichr(code)
+        except ValueError:  # narrow python build
+            return ('\\U%08x' % code).decode('unicode-escape')
+    return NTRIPLE_ESCAPES.get(escape[1], escape)
+
+class Snapshot(InUse):
+    """
+    An in-memory index of VIVO triples, subject to predicate to objects,
+    for running the readers offline.  Load it from an N-Triples file with
+    load(filename), or from VIVO with load_vivo(), then use it for a run
+    with
+
+        with snapshot:
+            people = [get_person(uri) for uri in person_uris]
+
+    or for the rest of the program with set_snapshot(snapshot).  The
+    snapshot is not updated by writes to VIVO.
+    """
+    setter = 'set_snapshot'
+
+    def __init__(self, filename=None):
+        self.subjects = {}
+        self.terms = {}
+        if filename is not None:
+            self.load(filename)
+
+    def __len__(self):
+        return sum([len(objects) for predicates in self.subjects.values()
+                    for objects in predicates.values()])
+
+    def __contains__(self, uri):
+        return uri in self.subjects
+
+    def __getitem__(self, uri):
+        return self.triples(uri)
+
+    def get(self, uri, default=None):
+        if uri not in self.subjects:
+            return default
+        return self.triples(uri)
+
+    def term(self, binding):
+        """
+        Return a shared copy of a uri binding, so each uri is held once
+        """
+        if binding['type'] != 'uri':
+            return binding
+        return self.terms.setdefault(binding['value'], binding)
+
+    def add(self, s, p, o):
+        """
+        Add the triple s p o.  s and p are uris.  o is a binding in the
+        form returned by vivo_sparql_query
+        """
+        predicates = self.subjects.setdefault(s, {})
+        objects = predicates.setdefault(p, [])
+        o = self.term(o)
+        if o not in objects:
+            objects.append(o)
+
+    def load(self, filename):
+        """
+        Add the triples of an N-Triples file.  Return the number of
+        triples read
+        """
+        import codecs
+        with codecs.open(filename, 'r', 'utf-8') as f:
+            return self.load_lines(f)
+
+    def load_lines(self, lines):
+        """
+        Add the triples of lines of N-Triples.  Return the number of
+        triples read
+        """
         count = 0
-    i = 0
-    while i < count:
-        b = triples["results"]["bindings"][i]
-        p = b['p']['value']
-        o = b['o']['value']
-        if p == "http://www.w3.org/2006/vcard/ns#telephone":
-            telephone['telephone_number'] = o
-        if p == "http://www.w3.org/1999/02/22-rdf-syntax-ns#type":
-            if o.startswith('http://www.w3.org/2006/vcard'):
-                ptype = o[32:]
-                if type == "" or type == "Telephone" and ptype == "Fax" \
-                    or ptype == "Telephone":
-                    type = ptype
-        i = i + 1
-    telephone['telephone_type'] = type
-    return telephone
+        for line in lines:
+            line = line.strip()
+            if line == "" or line.startswith('#'):
+                continue
+            match = NTRIPLE.match(line)
+            if match is None:
+                raise ValueError("Not an N-Triples line: " + line)
+            (s, p, o) = match.groups()
+            if s.startswith('<'):
+                s = s[1:-1]
+            else:
+                s = s[2:]
+            if o.startswith('<'):
+                o = {'type': 'uri', 'value': o[1:-1]}
+            elif o.startswith('_:'):
+                o = {'type': 'bnode', 'value': o[2:]}
+            else:
+                end = o.rindex('"')
+                binding = {'type': 'literal', 'value':
+                    NTRIPLE_ESCAPE.sub(ntriples_unescape, o[1:end])}
+                if o[end+1:end+2] == '@':
+                    binding['xml:lang'] = o[end+2:]
+                elif o[end+1:end+3] == '^^':
+                    binding['datatype'] = o[end+4:-1]
+                o = binding
+            self.add(s, p, o)
+            count = count + 1
+        return count
+
+    def load_vivo(self, sparql=None):
+        """
+        Add the people, vcard, position, degree and datetime interval
+        subgraph of VIVO.  The subgraph is read with one CONSTRUCT query,
+        returned as N-Triples and added a line at a time as it arrives.
+        sparql is the SparqlTransport to use, by default the transport in
+        use if it is one, else a SparqlTransport for VIVO_SPARQL.  Return
+        the number of triples read
+        """
+        query = """
+        #  Return the triples of the entities the readers read
+
+        CONSTRUCT { ?s ?p ?o }
+          WHERE {
+            VALUES ?type { snapshot_types }
+            ?s rdf:type ?type .
+            ?s ?p ?o .
+        }"""
+        query = query.replace('snapshot_types', " ".join(SNAPSHOT_TYPES))
+        if sparql is None:
+            sparql = transport
+            if not isinstance(sparql, SparqlTransport):
+                sparql = SparqlTransport(VIVO_SPARQL)
+        return self.load_lines(sparql.lines(query))
+
+    def objects(self, uri, predicate):
+        """
+        Return the list of object bindings of the full predicate uri for uri
+        """
+        return self.subjects.get(uri, {}).get(predicate, [])
+
+    def triples(self, uri):
+        """
+        Return the triples of uri, in the form returned by get_triples
+        """
+        bindings = []
+        for p, objects in self.subjects.get(uri, {}).items():
+            p = self.terms.setdefault(p, {'type': 'uri', 'value': p})
+            for o in objects:
+                bindings.append({'p': p, 'o': o})
+        return {"results": {"bindings": bindings}}
+
+    def types(self, uri):
+        """
+        Return the list of types of uri
+        """
+        return [o['value'] for o in self.objects(uri,
+            "http://www.w3.org/1999/02/22-rdf-syntax-ns#type")]
+
+    def value(self, uri, predicate):
+        """
+        Return a value of the tagged predicate for uri, or None
+        """
+        from vivofoundation import untag_predicate
+        objects = self.objects(uri, untag_predicate(predicate))
+        if len(objects) == 0:
+            return None
+        return objects[0]['value']
+
+    def organization(self, uri):
+        """
+        Return the organization at uri:  its uri and label
+        """
+        return make_organization(uri, self.value(uri, 'rdfs:label'))
+
+def set_snapshot(new_snapshot):
+    """
+    Answer all reads from new_snapshot rather than VIVO.  None reads from
+    VIVO again.  Return the snapshot that was in use
+    """
+    return swap_global('snapshot', new_snapshot)
+
+# Transport.  vivofoundation.vivo_sparql_query opens a new connection to
+# VIVO for every query.  A SparqlTransport keeps a pool of open
+# connections, asks for gzipped results and is safe to share between
+# threads.  A RecordingTransport records queries and results, and a
+# ReplayTransport answers from a recording without VIVO, for tests and
+# benchmarks.  While a transport is in use, read_query sends every query
+# vivopeople makes through it.  vivofoundation itself is left alone.
+
+transport = None
+
+class SparqlTransport(InUse):
+    """
+    Sends SPARQL queries to the VIVO SPARQL endpoint at url over a pool of
+    up to connections keep-alive connections, for example
+
+        with SparqlTransport('http://sparql.vivo.ufl.edu:3030/VIVO/sparql'):
+            person = get_person(person_uri)
+
+    or for the rest of the program with set_transport(transport).  The
+    prefixes of NAMESPACES are added to each query.  If email and password
+    are given they are sent with each query, as the VIVO SPARQL query API
+    requires.  timeout is in seconds
+    """
+    setter = 'set_transport'
+
+    def __init__(self, url, email=None, password=None, connections=8,
+                 timeout=60, gzip=True,
+                 format='application/sparql-results+json'):
+        from urlparse import urlparse
+        self.url = url
+        self.parts = urlparse(url)
+        self.email = email
+        self.password = password
+        self.timeout = timeout
+        self.gzip = gzip
+        self.format = format
+        self.slots = threading.BoundedSemaphore(connections)
+        self.idle = []
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+
+    def query(self, query, debug=False):
+        """
+        Run a SPARQL query and return the result, in the form returned by
+        vivo_sparql_query
+        """
+        import json
+        text = self.post(sparql_prefixes() + query)
+        if debug:
+            print query, text[0:1000]
+        return json.loads(text)
+
+    def post(self, query):
+        """
+        Post a query and return the text of the response.  A connection
+        that VIVO has closed since its last use is opened again once
+        """
+        import httplib
+        import socket
+        import zlib
+        [path, body, headers] = self.request(query, self.format)
+        with self.slots:
+            [connection, reused] = self.connection()
+            try:
+                try:
+                    connection.request('POST', path, body, headers)
+                    response = connection.getresponse()
+                except (httplib.HTTPException, socket.error):
+                    if not reused:
+                        raise
+                    connection.close()
+                    [connection, reused] = self.connection(reuse=False)
+                    connection.request('POST', path, body, headers)
+                    response = connection.getresponse()
+                text = response.read()
+            except:
+                connection.close()
+                raise
+            received(len(text))
+            with self.lock:
+                self.requests = self.requests + 1
+                if not response.will_close:
+                    self.idle.append(connection)
+            if response.will_close:
+                connection.close()
+        if response.getheader('Content-Encoding', '') == 'gzip':
+            text = zlib.decompress(text, 16 + zlib.MAX_WBITS)
+        if response.status != 200:
+            raise IOError("SPARQL query failed: " + str(response.status) +
+                          " " + response.reason + " " + text[0:1000])
+        return text
+
+    def request(self, query, format):
+        """
+        Return [path, body, headers] of the POST for query, asking for
+        results in format
+        """
+        import urllib
+        form = {'query': query.encode('utf-8') if isinstance(query, unicode)
+                else query}
+        if self.email is not None:
+            form['email'] = self.email
+            form['password'] = self.password
+        body = urllib.urlencode(form)
+        headers = {'Content-Type': 'application/x-www-form-urlencoded',
+                   'Accept': format,
+                   'Connection': 'keep-alive'}
+        if self.gzip:
+            headers['Accept-Encoding'] = 'gzip'
+        path = self.parts.path
+        if self.parts.query:
+            path = path + '?' + self.parts.query
+        return [path, body, headers]
+
+    def lines(self, query, format='application/n-triples', size=65536):
+        """
+        Post a CONSTRUCT query and yield the lines of the response, decoded
+        from utf-8, as they arrive, so that a large result is never held in
+        memory.  The query has a connection of its own, closed at the end
+        """
+        import zlib
+        [path, body, headers] = self.request(sparql_prefixes() + query,
+                                             format)
+        with self.slots:
+            [connection, reused] = self.connection(reuse=False)
+            try:
+                connection.request('POST', path, body, headers)
+                response = connection.getresponse()
+                with self.lock:
+                    self.requests = self.requests + 1
+                if response.status != 200:
+                    raise IOError("SPARQL query failed: " +
+                                  str(response.status) + " " +
+                                  response.reason)
+                decompress = None
+                if response.getheader('Content-Encoding', '') == 'gzip':
+                    decompress = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                rest = ''
+                while True:
+                    text = response.read(size)
+                    if text == '':
+                        break
+                    received(len(text))
+                    if decompress is not None:
+                        text = decompress.decompress(text)
+                    lines = (rest + text).split('\n')
+                    rest = lines.pop()
+                    for line in lines:
+                        yield line.decode('utf-8')
+                if rest != '':
+                    yield rest.decode('utf-8')
+            finally:
+                connection.close()
+
+    def connection(self, reuse=True):
+        """
+        Return [connection, reused], an idle connection from the pool or a
+        new one.  Caller holds a slot
+        """
+        import httplib
+        with self.lock:
+            if reuse and len(self.idle) > 0:
+                return [self.idle.pop(), True]
+            self.opened = self.opened + 1
+        if self.parts.scheme == 'https':
+            connection = httplib.HTTPSConnection(self.parts.netloc,
+                                                 timeout=self.timeout)
+        else:
+            connection = httplib.HTTPConnection(self.parts.netloc,
+                                                timeout=self.timeout)
+        return [connection, False]
+
+    def close(self):
+        """
+        Close the idle connections
+        """
+        with self.lock:
+            for connection in self.idle:
+                connection.close()
+            self.idle = []
+
+    def stats(self):
+        return {'requests': self.requests, 'opened': self.opened,
+                'idle': len(self.idle)}
+
+class RecordingTransport(InUse):
+    """
+    Runs queries through transport, or through vivo_sparql_query if
+    transport is None, and records each query and its result in filename,
+    one JSON object per line.  Each query is recorded once:  queries
+    already in filename, from an earlier run or another process, are not
+    recorded again.  Use it like any transport
+
+        with RecordingTransport('recording.jsonl'):
+            person = get_person(person_uri)
+
+    and replay the recording later with ReplayTransport
+    """
+    setter = 'set_transport'
+
+    def __init__(self, filename, transport=None):
+        import json
+        import os
+        self.filename = filename
+        self.transport = transport
+        self.recorded = set()
+        if os.path.exists(filename):
+            with open(filename) as f:
+                for line in f:
+                    self.recorded.add(json.loads(line)['query'])
+        self.file = open(filename, 'a')
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def query(self, query, debug=False):
+        import json
+        if self.transport is None:
+            from vivofoundation import vivo_sparql_query
+            result = vivo_sparql_query(query, debug=debug)
+        else:
+            result = self.transport.query(query, debug)
+        with self.lock:
+            self.requests = self.requests + 1
+            if query not in self.recorded:
+                self.recorded.add(query)
+                self.file.write(json.dumps({'query': query,
+                                            'result': result}) + '\n')
+                self.file.flush()
+        return result
+
+    def close(self):
+        self.file.close()
+
+    def stats(self):
+        return {'requests': self.requests, 'recorded': len(self.recorded)}
+
+class ReplayTransport(InUse):
+    """
+    Answers queries from a recording made by RecordingTransport, without
+    VIVO.  Each answer waits latency seconds first, to stand in for the
+    network.  A query that was not recorded raises KeyError, unless strict
+    is False, when it has no results.  A query recorded more than once is
+    loaded once
+    """
+    setter = 'set_transport'
+
+    def __init__(self, filename, latency=0.0, strict=True):
+        import json
+        self.filename = filename
+        self.latency = latency
+        self.strict = strict
+        self.results = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.missed = 0
+        with open(filename) as f:
+            for line in f:
+                entry = json.loads(line)
+                self.results[entry['query']] = json.dumps(entry['result'])
+
+    def query(self, query, debug=False):
+        import json
+        import time
+        with self.lock:
+            self.requests = self.requests + 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        text = self.results.get(query, None)
+        if text is None:
+            if self.strict:
+                raise KeyError("Query was not recorded: " + query)
+            with self.lock:
+                self.missed = self.missed + 1
+            return {'head': {'vars': []}, 'results': {'bindings': []}}
+        received(len(text))
+        return json.loads(text)
+
+    def stats(self):
+        return {'requests': self.requests, 'missed': self.missed,
+                'recorded': len(self.results)}
+
+def sparql_prefixes():
+    """
+    Return the SPARQL PREFIX declarations for NAMESPACES
+    """
+    return "".join(['PREFIX ' + prefix + ': <' + uri + '>\n'
+                    for prefix, uri in sorted(NAMESPACES.items())])
+
+def set_transport(new_transport):
+    """
+    Send all queries through new_transport.  None sends them through
+    vivo_sparql_query again.  Return the transport that was in use
+    """
+    return swap_global('transport', new_transport)
+
+# Instrumentation.  While instrumentation is in use, the readers and
+# writers named in INSTRUMENTED are wrapped, so each call is timed and the
+# queries it sends, and the bytes they return, are counted.  With no
+# instrumentation in use, nothing is wrapped and nothing is paid.  Counts
+# are inclusive -- a query sent by get_name is counted for get_name and for
+# the get_vcard and get_person that called it on the same thread.  Bytes
+# are those of the response bodies, as received by the transport in use;
+# with no transport in use, they are not counted.  Latencies are kept in
+# histograms with power of two buckets in milliseconds.  The report can be
+# written as JSON at the end of a run.  Calls made through names imported
+# before instrumentation was put in use, with from vivopeople import, are
+# not wrapped; call them through the module to have them timed.
+
+instrumentation = None
+
+def latency_bucket(seconds):
+    """
+    Return the histogram bucket for a call of seconds.  Buckets are the
+    powers of two from 1/16 of a millisecond, each holding the calls no
+    longer than it
+    """
+    import math
+    milliseconds = seconds * 1000.0
+    if milliseconds <= 0.0625:
+        return 0.0625
+    return 2.0 ** int(math.ceil(math.log(milliseconds, 2)))
+
+class Instrumentation(InUse):
+    """
+    Calls, wall time, queries, bytes received and a latency histogram for
+    each reader and writer of vivopeople, while in use.  Up to max_events
+    values traced by the functions, such as the vcards compared by
+    update_person, are kept for the report.  Queries made by the
+    dereferencing pool are counted for the functions that called deref
+    """
+    setter = 'set_instrumentation'
+
+    def __init__(self, max_events=100):
+        import time
+        self.functions = {}
+        self.events = []
+        self.max_events = max_events
+        self.queries = 0
+        self.bytes = 0
+        self.started = time.time()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def call(self, name, function, args, kwargs):
+        """
+        Call function, recording it under name
+        """
+        import time
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        frame = [0, 0]
+        stack.append(frame)
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.time() - start
+            stack.pop()
+            self.record(name, seconds, frame[0], frame[1])
+
+    def frames(self):
+        """
+        Return the frames of the functions running on this thread
+        """
+        return list(getattr(self.local, 'stack', []))
+
+    def adopt(self, frames):
+        """
+        Count the queries and bytes of this thread for frames, the frames of
+        functions running on another thread, as well as for the functions
+        this thread goes on to run.  Return the frames this thread had
+        """
+        previous = getattr(self.local, 'stack', [])
+        self.local.stack = list(frames)
+        return previous
+
+    def query(self):
+        """
+        Count a query for every function running on this thread
+        """
+        with self.lock:
+            for frame in getattr(self.local, 'stack', []):
+                frame[0] += 1
+            self.queries += 1
+
+    def received(self, size):
+        """
+        Count size bytes received for every function running on this thread
+        """
+        with self.lock:
+            for frame in getattr(self.local, 'stack', []):
+                frame[1] += size
+            self.bytes += size
+
+    def record(self, name, seconds, queries, size):
+        bucket = latency_bucket(seconds)
+        with self.lock:
+            stats = self.functions.get(name, None)
+            if stats is None:
+                stats = {'calls': 0, 'seconds': 0.0, 'queries': 0,
+                         'bytes': 0, 'histogram': {}}
+                self.functions[name] = stats
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['queries'] += queries
+            stats['bytes'] += size
+            stats['histogram'][bucket] = \
+                stats['histogram'].get(bucket, 0) + 1
+
+    def event(self, name, values):
+        with self.lock:
+            if len(self.events) < self.max_events:
+                self.events.append({'function': name, 'values': values})
+
+    def report(self):
+        """
+        Return the run report.  Functions are listed slowest first
+        """
+        import time
+        with self.lock:
+            functions = []
+            for name, stats in self.functions.items():
+                histogram = []
+                for bucket in sorted(stats['histogram']):
+                    histogram.append({'ms': bucket,
+                                      'calls': stats['histogram'][bucket]})
+                functions.append({
+                    'function': name,
+                    'calls': stats['calls'],
+                    'seconds': round(stats['seconds'], 6),
+                    'mean_ms': round(1000.0 * stats['seconds'] /
+                                     stats['calls'], 3),
+                    'queries': stats['queries'],
+                    'bytes': stats['bytes'],
+                    'histogram': histogram})
+            functions.sort(key=lambda x: x['seconds'], reverse=True)
+            return {'seconds': round(time.time() - self.started, 6),
+                    'queries': self.queries,
+                    'bytes': self.bytes,
+                    'functions': functions,
+                    'events': list(self.events)}
+
+    def write(self, filename):
+        """
+        Write the run report to filename as JSON
+        """
+        import json
+        report_file = open(filename, 'w')
+        json.dump(self.report(), report_file, indent=4, default=str)
+        report_file.close()
+
+def set_instrumentation(new_instrumentation):
+    """
+    Record calls and queries in new_instrumentation.  None turns
+    instrumentation off.  The functions of INSTRUMENTED are wrapped while
+    instrumentation is in use.  Return the instrumentation that was in use
+    """
+    previous = swap_global('instrumentation', new_instrumentation)
+    instrument_module(new_instrumentation is not None)
+    return previous
+
+def received(size):
+    """
+    Count size bytes received from VIVO, for the instrumentation in use
+    """
+    counter = instrumentation
+    if counter is not None:
+        counter.received(size)
+
+def trace(name, debug, *values):
+    """
+    Keep values as an event of function name in the run report, if
+    instrumentation is in use.  Print them if debug
+    """
+    current = instrumentation
+    if current is not None:
+        current.event(name, values)
+    if debug:
+        for value in values:
+            print value,
+        print
+
+def instrument(function):
+    """
+    Return function wrapped for instrumentation
+    """
+    import functools
+    name = function.__name__
+
+    @functools.wraps(function)
+    def instrumented(*args, **kwargs):
+        current = instrumentation
+        if current is None:
+            return function(*args, **kwargs)
+        return current.call(name, function, args, kwargs)
+    instrumented.uninstrumented = function
+    return instrumented
+
+INSTRUMENTED = ['get_position_uris', 'get_degree_uris', 'get_telephone',
+                'get_name', 'get_vcard', 'get_person', 'get_triples_for_uris',
+                'get_people', 'get_degree', 'get_position',
+                'get_person_profile', 'prefetch_people', 'get_lazy_people',
+                'get_positions_for_people', 'get_degrees_for_people',
+                'get_datetime_intervals', 'add_position', 'add_vcard',
+                'update_vcard', 'update_position', 'add_person',
+                'update_person', 'update_people', 'apply_hr_deltas',
+                'make_ufid_dictionary', 'find_person']
+
+def instrument_module(on=True):
+    """
+    Wrap the functions of INSTRUMENTED for instrumentation or, if on is
+    False, put back the functions they wrap
+    """
+    module = globals()
+    for name in INSTRUMENTED:
+        function = module[name]
+        wrapped = hasattr(function, 'uninstrumented')
+        if on and not wrapped:
+            module[name] = instrument(function)
+        elif not on and wrapped:
+            module[name] = function.uninstrumented
+
+# Dereferencing.  Readers such as get_vcard dereference several uris, one
+# query each.  With parallel dereferencing on, the queries are run by a
+# shared pool of threads.  However many readers are running, no more than
+# deref_connections queries are sent to VIVO at once.  A reader run by the
+# pool dereferences its own uris one at a time, so the pool never waits on
+# itself.
+
+parallel_deref = False
+deref_workers = 8
+deref_connections = 8
+deref_pool = None
+deref_slots = threading.BoundedSemaphore(deref_connections)
+deref_lock = threading.Lock()
+deref_local = threading.local()
+
+def set_parallel_deref(parallel=True, workers=None, connections=None):
+    """
+    Turn parallel dereferencing on or off for readers that are not told
+    otherwise.  workers is the number of threads in the pool.  connections
+    is the most queries that may be sent to VIVO at once
+    """
+    global parallel_deref, deref_workers, deref_connections, deref_pool, \
+        deref_slots
+    with deref_lock:
+        parallel_deref = parallel
+        if workers is not None and workers != deref_workers:
+            deref_workers = workers
+            if deref_pool is not None:
+                deref_pool.close()
+                deref_pool = None
+        if connections is not None and connections != deref_connections:
+            deref_connections = connections
+            deref_slots = threading.BoundedSemaphore(connections)
+
+def deref_call(call):
+    """
+    Make one dereferencing call on a pool thread, holding one of the
+    connection slots.  Queries are counted for frames, the instrumentation
+    frames of the caller of deref
+    """
+    (function, args, frames) = call
+    current = instrumentation
+    with deref_slots:
+        deref_local.pooled = True
+        if current is not None:
+            previous = current.adopt(frames)
+        try:
+            return function(*args)
+        finally:
+            deref_local.pooled = False
+            if current is not None:
+                current.adopt(previous)
+
+def deref(calls, parallel=None):
+    """
+    Given a list of (function, args) calls, make each call and return a list
+    of the results, in the order of the calls.  If parallel is True, the
+    calls are made concurrently by the dereferencing pool.  If parallel is
+    None, the setting from set_parallel_deref is used.  Calls made from a
+    pool thread are always made one at a time
+    """
+    global deref_pool
+    if parallel is None:
+        parallel = parallel_deref
+    if not parallel or len(calls) < 2 or \
+            getattr(deref_local, 'pooled', False):
+        return [function(*args) for (function, args) in calls]
+    with deref_lock:
+        if deref_pool is None:
+            from multiprocessing.pool import ThreadPool
+            deref_pool = ThreadPool(deref_workers)
+        pool = deref_pool
+    frames = []
+    current = instrumentation
+    if current is not None:
+        frames = current.frames()
+    return pool.map(deref_call, [(function, args, frames)
+                                 for (function, args) in calls])
+
+# Decoding.  Each reader turns the triples of an entity into a dictionary
+# with a Decoder.  The Decoder is made once, from a table of predicates and
+# the fields they fill, into dictionaries keyed by predicate and by object.
+# Each triple is decoded with a lookup or two, however many fields the
+# table has.
+
+class Decoder(object):
+    """
+    Decode the triples of an entity into a dictionary.  schema is a list of
+    (predicate, field, rule).  rule is 'single' to keep the last value of
+    the predicate in field, 'multi' to keep the list of its values in
+    field, or a function called with the dictionary and each value.
+    objects is a list of (object, field).  A triple with one of the objects,
+    whatever its predicate, has the object kept in field
+    """
+    def __init__(self, schema, objects=None):
+        self.predicates = {}
+        self.lists = []
+        for (predicate, field, rule) in schema:
+            if rule == 'multi':
+                self.lists.append(field)
+            self.predicates.setdefault(intern(predicate), []).append(
+                (field, rule))
+        for predicate in self.predicates:
+            self.predicates[predicate] = tuple(self.predicates[predicate])
+        self.objects = {}
+        if objects is not None:
+            for (value, field) in objects:
+                self.objects[intern(value)] = field
+
+    def decode(self, triples, record=None):
+        """
+        Decode triples, as returned by get_triples, into record.  Return
+        the record
+        """
+        if record is None:
+            record = {}
+        for field in self.lists:
+            record[field] = []
+        try:
+            bindings = triples["results"]["bindings"]
+        except (KeyError, TypeError):
+            bindings = []
+        predicates = self.predicates
+        objects = self.objects
+        for b in bindings:
+            o = b['o']['value']
+            actions = predicates.get(b['p']['value'], None)
+            if actions is not None:
+                for (field, rule) in actions:
+                    if rule == 'single':
+                        record[field] = o
+                    elif rule == 'multi':
+                        record[field].append(o)
+                    else:
+                        rule(record, o)
+            if objects:
+                field = objects.get(o, None)
+                if field is not None:
+                    record[field] = o
+        return record
+
+def get_telephone(telephone_uri):
+    """
+    Given the uri of a telephone number, return the uri, number and type
+    """
+    triples = read_triples(telephone_uri)
+    return make_telephone(telephone_uri, triples)
+
+def decode_telephone_type(telephone, value):
+    """
+    Keep the vcard type of a telephone.  Telephone replaces any type, and
+    Fax replaces Telephone
+    """
+    if value.startswith('http://www.w3.org/2006/vcard'):
+        ptype = value[32:]
+        type = telephone['telephone_type']
+        if type == "" or type == "Telephone" and ptype == "Fax" \
+            or ptype == "Telephone":
+            telephone['telephone_type'] = ptype
+
+TELEPHONE_DECODER = Decoder([
+    ("http://www.w3.org/2006/vcard/ns#telephone", 'telephone_number',
+     'single'),
+    ("http://www.w3.org/1999/02/22-rdf-syntax-ns#type", 'telephone_type',
+     decode_telephone_type)
+    ])
+
+def make_telephone(telephone_uri, triples):
+    """
+    Given the uri of a telephone number and its triples, return the uri,
+    number and type
+    """
+    return TELEPHONE_DECODER.decode(triples, {'telephone_uri': telephone_uri,
+                                              'telephone_type': ""})
+
+def get_name(name_uri):
+    """
+    Given the uri of a vcard name entity, get all the data values
+    associated with the entity
+    """
+    triples = read_triples(name_uri)
+    return make_name(name_uri, triples)
+
+NAME_DECODER = Decoder([
+    ("http://www.w3.org/2006/vcard/ns#givenName", 'given_name', 'single'),
+    ("http://www.w3.org/2006/vcard/ns#familyName", 'family_name', 'single'),
+    ("http://www.w3.org/2006/vcard/ns#additionalName", 'additional_name',
+     'single'),
+    ("http://www.w3.org/2006/vcard/ns#honorificPrefix", 'honorific_prefix',
+     'single'),
+    ("http://www.w3.org/2006/vcard/ns#honorificSuffix", 'honorific_suffix',
+     'single')
+    ])
+
+def make_name(name_uri, triples):
+    """
+    Given the uri of a vcard name entity and its triples, return the data
+    values associated with the entity
+    """
+    return NAME_DECODER.decode(triples, {'name_uri': name_uri})
+
+def get_vcard(vcard_uri, parallel=None):
+    """
+    Given the uri of a vcard, get all the data values and uris associated with
+    the vcard
+
+    If parallel is True, the name, title, telephones and email addresses
+    are dereferenced concurrently.  If parallel is None, the setting
+    from set_parallel_deref is used
+    """
+    triples = read_triples(vcard_uri)
+    vcard = make_vcard(vcard_uri, triples)
+
+    # And now deref each of the uris to get the data values.
+
+    calls = []
+    if 'name_uri' in vcard:
+        calls.append((get_name, (vcard['name_uri'],)))
+    if vcard.get('title_uri', None) is not None:
+        calls.append((read_value, (vcard['title_uri'], 'vcard:title')))
+    for telephone_uri in vcard['telephone_uris']:
+        calls.append((get_telephone, (telephone_uri,)))
+    for email_uri in vcard['email_uris']:
+        calls.append((read_value, (email_uri, "vcard:email")))
+    values = deref(calls, parallel)
+
+    if 'name_uri' in vcard:
+        vcard['name'] = values.pop(0)
+
+    if vcard.get('title_uri', None) is not None:
+        vcard['title'] = values.pop(0)
+
+    vcard['telephones'] = []
+    for telephone_uri in vcard['telephone_uris']:
+        vcard['telephones'].append(values.pop(0))
+    del vcard['telephone_uris']
+
+    vcard['email_addresses'] = []
+    for email_uri in vcard['email_uris']:
+        vcard['email_addresses'].append({
+            'email_uri':email_uri,
+            'email_address':values.pop(0)
+            })
+    del vcard['email_uris']
+    return vcard
+
+VCARD_DECODER = Decoder([
+    ("http://www.w3.org/2006/vcard/ns#hasTitle", 'title_uri', 'single'),
+    ("http://purl.obolibrary.org/obo/ARG_2000029", 'person_uri', 'single'),
+    ("http://www.w3.org/2006/vcard/ns#hasTelephone", 'telephone_uris',
+     'multi'),
+    ("http://www.w3.org/2006/vcard/ns#hasName", 'name_uri', 'single'),
+    ("http://www.w3.org/2006/vcard/ns#hasEmail", 'email_uris', 'multi')
+    ])
+
+def make_vcard(vcard_uri, triples):
+    """
+    Given the uri of a vcard and its triples, return the data values and
+    uris associated with the vcard.  The telephone_uris and email_uris are
+    left on the vcard for the caller to dereference
+    """
+    return VCARD_DECODER.decode(triples, {'vcard_uri': vcard_uri})
+
+def get_person(person_uri, get_contact=True, parallel=None):
+    """
+    Given the URI of a person in VIVO, get the poerson's attributes and
+    return a flat, keyed structure appropriate for update and other
+    applications.
+
+    parallel is passed to get_vcard
+
+    To Do:
+    Add get_grants, get_papers, etc as we had previously
+    """
+    triples = read_triples(person_uri)
+    person = make_person(person_uri, triples)
+
+    # deref the vcard
+
+    if get_contact == True:
+        person['vcard'] = get_vcard(person['vcard_uri'], parallel)
+        
+    return person
+
+PERSON_DECODER = Decoder([
+    ("http://vitro.mannlib.cornell.edu/ns/vitro/0.7#mostSpecificType",
+     'person_type', 'single'),
+    ("http://purl.obolibrary.org/obo/ARG_2000028", 'vcard_uri', 'single'),
+    ("http://www.w3.org/2000/01/rdf-schema#label", 'display_name', 'single'),
+    ("http://vivo.ufl.edu/ontology/vivo-ufl/ufid", 'ufid', 'single'),
+    ("http://vivo.ufl.edu/ontology/vivo-ufl/homeDept", 'homedept_uri',
+     'single'),
+    ("http://vivo.ufl.edu/ontology/vivo-ufl/privacyFlag", 'privacy_flag',
+     'single'),
+    ("http://vivo.ufl.edu/ontology/vivo-ufl/gatorlink", 'gatorlink',
+     'single'),
+    ("http://vivoweb.org/ontology/core#eRACommonsId", 'eracommonsid',
+     'single')
+    ])
+
+def make_person(person_uri, triples):
+    """
+    Given the URI of a person in VIVO and the person's triples, return the
+    flat, keyed structure of the person's direct attributes
+    """
+    return PERSON_DECODER.decode(triples, {'person_uri': person_uri})
+
+def get_triples_for_uris(uris, batch_size=500):
+    """
+    Given a list of uris, return a dictionary keyed by uri.  The value for
+    each uri is its triples in the same form returned by get_triples.
+    Uris are sent to VIVO batch_size at a time, one query per batch, rather
+    than one query per uri.  Uris with no triples have an empty set of
+    bindings.  Uris in the triple cache are not sent at all
+    """
+    query = """
+    #  Return the triples for a batch of subjects
+
+    SELECT ?s ?p ?o
+      WHERE {
+        VALUES ?s { subject_uris }
+        ?s ?p ?o .
+    }
+    """
+    if snapshot is not None:
+        return dict([(uri, snapshot.triples(uri)) for uri in uris
+                     if uri is not None])
+    cache = triple_cache
+    triples_for = {}
+    distinct_uris = []
+    for uri in uris:
+        if uri is None or uri in triples_for:
+            continue
+        if cache is not None:
+            [found, triples] = cache.get(('triples', uri))
+            if found:
+                triples_for[uri] = triples
+                continue
+        triples_for[uri] = {"results": {"bindings": []}}
+        distinct_uris.append(uri)
+    k = 0
+    while k < len(distinct_uris):
+        batch = distinct_uris[k:k+batch_size]
+        batch_query = query.replace('subject_uris',
+            " ".join(['<' + uri + '>' for uri in batch]))
+        result = read_query(batch_query)
+        try:
+            bindings = result["results"]["bindings"]
+        except:
+            bindings = []
+        for b in bindings:
+            triples_for[b['s']['value']]["results"]["bindings"].append(b)
+        k = k + batch_size
+    if cache is not None:
+        for uri in distinct_uris:
+            cache.put(('triples', uri), triples_for[uri])
+    return triples_for
+
+def get_people(person_uris, get_contact=True, batch_size=500,
+               records=False):
+    """
+    Given a list of URIs of people in VIVO, return a list of person
+    structures, in the same order and of the same form as returned by
+    get_person.  If records is True, each person is a PersonRecord.
+
+    Rather than querying VIVO once for the person, once for the vcard and
+    once for each name, title, telephone and email, the people are fetched
+    a batch at a time:  one query for the people, one for their vcards and
+    one for each batch_size of the entities referenced by the vcards.
+    """
+    people = []
+    k = 0
+    while k < len(person_uris):
+        batch = person_uris[k:k+batch_size]
+        triples_for = get_triples_for_uris(batch, batch_size)
+        batch_people = [make_person(person_uri, triples_for[person_uri])
+                        for person_uri in batch]
+        if get_contact == True:
+            vcard_uris = [person['vcard_uri'] for person in batch_people
+                          if 'vcard_uri' in person]
+            triples_for = get_triples_for_uris(vcard_uris, batch_size)
+            vcards = {}
+            entity_uris = []
+            for vcard_uri in vcard_uris:
+                vcard = make_vcard(vcard_uri, triples_for[vcard_uri])
+                vcards[vcard_uri] = vcard
+                entity_uris.extend([vcard.get('name_uri', None),
+                    vcard.get('title_uri', None)] + vcard['telephone_uris'] +
+                    vcard['email_uris'])
+
+            # And now deref all the vcard entities, batch_size at a time
+
+            triples_for = get_triples_for_uris(entity_uris, batch_size)
+            for vcard in vcards.values():
+                deref_vcard(vcard, triples_for)
+            for person in batch_people:
+                if 'vcard_uri' in person:
+                    person['vcard'] = vcards[person['vcard_uri']]
+        if records:
+            batch_people = [PersonRecord(person) for person in batch_people]
+        people.extend(batch_people)
+        k = k + batch_size
+    return people
+
+def deref_vcard(vcard, triples_for):
+    """
+    Given a vcard from make_vcard and a dictionary of triples keyed by uri,
+    as returned by get_triples_for_uris, fill in the name, title,
+    telephones and email addresses of the vcard just as get_vcard does
+    """
+    if 'name_uri' in vcard:
+        vcard['name'] = make_name(vcard['name_uri'],
+                                  triples_for[vcard['name_uri']])
+
+    if vcard.get('title_uri', None) is not None:
+        vcard['title'] = get_triples_value(triples_for[vcard['title_uri']],
+            "http://www.w3.org/2006/vcard/ns#title")
+
+    vcard['telephones'] = []
+    for telephone_uri in vcard['telephone_uris']:
+        vcard['telephones'].append(make_telephone(telephone_uri,
+            triples_for[telephone_uri]))
+    del vcard['telephone_uris']
+
+    vcard['email_addresses'] = []
+    for email_uri in vcard['email_uris']:
+        vcard['email_addresses'].append({
+            'email_uri':email_uri,
+            'email_address':get_triples_value(triples_for[email_uri],
+                "http://www.w3.org/2006/vcard/ns#email")
+            })
+    del vcard['email_uris']
+    return vcard
+
+def get_triples_value(triples, predicate):
+    """
+    Given triples as returned by get_triples and the full uri of a
+    predicate, return the first value of the predicate, or None if the
+    predicate has no value
+    """
+    try:
+        bindings = triples["results"]["bindings"]
+    except:
+        bindings = []
+    for b in bindings:
+        if b['p']['value'] == predicate:
+            return b['o']['value']
+    return None
+
+DEGREE_DECODER = Decoder([
+    ("http://vivoweb.org/ontology/core#majorField", 'major_field', 'single'),
+    ("http://vivoweb.org/ontology/core#degreeEarned", 'earned_uri',
+     'single'),
+    ("http://vivoweb.org/ontology/core#trainingAtOrganization",
+     'training_institution_uri', 'single'),
+    ("http://vivoweb.org/ontology/core#dateTimeInterval", 'dti_uri',
+     'single')
+    ])
+
+def get_degree(degree_uri, parallel=None):
+    """
+    Given a URI, return an object that contains the degree (educational
+    training) it represents
+
+    If parallel is True, the academic degree, the institution and the
+    datetime interval are dereferenced concurrently.  If parallel is None,
+    the setting from set_parallel_deref is used
+    """
+    triples = read_triples(degree_uri)
+    degree = DEGREE_DECODER.decode(triples, {'degree_uri': degree_uri})
+    if parallel is None:
+        parallel = parallel_deref
+    if not parallel:
+        return resolve_degree(degree, read_degree_name, read_organization,
+                              read_datetime_interval)
+
+    # dereference the academic degree, the institution and the datetime
+    # interval concurrently
+
+    calls = []
+    if 'earned_uri' in degree:
+        calls.append((read_degree_name, (degree['earned_uri'],)))
+    if 'training_institution_uri' in degree:
+        calls.append((read_organization,
+                      (degree['training_institution_uri'],)))
+    if 'dti_uri' in degree:
+        calls.append((read_datetime_interval, (degree['dti_uri'],)))
+    values = dict(zip([args[0] for (function, args) in calls],
+                      deref(calls, parallel)))
+    return resolve_degree(degree, values.get, values.get, values.get)
+
+def read_degree_name(earned_uri):
+    """
+    Return the abbreviation of the academic degree at earned_uri
+    """
+    return read_value(earned_uri, 'vivo:abbreviation')
+
+def resolve_degree(degree, get_degree_name, get_organization,
+                   get_datetime_interval):
+    """
+    Given a degree decoded by DEGREE_DECODER, add the name of its academic
+    degree, the name of its institution and its datetime interval
+    """
+    dti_uri = degree.pop('dti_uri', None)
+    if 'earned_uri' in degree:
+        degree['degree_name'] = get_degree_name(degree['earned_uri'])
+    if 'training_institution_uri' in degree:
+        institution = get_organization(degree['training_institution_uri'])
+        if 'label' in institution:  # home department might be incomplete
+            degree['institution_name'] = institution['label']
+    if dti_uri is not None:
+        datetime_interval = dict(get_datetime_interval(dti_uri))
+        degree['datetime_interval'] = datetime_interval
+        if 'start_date' in datetime_interval:
+            degree['start_date'] = datetime_interval['start_date']
+        if 'end_date' in datetime_interval:
+            degree['end_date'] = datetime_interval['end_date']
+    return degree
+
+def get_position(position_uri, parallel=None):
+    """
+    Given a URI, return an object that contains the position it represents
+
+    If parallel is True, the types of the entities the position relates
+    and its datetime interval are dereferenced concurrently.  If parallel
+    is None, the setting from set_parallel_deref is used
+    """
+    triples = read_triples(position_uri)
+    if parallel is None:
+        parallel = parallel_deref
+    if not parallel:
+        return make_position(position_uri, triples, is_organization,
+                             read_datetime_interval)
+    position = POSITION_DECODER.decode(triples,
+                                       {'position_uri': position_uri})
+    related_uris = position['related_uris']
+    dti_uris = position['dti_uris']
+    calls = [(is_organization, (uri,)) for uri in related_uris] + \
+        [(read_datetime_interval, (uri,)) for uri in dti_uris]
+    values = deref(calls, parallel)
+    organizations = dict(zip(related_uris, values[0:len(related_uris)]))
+    datetime_intervals = dict(zip(dti_uris, values[len(related_uris):]))
+    return resolve_position(position, organizations.get,
+                            datetime_intervals.get)
+
+def is_organization(uri):
+    """
+    Return True if the entity at uri is a foaf:Organization.  If a
+    snapshot is in use, its types are used.  Otherwise, if an
+    OrganizationIndex is in use, the index is used rather than VIVO
+    """
+    from vivofoundation import untag_predicate
+    index = organization_index
+    if snapshot is None and index is not None:
+        return uri in index
+    return untag_predicate('foaf:Organization') in read_types(uri)
+
+POSITION_TYPES = [
+    "http://vivoweb.org/ontology/core#FacultyPosition",
+    "http://vivoweb.org/ontology/core#Non-FacultyAcademicPosition",
+    "http://vivoweb.org/ontology/vivo-ufl/ClinicalFacultyPosition",
+    "http://vivoweb.org/ontology/vivo-ufl/PostDocPosition",
+    "http://vivoweb.org/ontology/core#LibrarianPosition",
+    "http://vivoweb.org/ontology/core#Non-AcademicPosition",
+    "http://vivoweb.org/ontology/vivo-ufl/StudentAssistant",
+    "http://vivoweb.org/ontology/vivo-ufl/GraduateAssistant",
+    "http://vivoweb.org/ontology/vivo-ufl/Housestaff",
+    "http://vivoweb.org/ontology/vivo-ufl/TemporaryFaculty",
+    "http://vivoweb.org/ontology/core#FacultyAdministrativePosition"
+    ]
+
+POSITION_DECODER = Decoder([
+    ("http://vivoweb.org/ontology/core#relates", 'related_uris', 'multi'),
+    ("http://vivo.ufl.edu/ontology/vivo-ufl/hrJobTitle", 'hr_title',
+     'single'),
+    ("http://www.w3.org/2000/01/rdf-schema#label", 'position_label',
+     'single'),
+    ("http://vivoweb.org/ontology/core#dateTimeInterval", 'dti_uris',
+     'multi')
+    ], [(position_type, 'position_type') for position_type in POSITION_TYPES])
+
+def make_position(position_uri, triples, is_organization,
+                  get_datetime_interval):
+    """
+    Given the URI of a position and its triples, return an object that
+    contains the position it represents.  is_organization(uri) tells
+    whether an entity related to the position is its organization.
+    get_datetime_interval(uri) returns the position's datetime interval
+    """
+    position = POSITION_DECODER.decode(triples,
+                                       {'position_uri': position_uri})
+    return resolve_position(position, is_organization,
+                            get_datetime_interval)
+
+def resolve_position(position, is_organization, get_datetime_interval):
+    """
+    Given a position decoded by POSITION_DECODER, replace its related_uris
+    and dti_uris with its organization, person and datetime interval
+    """
+
+    #   deref relates.  Get the types of the referent.  If its an org,
+    #   assign the uri of the relates to the org_uri of the position.
+    #   Otherwise, assume its the person_uri
+
+    for uri in position.pop('related_uris'):
+        if is_organization(uri):
+            position['position_orguri'] = uri
+        else:
+            position['person_uri'] = uri
+
+    for dti_uri in position.pop('dti_uris'):
+        position['dti_uri'] = dti_uri
+        datetime_interval = dict(get_datetime_interval(dti_uri))
+        position['datetime_interval'] = datetime_interval
+        if 'start_date' in datetime_interval:
+            position['start_date'] = datetime_interval['start_date']
+        if 'end_date' in datetime_interval:
+            position['end_date'] = datetime_interval['end_date']
+    return position
+
+# Asynchronous readers.  Python 2 has no asyncio, so each aget_ reader
+# returns at once with a multiprocessing AsyncResult, and the reading is
+# done by a shared pool of async_workers threads.  Within a read, the
+# independent lookups -- the name, title, telephones and email addresses of
+# a vcard, the vcard and the positions of a person, the organization and
+# datetime interval of a position or degree -- are made concurrently by the
+# dereferencing pool, and share its connection slots.  A service with an
+# event loop can pass a callback, called with the result on a pool thread,
+# rather than wait on the AsyncResult.  Errors are raised by get()
+
+async_workers = 16
+async_pool = None
+
+def set_async_workers(workers):
+    """
+    Read with workers threads.  Reads under way are finished by the old
+    pool
+    """
+    global async_workers, async_pool
+    with deref_lock:
+        if workers != async_workers and async_pool is not None:
+            async_pool.close()
+            async_pool = None
+        async_workers = workers
+
+def async_read(function, args, callback=None):
+    """
+    Call function with args on the async pool.  Return an AsyncResult
+    """
+    global async_pool
+    with deref_lock:
+        if async_pool is None:
+            from multiprocessing.pool import ThreadPool
+            async_pool = ThreadPool(async_workers)
+        pool = async_pool
+    return pool.apply_async(function, args, callback=callback)
+
+def get_person_profile(person_uri, get_contact=True, get_positions=True):
+    """
+    Return the person at person_uri, as returned by get_person, with the
+    vcard and the positions of the person read concurrently.  The positions
+    are listed under 'positions', as returned by get_positions_for_people
+    """
+    triples = read_triples(person_uri)
+    person = make_person(person_uri, triples)
+    calls = []
+    if get_contact == True and 'vcard_uri' in person:
+        calls.append((get_vcard, (person['vcard_uri'], not get_positions)))
+    if get_positions:
+        calls.append((get_positions_for_people, ([person_uri],)))
+    values = deref(calls, True)
+    if get_contact == True and 'vcard_uri' in person:
+        person['vcard'] = values.pop(0)
+    if get_positions:
+        person['positions'] = values.pop(0)[person_uri]
+    return person
+
+def aget_person(person_uri, get_contact=True, get_positions=False,
+                callback=None):
+    """
+    Read the person at person_uri, as get_person does.  If get_positions
+    is True, the person's positions are read along with the vcard, as
+    get_person_profile does.  Return an AsyncResult
+    """
+    if get_positions:
+        return async_read(get_person_profile,
+                          (person_uri, get_contact, True), callback)
+    return async_read(get_person, (person_uri, get_contact, True), callback)
+
+def aget_vcard(vcard_uri, callback=None):
+    """
+    Read the vcard at vcard_uri, as get_vcard does.  Return an AsyncResult
+    """
+    return async_read(get_vcard, (vcard_uri, True), callback)
+
+def aget_position(position_uri, callback=None):
+    """
+    Read the position at position_uri, as get_position does.  Return an
+    AsyncResult
+    """
+    return async_read(get_position, (position_uri, True), callback)
+
+def aget_position_uris(person_uri, callback=None):
+    """
+    Read the position uris of person_uri, as get_position_uris does.
+    Return an AsyncResult
+    """
+    return async_read(get_position_uris, (person_uri,), callback)
+
+def aget_degree(degree_uri, callback=None):
+    """
+    Read the degree at degree_uri, as get_degree does.  Return an
+    AsyncResult
+    """
+    return async_read(get_degree, (degree_uri, True), callback)
+
+# Lazy people.  A Person reads the direct attributes of a person in VIVO
+# when one is first used, and the vcard, positions and degrees when each is
+# first used, then keeps them.  prefetch_people reads what a list of
+# people will use a batch at a time, with get_people,
+# get_positions_for_people and get_degrees_for_people
+
+class Person(object):
+    """
+    A person in VIVO, read as it is used.  The direct attributes, as
+    returned by get_person, are read as items:  person['ufid'].  The vcard,
+    positions and degrees are attributes:  person.positions
+    """
+    PARTS = ('attributes', 'vcard', 'positions', 'degrees')
+
+    def __init__(self, person_uri, attributes=None):
+        self.person_uri = person_uri
+        self.loaded = {}
+        if attributes is not None:
+            self.loaded['attributes'] = attributes
+
+    def is_loaded(self, part):
+        """
+        Return True if part, one of PARTS, has been read
+        """
+        return part in self.loaded
+
+    def load(self, part, value):
+        """
+        Keep value as part, one of PARTS, read elsewhere
+        """
+        if part not in self.PARTS:
+            raise ValueError("Unknown part of a person: " + str(part))
+        self.loaded[part] = value
+
+    @property
+    def attributes(self):
+        if 'attributes' not in self.loaded:
+            self.loaded['attributes'] = get_person(self.person_uri,
+                                                   get_contact=False)
+        return self.loaded['attributes']
+
+    @property
+    def vcard(self):
+        if 'vcard' not in self.loaded:
+            vcard = None
+            if 'vcard_uri' in self.attributes:
+                vcard = get_vcard(self.attributes['vcard_uri'])
+            self.loaded['vcard'] = vcard
+        return self.loaded['vcard']
+
+    @property
+    def positions(self):
+        if 'positions' not in self.loaded:
+            self.loaded['positions'] = get_positions_for_people(
+                [self.person_uri])[self.person_uri]
+        return self.loaded['positions']
+
+    @property
+    def degrees(self):
+        if 'degrees' not in self.loaded:
+            self.loaded['degrees'] = get_degrees_for_people(
+                [self.person_uri])[self.person_uri]
+        return self.loaded['degrees']
+
+    def __getitem__(self, key):
+        if key == 'vcard' and 'vcard_uri' in self.attributes:
+            return self.vcard
+        return self.attributes[key]
+
+    def __contains__(self, key):
+        if key == 'vcard':
+            return 'vcard_uri' in self.attributes
+        return key in self.attributes
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def to_dict(self):
+        """
+        Return the person as get_person does, with the vcard
+        """
+        person = dict(self.attributes)
+        if 'vcard_uri' in person:
+            person['vcard'] = self.vcard
+        return person
+
+    def __repr__(self):
+        return 'Person(' + repr(self.person_uri) + ')'
+
+def prefetch_people(people, prefetch=('attributes',), batch_size=500):
+    """
+    Given a list of Person, read the parts named in prefetch -- any of
+    attributes, vcard, positions and degrees -- for all of them, a batch at
+    a time.  Parts already read are not read again.  Return the people
+    """
+    for part in prefetch:
+        if part not in Person.PARTS:
+            raise ValueError("Unknown part of a person: " + str(part))
+    get_contact = 'vcard' in prefetch
+    uris = [person.person_uri for person in people
+            if not person.is_loaded('attributes') or
+            get_contact and not person.is_loaded('vcard')]
+    if len(uris) > 0:
+        read = dict([(person['person_uri'], person) for person in
+                     get_people(uris, get_contact, batch_size)])
+        for person in people:
+            if person.person_uri in read:
+                attributes = read[person.person_uri]
+                if get_contact and not person.is_loaded('vcard'):
+                    person.load('vcard', attributes.get('vcard', None))
+                if 'vcard' in attributes:
+                    attributes = dict(attributes)
+                    del attributes['vcard']
+                if not person.is_loaded('attributes'):
+                    person.load('attributes', attributes)
+    for (part, read_parts) in [('positions', get_positions_for_people),
+                               ('degrees', get_degrees_for_people)]:
+        if part not in prefetch:
+            continue
+        uris = [person.person_uri for person in people
+                if not person.is_loaded(part)]
+        if len(uris) == 0:
+            continue
+        parts_for = read_parts(uris, batch_size)
+        for person in people:
+            if person.person_uri in parts_for:
+                person.load(part, parts_for[person.person_uri])
+    return people
+
+def get_lazy_people(person_uris, prefetch=(), batch_size=500):
+    """
+    Given a list of URIs of people in VIVO, return a list of Person, with
+    the parts named in prefetch read for all of them a batch at a time
+    """
+    people = [Person(person_uri) for person_uri in person_uris]
+    if len(prefetch) > 0:
+        prefetch_people(people, prefetch, batch_size)
+    return people
+
+# Compact records.  A dict per person, vcard, position or degree repeats
+# every key, and each record keeps its own copy of uris such as the
+# position types and organizations.  A Record keeps its fields in slots.
+# Uris of VIVO individuals are kept as the number after URI_PREFIX, and
+# other uris are interned in record_uris, so each is held once.  A Record
+# reads and writes like the dict it replaces, but it is not a dict:  use
+# to_dict() to pass a record to code that needs one, such as json.dumps.
+# A RecordTable holds many records of one kind as columns, for comparisons
+# over whole columns at once
+
+record_uris = {}
+
+def compact_uri(uri):
+    """
+    Return uri as kept in a Record:  the number of a VIVO individual, or
+    the interned uri, of the same type as uri.  None is kept as None
+    """
+    if uri is None:
+        return None
+    if uri.startswith(URI_PREFIX):
+        number = uri[len(URI_PREFIX):]
+        if number.isdigit() and number[0] != '0':
+            return int(number)
+    return record_uris.setdefault(uri, uri)
+
+def expand_uri(value):
+    """
+    Return the uri of a value returned by compact_uri.  The uris of VIVO
+    individuals are returned as unicode, as the readers return them
+    """
+    if isinstance(value, (int, long)):
+        return URI_PREFIX + unicode(value)
+    return value
+
+class Record(object):
+    """
+    A record with the fields of its class, read and written as a dict.
+    Keys that are not fields are kept in extras.  A record is not a dict
+    instance:  to_dict() returns one, for json.dumps and the like.
+    Records can be copied and pickled
+    """
+    __slots__ = ['extras']
+    fields = ()
+    uri_fields = frozenset()
+
+    def __init__(self, values=None):
+        self.extras = None
+        if values is not None:
+            for key in values:
+                self[key] = values[key]
+
+    def raw(self, key):
+        """
+        Return the value of field key as kept, or None
+        """
+        return getattr(self, key, None)
+
+    def __getitem__(self, key):
+        if key in self.uri_fields:
+            try:
+                return expand_uri(getattr(self, key))
+            except AttributeError:
+                raise KeyError(key)
+        if key in self.fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self.extras is None:
+            raise KeyError(key)
+        return self.extras[key]
+
+    def __setitem__(self, key, value):
+        if key in self.uri_fields:
+            setattr(self, key, compact_uri(value))
+        elif key in self.fields:
+            setattr(self, key, value)
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+
+    def __delitem__(self, key):
+        if key in self.fields:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self.extras is None:
+            raise KeyError(key)
+        else:
+            del self.extras[key]
+
+    def __contains__(self, key):
+        if key in self.fields:
+            return hasattr(self, key)
+        return self.extras is not None and key in self.extras
+
+    has_key = __contains__
+
+    def keys(self):
+        keys = [key for key in self.fields if hasattr(self, key)]
+        if self.extras is not None:
+            keys = keys + self.extras.keys()
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, values):
+        for key in values:
+            self[key] = values[key]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def to_dict(self):
+        """
+        Return the record as a dict, with records it holds as dicts
+        """
+        values = {}
+        for (key, value) in self.items():
+            if isinstance(value, Record):
+                value = value.to_dict()
+            values[key] = value
+        return values
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __getstate__(self):
+        values = {}
+        for key in self.fields:
+            if hasattr(self, key):
+                values[key] = getattr(self, key)
+        return [values, self.extras]
+
+    def __setstate__(self, state):
+        [values, self.extras] = state
+        for key in values:
+            setattr(self, key, values[key])
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self.to_dict() == other
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(' + repr(self.to_dict()) + ')'
+
+class VcardRecord(Record):
+    """
+    A vcard, as returned by get_vcard
+    """
+    fields = ('vcard_uri', 'person_uri', 'name_uri', 'title_uri', 'name',
+              'title', 'telephones', 'email_addresses')
+    __slots__ = fields
+    uri_fields = frozenset(['vcard_uri', 'person_uri', 'name_uri',
+                            'title_uri'])
+
+class PersonRecord(Record):
+    """
+    A person, as returned by get_person.  The vcard is kept as a
+    VcardRecord
+    """
+    fields = ('person_uri', 'person_type', 'vcard_uri', 'display_name',
+              'ufid', 'homedept_uri', 'privacy_flag', 'gatorlink',
+              'eracommonsid', 'vcard')
+    __slots__ = fields
+    uri_fields = frozenset(['person_uri', 'person_type', 'vcard_uri',
+                            'homedept_uri'])
+
+    def __setitem__(self, key, value):
+        if key == 'vcard' and isinstance(value, dict):
+            value = VcardRecord(value)
+        Record.__setitem__(self, key, value)
+
+class PositionRecord(Record):
+    """
+    A position, as returned by get_position
+    """
+    fields = ('position_uri', 'person_uri', 'position_orguri', 'position_type',
+              'position_label', 'hr_title', 'dti_uri', 'datetime_interval',
+              'start_date', 'end_date')
+    __slots__ = fields
+    uri_fields = frozenset(['position_uri', 'person_uri', 'position_orguri',
+                            'position_type', 'dti_uri'])
+
+class DegreeRecord(Record):
+    """
+    A degree, as returned by get_degree
+    """
+    fields = ('degree_uri', 'major_field', 'earned_uri', 'degree_name',
+              'training_institution_uri', 'institution_name',
+              'datetime_interval', 'start_date', 'end_date')
+    __slots__ = fields
+    uri_fields = frozenset(['degree_uri', 'earned_uri',
+                            'training_institution_uri'])
+
+class RecordTable(object):
+    """
+    Records of one record class, kept as a column per field.  Uri columns
+    are arrays of the numbers of VIVO individuals for as long as every uri
+    in them is one, with 0 for None.  Other columns are lists.  Keys that
+    are not fields of the class are not kept
+    """
+    def __init__(self, record_class, records=None):
+        from array import array
+        self.record_class = record_class
+        self.columns = {}
+        for field in record_class.fields:
+            if field in record_class.uri_fields:
+                self.columns[field] = array('l')
+            else:
+                self.columns[field] = []
+        self.size = 0
+        if records is not None:
+            self.extend(records)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, record):
+        """
+        Add a record, or a dict of the same form, as the last row
+        """
+        from array import array
+        uri_fields = self.record_class.uri_fields
+        for field in self.record_class.fields:
+            column = self.columns[field]
+            if isinstance(record, Record):
+                value = record.raw(field)
+            elif field in uri_fields:
+                value = compact_uri(record.get(field, None))
+            else:
+                value = record.get(field, None)
+            if isinstance(column, array):
+                if value is None:
+                    value = 0
+                try:
+                    column.append(value)
+                    continue
+                except (TypeError, OverflowError):
+                    column = [x or None for x in column]
+                    self.columns[field] = column
+                    if value == 0:
+                        value = None
+            column.append(value)
+        self.size = self.size + 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def raw(self, field, i):
+        """
+        Return the value of field in row i as kept, or None
+        """
+        value = self.columns[field][i]
+        if value == 0 and field in self.record_class.uri_fields:
+            return None
+        return value
+
+    def value(self, field, i):
+        """
+        Return the value of field in row i
+        """
+        return expand_uri(self.raw(field, i))
+
+    def column(self, field):
+        """
+        Return the values of field, one per row
+        """
+        return [self.value(field, i) for i in range(self.size)]
+
+    def __getitem__(self, i):
+        record = self.record_class()
+        for field in self.record_class.fields:
+            value = self.raw(field, i)
+            if value is not None:
+                setattr(record, field, value)
+        return record
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def rows(self, field):
+        """
+        Return a dictionary of row numbers keyed by the value of field as
+        kept.  Rows with no value are left out
+        """
+        rows = {}
+        column = self.columns[field]
+        for i in range(self.size):
+            value = column[i]
+            if value is not None and value != 0 or \
+                    value == 0 and field not in self.record_class.uri_fields:
+                rows[value] = i
+        return rows
+
+    def differences(self, other, key, fields=None):
+        """
+        Compare each row with the row of other having the same value of
+        key.  Return a list of (key value, field, value here, value in
+        other) for each field that differs.  fields defaults to every field
+        but key.  Values are compared as kept, with a missing uri the same
+        whether its column is an array or a list
+        """
+        if fields is None:
+            fields = [field for field in self.record_class.fields
+                      if field != key]
+        other_rows = other.rows(key)
+        pairs = []
+        for (value, i) in self.rows(key).items():
+            j = other_rows.get(value, None)
+            if j is not None:
+                pairs.append((i, j))
+        pairs.sort()
+        differences = []
+        for field in fields:
+            mine = self.columns[field]
+            theirs = other.columns[field]
+            for (i, j) in pairs:
+                if mine[i] != theirs[j] and \
+                        self.raw(field, i) != other.raw(field, j):
+                    differences.append((self.value(key, i), field,
+                                        self.value(field, i),
+                                        other.value(field, j)))
+        return differences
+
+# Organization index.  Positions relate a person and an organization, and
+# the readers tell them apart by the types of each.  An OrganizationIndex
+# holds the uris of every foaf:Organization in VIVO, read in one query, so
+# is_organization answers without a query.
+
+organization_index = None
+URI_PREFIX = "http://vivo.ufl.edu/individual/n"
+
+class OrganizationIndex(InUse):
+    """
+    The set of foaf:Organization uris in VIVO.  The set is read by load(),
+    and read again on the first use after refresh seconds, if refresh is
+    given.  Use the index for a run with
+
+        with OrganizationIndex() as index:
+            ...
+
+    or for the rest of the program with set_organization_index(index).
+    Organizations added to VIVO since the index was read are not in it.
+
+    With compact=True, uris of the form http://vivo.ufl.edu/individual/n123
+    are held as a sorted array of their integer numbers, about a tenth of
+    the size of the set of strings, and found by binary search.  Other uris
+    are held as strings.  A bloom filter is not used:  a false positive
+    would make a person the organization of a position
+    """
+    setter = 'set_organization_index'
+
+    def __init__(self, compact=False, refresh=None):
+        self.compact = compact
+        self.refresh = refresh
+        self.uris = set()
+        self.numbers = None
+        self.loaded = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        self.check()
+        if self.numbers is None:
+            return len(self.uris)
+        return len(self.uris) + len(self.numbers)
+
+    def __contains__(self, uri):
+        from bisect import bisect_left
+        self.check()
+        if self.numbers is not None and \
+            uri.startswith(URI_PREFIX):
+            number = uri[len(URI_PREFIX):]
+            if number.isdigit() and not number.startswith('0'):
+                number = int(number)
+                k = bisect_left(self.numbers, number)
+                return k < len(self.numbers) and self.numbers[k] == number
+        return uri in self.uris
+
+    def check(self):
+        """
+        Load the index if it has not been loaded, or if it was loaded more
+        than refresh seconds ago
+        """
+        import time
+        if self.loaded is None or self.refresh is not None and \
+            time.time() - self.loaded > self.refresh:
+            with self.lock:
+                if self.loaded is None or self.refresh is not None and \
+                    time.time() - self.loaded > self.refresh:
+                    self.load()
+
+    def load(self, page_size=10000):
+        """
+        Read the organization uris from VIVO, page_size at a time.  Return
+        the number of organizations
+        """
+        import sys
+        import time
+        from array import array
+        query = """
+        #  Return the uri of every organization
+
+        SELECT ?o
+          WHERE {
+            ?o rdf:type foaf:Organization .
+        }
+        ORDER BY ?o"""
+        uris = set()
+        numbers = []
+        for b in sparql_bindings(query, page_size):
+            uri = b['o']['value']
+            number = uri[len(URI_PREFIX):]
+            if self.compact and uri.startswith(URI_PREFIX) and \
+                number.isdigit() and not number.startswith('0') and \
+                int(number) <= sys.maxint:
+                numbers.append(int(number))
+            else:
+                uris.add(uri)
+        if self.compact:
+            numbers.sort()
+            self.numbers = array('l', numbers)
+        self.uris = uris
+        self.loaded = time.time()
+        return len(uris) + len(numbers)
+
+def set_organization_index(index):
+    """
+    Use index to tell organizations.  None reads the types of each entity
+    from VIVO again.  Return the index that was in use
+    """
+    return swap_global('organization_index', index)
+
+def get_positions_for_people(person_uris, batch_size=500, records=False):
+    """
+    Given a list of URIs of people in VIVO, return a dictionary keyed by
+    person URI.  The value for each person is a list of the person's
+    positions, in the order of get_position_uris, each of the form returned
+    by get_position.  If records is True, each position is a
+    PositionRecord.
+
+    Rather than reading each position, the types of everything it relates
+    to and its datetime interval one query at a time, the positions are
+    read a batch of people at a time:  one query for the positions, one to
+    find which related entities are organizations, one for the datetime
+    intervals and one for their start and end values.  If an
+    OrganizationIndex is in use, it is used to find the organizations
+    """
+    from vivofoundation import untag_predicate
+    positions_query = """
+    #  Return the triples of the positions of a batch of people
+
+    SELECT ?person ?s ?p ?o
+      WHERE {
+        VALUES ?person { person_uris }
+        ?person vivo:personInPosition ?s .
+        ?s rdf:type vivo:Position .
+        ?s ?p ?o .
+    }
+    """
+    organizations_query = """
+    #  Return the organizations related to the positions of a batch of
+    #  people
+
+    SELECT DISTINCT ?o
+      WHERE {
+        VALUES ?person { person_uris }
+        ?person vivo:personInPosition ?s .
+        ?s rdf:type vivo:Position .
+        ?s vivo:relates ?o .
+        ?o rdf:type foaf:Organization .
+    }
+    """
+    if snapshot is not None:
+        if records:
+            return dict([(person_uri,
+                          [PositionRecord(get_position(position_uri))
+                           for position_uri in get_position_uris(person_uri)])
+                         for person_uri in person_uris])
+        return dict([(person_uri, [get_position(position_uri)
+                     for position_uri in get_position_uris(person_uri)])
+                     for person_uri in person_uris])
+    relates = untag_predicate('vivo:relates')
+    datetime_interval = untag_predicate('vivo:dateTimeInterval')
+    positions_for = {}
+    k = 0
+    while k < len(person_uris):
+        batch = person_uris[k:k+batch_size]
+        values = " ".join(['<' + uri + '>' for uri in batch])
+        triples_for = {}
+        position_uris_for = {}
+        dti_uris = []
+        result = read_query(positions_query.replace('person_uris', values))
+        try:
+            bindings = result["results"]["bindings"]
+        except (KeyError, TypeError):
+            if result:
+                raise ValueError("Not a SPARQL SELECT result: " +
+                                 repr(result)[:200])
+            bindings = []
+        for b in bindings:
+            person_uri = b['person']['value']
+            position_uri = b['s']['value']
+            if position_uri not in triples_for:
+                triples_for[position_uri] = {"results": {"bindings": []}}
+                position_uris_for.setdefault(person_uri, []).append(
+                    position_uri)
+            triples_for[position_uri]["results"]["bindings"].append(b)
+            if b['p']['value'] == datetime_interval:
+                dti_uris.append(b['o']['value'])
+        organization_uris = set()
+        if organization_index is not None:
+            organization_uris = organization_index
+        elif len(position_uris_for) > 0:
+            result = read_query(organizations_query.replace('person_uris',
+                values))
+            try:
+                bindings = result["results"]["bindings"]
+            except (KeyError, TypeError):
+                if result:
+                    raise ValueError("Not a SPARQL SELECT result: " +
+                                     repr(result)[:200])
+                bindings = []
+            for b in bindings:
+                organization_uris.add(b['o']['value'])
+        datetime_intervals = get_datetime_intervals(dti_uris, batch_size)
+        for person_uri in batch:
+            positions_for[person_uri] = [make_position(position_uri,
+                triples_for[position_uri], organization_uris.__contains__,
+                datetime_intervals.get)
+                for position_uri in sorted(position_uris_for.get(person_uri,
+                                                                 []))]
+            if records:
+                positions_for[person_uri] = [PositionRecord(position)
+                    for position in positions_for[person_uri]]
+        k = k + batch_size
+    return positions_for
+
+def get_degrees_for_people(person_uris, batch_size=500, records=False):
+    """
+    Given a list of URIs of people in VIVO, return a dictionary keyed by
+    person URI.  The value for each person is a list of the person's
+    degrees, in the order of get_degree_uris, each of the form returned by
+    get_degree.  If records is True, each degree is a DegreeRecord.
+
+    The degrees are read a batch of people at a time:  one query for the
+    degrees, one for their academic degrees and institutions, and two for
+    their datetime intervals
+    """
+    from vivofoundation import untag_predicate
+    degrees_query = """
+    #  Return the triples of the degrees of a batch of people
+
+    SELECT ?person ?s ?p ?o
+      WHERE {
+        VALUES ?person { person_uris }
+        ?person vivo:educationalTraining ?s .
+        ?s ?p ?o .
+    }
+    """
+    record = dict
+    if records:
+        record = DegreeRecord
+    if snapshot is not None:
+        return dict([(person_uri, [record(get_degree(degree_uri))
+                     for degree_uri in get_degree_uris(person_uri)])
+                     for person_uri in person_uris])
+    abbreviation = untag_predicate('vivo:abbreviation')
+    label = untag_predicate('rdfs:label')
+    degrees_for = {}
+    k = 0
+    while k < len(person_uris):
+        batch = person_uris[k:k+batch_size]
+        values = " ".join(['<' + uri + '>' for uri in batch])
+        triples_for = {}
+        degree_uris_for = {}
+        result = read_query(degrees_query.replace('person_uris', values))
+        try:
+            bindings = result["results"]["bindings"]
+        except:
+            bindings = []
+        for b in bindings:
+            person_uri = b['person']['value']
+            degree_uri = b['s']['value']
+            if degree_uri not in triples_for:
+                triples_for[degree_uri] = {"results": {"bindings": []}}
+                degree_uris_for.setdefault(person_uri, []).append(degree_uri)
+            triples_for[degree_uri]["results"]["bindings"].append(b)
+        degrees = {}
+        entity_uris = []
+        dti_uris = []
+        for degree_uri in triples_for:
+            degree = DEGREE_DECODER.decode(triples_for[degree_uri],
+                                           {'degree_uri': degree_uri})
+            degrees[degree_uri] = degree
+            entity_uris.append(degree.get('earned_uri', None))
+            entity_uris.append(degree.get('training_institution_uri', None))
+            if 'dti_uri' in degree:
+                dti_uris.append(degree['dti_uri'])
+        entity_triples_for = get_triples_for_uris(entity_uris, batch_size)
+        datetime_intervals = get_datetime_intervals(dti_uris, batch_size)
+
+        def get_degree_name(uri):
+            return get_triples_value(entity_triples_for.get(uri, {}),
+                                     abbreviation)
+
+        def get_organization(uri):
+            return make_organization(uri, get_triples_value(
+                entity_triples_for.get(uri, {}), label))
+
+        for degree_uri in degrees:
+            resolve_degree(degrees[degree_uri], get_degree_name,
+                           get_organization, datetime_intervals.get)
+        for person_uri in batch:
+            degrees_for[person_uri] = [record(degrees[degree_uri])
+                for degree_uri in sorted(degree_uris_for.get(person_uri, []))]
+        k = k + batch_size
+    return degrees_for
+
+def get_datetime_intervals(dti_uris, batch_size=500):
+    """
+    Given a list of URIs of datetime intervals, return a dictionary keyed
+    by URI of the datetime intervals, each of the form returned by
+    get_datetime_interval.  The intervals are read with one query for the
+    intervals and one for their start and end values, per batch_size
+    intervals
+    """
+    triples_for = get_triples_for_uris(dti_uris, batch_size)
+    dtv_uris = []
+    for dti_uri in dti_uris:
+        dtv_uris.extend(make_datetime_interval_values(
+            triples_for[dti_uri]).values())
+    triples_for.update(get_triples_for_uris(dtv_uris, batch_size))
+    datetime_intervals = {}
+    for dti_uri in dti_uris:
+        datetime_intervals[dti_uri] = make_datetime_interval(dti_uri,
+                                                             triples_for)
+    return datetime_intervals
+
+DATETIME_INTERVAL_DECODER = Decoder([
+    ("http://vivoweb.org/ontology/core#start", 'start_date', 'single'),
+    ("http://vivoweb.org/ontology/core#end", 'end_date', 'single')
+    ])
+
+def make_datetime_interval_values(triples):
+    """
+    Given the triples of a datetime interval, return a dictionary of the
+    URIs of its datetime values, with keys start_date and end_date
+    """
+    return DATETIME_INTERVAL_DECODER.decode(triples)
+
+def make_datetime_interval(dti_uri, triples_for):
+    """
+    Given the URI of a datetime interval and a dictionary of triples keyed
+    by uri, holding the triples of the interval and of its datetime values,
+    return the datetime interval in the form returned by
+    vivofoundation.get_datetime_interval:  a dictionary with
+    datetime_interval_uri, and start_date and end_date as datetimes if the
+    interval has them.  These are the keys the readers use.
+    test_get_datetime_intervals.py compares the two
+    """
+    datetime_interval = {'datetime_interval_uri': dti_uri}
+    values = make_datetime_interval_values(triples_for[dti_uri])
+    for key in values:
+        value = get_triples_value(triples_for.get(values[key], {}),
+            "http://vivoweb.org/ontology/core#dateTime")
+        if value is not None:
+            datetime_interval[key] = make_datetime(value)
+    return datetime_interval
+
+def make_datetime(value):
+    """
+    Given an xsd:dateTime or xsd:date string from VIVO, return a datetime
+    """
+    from datetime import datetime
+    if len(value) >= 19:
+        return datetime.strptime(value[0:19], '%Y-%m-%dT%H:%M:%S')
+    return datetime.strptime(value[0:10], '%Y-%m-%d')
+
+# Datetime interval interning.  Positions with the same start and end
+# share one datetime interval.  A DTIIndex holds the uri of the interval
+# for each start and end, with their precisions, in VIVO, read in one
+# query.  While an index is in
+# use, add_position and update_position refer to the interval in the index
+# rather than making a new one, and intervals they make are added to it.
+
+dti_index = None
+
+DTI_PRECISION = "http://vivoweb.org/ontology/core#yearMonthDayPrecision"
+
+class DTIIndex(InUse):
+    """
+    An index of the datetime intervals in VIVO by start and end.  Load it
+    from VIVO with load(), then use it for a run with
+
+        with DTIIndex() as index:
+            index.load()
+            ...
+
+    or for the rest of the program with set_dti_index(index).  Each
+    process has an index of its own, so intervals made by one worker
+    process of update_people are not seen by another
+    """
+    setter = 'set_dti_index'
+
+    def __init__(self):
+        self.uris = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.uris)
+
+    def load(self, page_size=10000):
+        """
+        Add the datetime intervals in VIVO to the index, page_size at a
+        time.  Where several intervals have the same start and end, and
+        the same precisions, the first by uri is used.  Return the number
+        of intervals read
+        """
+        query = """
+        #  Return the start and end, and their precisions, of every
+        #  datetime interval
+
+        SELECT ?dti ?start ?start_precision ?end ?end_precision
+          WHERE {
+            ?dti rdf:type vivo:DateTimeInterval .
+            OPTIONAL { ?dti vivo:start ?s . ?s vivo:dateTime ?start .
+                OPTIONAL { ?s vivo:dateTimePrecision ?start_precision . } }
+            OPTIONAL { ?dti vivo:end ?e . ?e vivo:dateTime ?end .
+                OPTIONAL { ?e vivo:dateTimePrecision ?end_precision . } }
+        }
+        ORDER BY ?dti ?start ?start_precision ?end ?end_precision"""
+        count = 0
+        for b in sparql_bindings(query, page_size):
+            [start, start_precision, end, end_precision] = \
+                [b.get(name, {}).get('value', None) for name in
+                 ['start', 'start_precision', 'end', 'end_precision']]
+            key = dti_key(start, end, start_precision, end_precision)
+            with self.lock:
+                self.uris.setdefault(key, b['dti']['value'])
+            count = count + 1
+        return count
+
+    def get(self, start, end, start_precision=DTI_PRECISION,
+            end_precision=DTI_PRECISION):
+        """
+        Return the uri of the interval from start to end, or None
+        """
+        return self.uris.get(dti_key(start, end, start_precision,
+                                     end_precision), None)
+
+    def add(self, start, end, dti_uri, start_precision=DTI_PRECISION,
+            end_precision=DTI_PRECISION):
+        """
+        Add the interval from start to end at dti_uri to the index
+        """
+        key = dti_key(start, end, start_precision, end_precision)
+        with self.lock:
+            self.uris.setdefault(key, dti_uri)
+
+    def add_dti(self, dti):
+        """
+        Given a dti dictionary with start and end, return [add, dti_uri],
+        as add_dti does.  If the interval is in the index, add is empty
+        and dti_uri is the uri of the interval.  Otherwise the interval is
+        made by add_dti, outside the lock, and added to the index, unless
+        another thread added the same interval first.  add_dti makes
+        intervals of DTI_PRECISION
+        """
+        key = dti_key(dti.get('start', None), dti.get('end', None),
+                      DTI_PRECISION, DTI_PRECISION)
+        with self.lock:
+            if key in self.uris:
+                return ["", self.uris[key]]
+        [add, dti_uri] = add_dti(dti)
+        with self.lock:
+            if key in self.uris:
+                return ["", self.uris[key]]
+            self.uris[key] = dti_uri
+        return [add, dti_uri]
+
+def dti_key(start, end, start_precision=DTI_PRECISION,
+            end_precision=DTI_PRECISION):
+    """
+    Given the start and end of an interval as datetimes, dates or VIVO
+    strings, or None, and the uris of their precisions, return the key of
+    the interval in a DTIIndex
+    """
+    key = []
+    for (value, precision) in [(start, start_precision),
+                               (end, end_precision)]:
+        if value is None:
+            precision = None
+        else:
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            value = make_datetime(value)
+        key.append(value)
+        key.append(precision)
+    return tuple(key)
+
+def set_dti_index(index):
+    """
+    Use index to find datetime intervals.  None stops reusing intervals.
+    Return the index that was in use
+    """
+    return swap_global('dti_index', index)
+
+def add_dti(dti):
+    """
+    Given a dti dictionary with start and end, each a datetime or None,
+    return [add, dti_uri], the RDF to make a new datetime interval and
+    its uri.  With no URIAllocator in use, this is vivofoundation.add_dti.
+    With an allocator, the uris come from the allocator, and the start and
+    end are DateTimeValues with DTI_PRECISION
+    """
+    if uri_allocator is None:
+        from vivofoundation import add_dti as foundation_add_dti
+        return foundation_add_dti(dti)
+    from vivofoundation import assert_resource_property
+    from vivofoundation import assert_data_property
+    from vivofoundation import untag_predicate
+    ardf = ""
+    dti_uri = new_vivo_uri()
+    ardf = ardf + assert_resource_property(dti_uri, 'rdf:type',
+        untag_predicate('vivo:DateTimeInterval'))
+    for (key, predicate) in [('start', 'vivo:start'), ('end', 'vivo:end')]:
+        value = dti.get(key, None)
+        if value is None:
+            continue
+        dtv_uri = new_vivo_uri()
+        ardf = ardf + assert_resource_property(dti_uri, predicate, dtv_uri)
+        ardf = ardf + assert_resource_property(dtv_uri, 'rdf:type',
+            untag_predicate('vivo:DateTimeValue'))
+        ardf = ardf + assert_data_property(dtv_uri, 'vivo:dateTime',
+            value.isoformat())
+        ardf = ardf + assert_resource_property(dtv_uri,
+            'vivo:dateTimePrecision', DTI_PRECISION)
+    return [ardf, dti_uri]
 
-def get_name(name_uri):
+def find_or_add_dti(dti):
     """
-    Given the uri of a vcard name entity, get all the data values
-    associated with the entity
+    Given a dti dictionary with start and end, return [add, dti_uri].  If
+    a DTIIndex is in use, an existing interval is reused.  Otherwise a new
+    interval is made by add_dti
     """
-    from vivofoundation import get_triples
-    name = {'name_uri':name_uri}
-    triples = get_triples(name_uri)
-    try:
-        count = len(triples["results"]["bindings"])
-    except:
-        count = 0
-    i = 0
-    while i < count:
-        b = triples["results"]["bindings"][i]
-        p = b['p']['value']
-        o = b['o']['value']
-        if p == "http://www.w3.org/2006/vcard/ns#givenName":
-            name['given_name'] = o
-        if p == "http://www.w3.org/2006/vcard/ns#familyName":
-            name['family_name'] = o
-        if p == "http://www.w3.org/2006/vcard/ns#additionalName":
-            name['additional_name'] = o
-        if p == "http://www.w3.org/2006/vcard/ns#honorificPrefix":
-            name['honorific_prefix'] = o
-        if p == "http://www.w3.org/2006/vcard/ns#honorificSuffix":
-            name['honorific_suffix'] = o
-        i = i + 1
-    return name
-
-def get_vcard(vcard_uri):
+    index = dti_index
+    if index is None:
+        return add_dti(dti)
+    return index.add_dti(dti)
+
+# Minting uris.  vivofoundation.get_vivo_uri checks each new uri against
+# VIVO, one query per uri.  A URIAllocator checks a block of random uris
+# with one query and hands them out from memory.  While an allocator is in
+# use, every uri made by the add_ functions, add_dti included, comes from
+# the allocator.
+
+uri_allocator = None
+
+class URIAllocator(InUse):
     """
-    Given the uri of a vcard, get all the data values and uris associated with
-    the vcard
+    Hands out new uris of the form http://vivo.ufl.edu/individual/n123,
+    checked against VIVO block_size at a time.  Use the allocator for a run
+    with
+
+        with URIAllocator():
+            ...
+
+    or for the rest of the program with set_uri_allocator(allocator).
+
+    The allocator is thread safe.  Allocators in separate processes are
+    kept apart by stripe and stripes:  an allocator only makes numbers equal
+    to stripe modulo stripes.  update_people gives each of its worker
+    processes a stripe of the allocator in use, and merges the uris each
+    process hands out back into the allocator when the process reports
+    them.  Uris handed out are not handed out again by the allocator, even
+    if the rdf using them is never loaded
     """
-    from vivofoundation import get_triples
-    from vivofoundation import get_vivo_value
-    vcard = {'vcard_uri':vcard_uri}
-    vcard['telephone_uris'] = []
-    vcard['email_uris'] = []
-    triples = get_triples(vcard_uri)
-    try:
-        count = len(triples["results"]["bindings"])
-    except:
-        count = 0
-    i = 0
-    while i < count:
-        b = triples["results"]["bindings"][i]
-        p = b['p']['value']
-        o = b['o']['value']
-        if p == "http://www.w3.org/2006/vcard/ns#hasTitle":
-            vcard['title_uri'] = o
-        if p == "http://purl.obolibrary.org/obo/ARG_2000029":
-            vcard['person_uri'] = o
-        if p == "http://www.w3.org/2006/vcard/ns#hasTelephone":
-            vcard['telephone_uris'].append(o)
-        if p == "http://www.w3.org/2006/vcard/ns#hasName":
-            vcard['name_uri'] = o
-        if p == "http://www.w3.org/2006/vcard/ns#hasEmail":
-            vcard['email_uris'].append(o)
-        i = i + 1
+    setter = 'set_uri_allocator'
 
-    # And now deref each of the uris to get the data values.
+    def __init__(self, block_size=1000, stripe=0, stripes=1,
+                 prefix=URI_PREFIX, high=9999999999):
+        import random
+        self.block_size = block_size
+        self.stripe = stripe
+        self.stripes = stripes
+        self.prefix = prefix
+        self.high = high
+        self.random = random.Random()
+        self.reserve = []
+        self.issued = set()
+        self.fresh = None
+        self.queries = 0
+        self.lock = threading.Lock()
 
-    if 'name_uri' in vcard:
-        vcard['name'] = get_name(vcard['name_uri'])
+    def next(self):
+        """
+        Return a new uri
+        """
+        with self.lock:
+            if len(self.reserve) == 0:
+                self.reserve_block()
+            uri = self.reserve.pop()
+            self.issued.add(uri)
+            if self.fresh is not None:
+                self.fresh.append(uri)
+            return uri
 
-    if vcard.get('title_uri', None) is not None:
-        vcard['title'] = get_vivo_value(vcard['title_uri'],'vcard:title')
+    def drain(self):
+        """
+        Return the uris handed out by a forked allocator since the last
+        drain, for merge by the original.  An allocator that was not
+        forked returns an empty list
+        """
+        with self.lock:
+            fresh = self.fresh or []
+            if self.fresh is not None:
+                self.fresh = []
+            return fresh
 
-    vcard['telephones'] = []
-    for telephone_uri in vcard['telephone_uris']:
-        vcard['telephones'].append(get_telephone(telephone_uri))
-    del vcard['telephone_uris']
+    def merge(self, uris):
+        """
+        Record uris handed out by forked copies of this allocator, so they
+        are not handed out again
+        """
+        with self.lock:
+            self.issued.update(uris)
+            self.reserve = [uri for uri in self.reserve
+                            if uri not in self.issued]
 
-    vcard['email_addresses'] = []
-    for email_uri in vcard['email_uris']:
-        vcard['email_addresses'].append({
-            'email_uri':email_uri,
-            'email_address':get_vivo_value(email_uri,
-                                              "vcard:email")
-            })
-    del vcard['email_uris']
-    return vcard
+    def reserve_block(self):
+        """
+        Add a block of uris that are not in VIVO to the reserve.  Caller
+        holds the lock
+        """
+        query = """
+        #  Return the uris of a block that are in VIVO
 
-def get_person(person_uri, get_contact=True):
-    """
-    Given the URI of a person in VIVO, get the poerson's attributes and
-    return a flat, keyed structure appropriate for update and other
-    applications.
+        SELECT DISTINCT ?s
+          WHERE {
+            VALUES ?s { candidate_uris }
+            { ?s ?p ?o . } UNION { ?x ?p ?s . }
+        }
+        """
+        while len(self.reserve) == 0:
+            candidates = set()
+            while len(candidates) < self.block_size:
+                number = self.random.randint(1, self.high)
+                number = number - number % self.stripes + self.stripe
+                if 0 < number <= self.high:
+                    uri = self.prefix + str(number)
+                    if uri not in self.issued:
+                        candidates.add(uri)
+            result = read_query(query.replace('candidate_uris',
+                " ".join(['<' + uri + '>' for uri in candidates])))
+            self.queries = self.queries + 1
+            for b in result["results"]["bindings"]:
+                candidates.discard(b['s']['value'])
+            self.reserve = sorted(candidates)
 
-    To Do:
-    Add get_grants, get_papers, etc as we had previously
+    def fork(self, stripe, stripes):
+        """
+        Make this allocator, copied into a new process, one of stripes
+        allocators sharing the numbers of the original, and start it on a
+        fresh random sequence.  Its reserve is dropped, since the original
+        may still hand it out.  The uris it hands out are kept for drain
+        """
+        import os
+        with self.lock:
+            self.stripe = self.stripe + self.stripes * stripe
+            self.stripes = self.stripes * stripes
+            self.issued.update(self.reserve)
+            self.reserve = []
+            self.fresh = []
+            self.random.seed(os.urandom(16))
+            self.lock = threading.Lock()
+
+def new_vivo_uri():
     """
-    from vivofoundation import get_triples
-    person = {'person_uri': person_uri}
-    triples = get_triples(person_uri)
-    try:
-        count = len(triples["results"]["bindings"])
-    except:
-        count = 0
-    i = 0
-    while i < count:
-        b = triples["results"]["bindings"][i]
-        p = b['p']['value']
-        o = b['o']['value']
-        if p == \
-           "http://vitro.mannlib.cornell.edu/ns/vitro/0.7#mostSpecificType":
-            person['person_type'] = o
-        if p == "http://purl.obolibrary.org/obo/ARG_2000028":
-            person['vcard_uri'] = o
-        if p == "http://www.w3.org/2000/01/rdf-schema#label":
-            person['display_name'] = o
-        if p == "http://vivo.ufl.edu/ontology/vivo-ufl/ufid":
-            person['ufid'] = o
-        if p == "http://vivo.ufl.edu/ontology/vivo-ufl/homeDept":
-            person['homedept_uri'] = o
-        if p == "http://vivo.ufl.edu/ontology/vivo-ufl/privacyFlag":
-            person['privacy_flag'] = o
-        if p == "http://vivo.ufl.edu/ontology/vivo-ufl/gatorlink":
-            person['gatorlink'] = o
-        if p == "http://vivoweb.org/ontology/core#eRACommonsId":
-            person['eracommonsid'] = o
-        i = i + 1
+    Return a new uri from the allocator in use, or from
+    vivofoundation.get_vivo_uri if there is none
+    """
+    allocator = uri_allocator
+    if allocator is None:
+        from vivofoundation import get_vivo_uri
+        return get_vivo_uri()
+    return allocator.next()
 
-    # deref the vcard
+def set_uri_allocator(allocator):
+    """
+    Make new uris with allocator.  None makes them with
+    vivofoundation.get_vivo_uri again.  Return the allocator that was in
+    use
+    """
+    return swap_global('uri_allocator', allocator)
 
-    if get_contact == True:
-        person['vcard'] = get_vcard(person['vcard_uri'])
-        
-    return person
+# RDF sinks.  The add_ and update_ functions write the RDF they generate
+# to sinks rather than concatenating strings.  By default each function
+# collects its RDF in an RDFBuffer and returns it as a string, as it always
+# has.  A caller may instead pass its own sinks, for example an RDFFile for
+# the ADD RDF and another for the SUB RDF of a full load, and every
+# function writes to those.
 
-def get_degree(degree_uri):
+class RDFBuffer(object):
     """
-    Given a URI, return an object that contains the degree (educational
-    training) it represents
+    Collect RDF in memory.  getvalue() returns all the RDF written
+    """
+    def __init__(self):
+        self.parts = []
+
+    def write(self, rdf):
+        self.parts.append(rdf)
 
+    def getvalue(self):
+        rdf = "".join(self.parts)
+        self.parts = [rdf]
+        return rdf
+
+class RDFFile(object):
     """
-    from vivofoundation import get_triples
-    from vivofoundation import get_vivo_value
-    from vivofoundation import get_organization
-    from vivofoundation import get_datetime_interval
+    Write RDF straight to a file, so that RDF for any number of people can
+    be generated without holding it in memory.  header is written when the
+    file is opened and footer when it is closed
+    """
+    def __init__(self, filename, header="", footer=""):
+        self.file = open(filename, 'w')
+        self.footer = footer
+        self.write(header)
 
-    degree = {'degree_uri': degree_uri}
-    triples = get_triples(degree_uri)
-    try:
-        count = len(triples["results"]["bindings"])
-    except KeyError:
-        count = 0
-    i = 0
-    while i < count:
-        b = triples["results"]["bindings"][i]
-        p = b['p']['value']
-        o = b['o']['value']
-        if p == "http://vivoweb.org/ontology/core#majorField":
-            degree['major_field'] = o
-
-        # dereference the academic degree
-
-        if p == "http://vivoweb.org/ontology/core#degreeEarned":
-            degree['earned_uri'] = o
-            degree['degree_name'] = get_vivo_value(o, 'core:abbreviation')
-
-        # dereference the Institution
-
-        if p == "http://vivoweb.org/ontology/core#trainingAtOrganization":
-            degree['training_institution_uri'] = o
-            institution = get_organization(o)
-            if 'label' in institution:  # home department might be incomplete
-                degree['institution_name'] = institution['label']
-
-        # dereference the datetime interval
-
-        if p == "http://vivoweb.org/ontology/core#dateTimeInterval":
-            datetime_interval = get_datetime_interval(o)
-            degree['datetime_interval'] = datetime_interval
-            if 'start_date' in datetime_interval:
-                degree['start_date'] = datetime_interval['start_date']
-            if 'end_date' in datetime_interval:
-                degree['end_date'] = datetime_interval['end_date']
-        i += 1
-    return degree
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def write(self, rdf):
+        if isinstance(rdf, unicode):
+            rdf = rdf.encode('utf-8')
+        self.file.write(rdf)
+
+    def getvalue(self):
+        return ""
 
-def get_position(position_uri):
+    def close(self):
+        if not self.file.closed:
+            self.write(self.footer)
+            self.file.close()
+
+def rdf_sink(sink):
     """
-    Given a URI, return an object that contains the position it represents
+    Return sink, or a new RDFBuffer if sink is None
     """
-    from vivofoundation import get_triples
-    from vivofoundation import get_types
-    from vivofoundation import get_datetime_interval
-    from vivofoundation import untag_predicate
-    
-    position = {'position_uri':position_uri} # include position_uri
-    triples = get_triples(position_uri)
-    try:
-        count = len(triples["results"]["bindings"])
-    except:
-        count = 0
-    i = 0
-    while i < count:
-        b = triples["results"]["bindings"][i]
-        p = b['p']['value']
-        o = b['o']['value']
-        if p == "http://vivoweb.org/ontology/core#relates":
-
-            #   deref relates.  Get the types of the referent.  If its an org,
-            #   assign the uri of the relates (o) to the org_uri of the
-            #   position.  Otherwise, assume its the person_uri
-
-            types = get_types(o)
-            if untag_predicate('foaf:Organization') in types:
-                position['position_orguri'] = o
-            else:
-                position['person_uri'] = o
-
-        if p == "http://vivo.ufl.edu/ontology/vivo-ufl/hrJobTitle":
-            position['hr_title'] = o
-        if p == "http://www.w3.org/2000/01/rdf-schema#label":
-            position['position_label'] = o
-        if o == "http://vivoweb.org/ontology/core#FacultyPosition":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/core#Non-FacultyAcademicPosition":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/vivo-ufl/ClinicalFacultyPosition":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/vivo-ufl/PostDocPosition":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/core#LibrarianPosition":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/core#Non-AcademicPosition":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/vivo-ufl/StudentAssistant":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/vivo-ufl/GraduateAssistant":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/vivo-ufl/Housestaff":
-            position['position_type'] = o
-        if o == "http://vivoweb.org/ontology/vivo-ufl/TemporaryFaculty":
-            position['position_type'] = o
-        if o == \
-            "http://vivoweb.org/ontology/core#FacultyAdministrativePosition":
-            position['position_type'] = o
-        if p == "http://vivoweb.org/ontology/core#dateTimeInterval":
-            position['dti_uri'] = o
-            datetime_interval = get_datetime_interval(o)
-            position['datetime_interval'] = datetime_interval
-            if 'start_date' in datetime_interval:
-                position['start_date'] = datetime_interval['start_date']
-            if 'end_date' in datetime_interval:
-                position['end_date'] = datetime_interval['end_date']  
-        i = i + 1
+    if sink is None:
+        return RDFBuffer()
+    return sink
 
-    return position
+def rdf_result(sink, rdf):
+    """
+    Return what an add_ or update_ function returns for RDF written to
+    rdf:  the RDF string if the caller gave no sink, otherwise the caller's
+    sink
+    """
+    if sink is None:
+        return rdf.getvalue()
+    return sink
 
-def add_position(person_uri, position):
+def add_position(person_uri, position, ardf_sink=None):
     """
     Given a person_uri and a position dictionary containing the attributes
     of a position, generate the RDF necessary to create the position,
     associate it with the person and assign its attributes.
+
+    If ardf_sink is given, the RDF is written to it and ardf_sink is
+    returned in place of the RDF
     """
     from vivofoundation import assert_resource_property
     from vivofoundation import assert_data_property
-    from vivofoundation import add_dti
-    from vivofoundation import get_vivo_uri
     
-    ardf = ""
-    position_uri = get_vivo_uri()
+    ardf = rdf_sink(ardf_sink)
+    position_uri = new_vivo_uri()
     dti = {'start' : position.get('start_date',None),
            'end': position.get('end_date',None)}
-    [add, dti_uri] = add_dti(dti)
-    ardf = ardf + add
-    ardf = ardf + assert_resource_property(position_uri,
-            'rdf:type', position['position_type'])
-    ardf = ardf + assert_resource_property(position_uri,
-            'rdfs:label', position['position_label'])
-    ardf = ardf + assert_resource_property(position_uri,
-            'vivo:dateTimeInterval', dti_uri)
-    ardf = ardf + assert_resource_property(position_uri,
-            'vivo:relates', person_uri)
-    ardf = ardf + assert_resource_property(position_uri,
-            'vivo:relates', position['position_orguri'])
+    [add, dti_uri] = find_or_add_dti(dti)
+    ardf.write(add)
+    ardf.write(assert_resource_property(position_uri,
+            'rdf:type', position['position_type']))
+    ardf.write(assert_resource_property(position_uri,
+            'rdfs:label', position['position_label']))
+    ardf.write(assert_resource_property(position_uri,
+            'vivo:dateTimeInterval', dti_uri))
+    ardf.write(assert_resource_property(position_uri,
+            'vivo:relates', person_uri))
+    ardf.write(assert_resource_property(position_uri,
+            'vivo:relates', position['position_orguri']))
     
-    return [ardf, position_uri]
+    return [rdf_result(ardf_sink, ardf), position_uri]
 
-def add_vcard(person_uri, vcard):
+def add_vcard(person_uri, vcard, ardf_sink=None):
     """
     Given a person_uri and a vcard dictionary of items on the vcard,
     generate ther RDF necessary to create the vcard, associate it with
@@ -667,11 +3475,13 @@ def add_vcard(person_uri, vcard):
     Both the name table and the single entry table are easily extensible to
     handle additional name attributes and additional single entry entities
     respectively.
+
+    If ardf_sink is given, the RDF is written to it and ardf_sink is
+    returned in place of the RDF
     """
     
     from vivofoundation import assert_resource_property
     from vivofoundation import assert_data_property
-    from vivofoundation import get_vivo_uri
     from vivofoundation import untag_predicate
     
     single_entry = {
@@ -695,29 +3505,28 @@ def add_vcard(person_uri, vcard):
         'name_prefix' : 'vcard:honoraryPrefix',
         'name_suffix' : 'vcard:honorarySuffix'
         }
-    ardf = ""
-    vcard_uri = get_vivo_uri()
-    ardf = ardf + assert_resource_property(vcard_uri, 'rdf:type',
-                                           untag_predicate('vcard:Individual'))
-    ardf = ardf + assert_resource_property(person_uri, 'obo:ARG2000028',
-                                           vcard_uri) # hasContactInfo
-    ardf = ardf + assert_resource_property(vcard_uri, 'obo:ARG2000029',
-                                           person_uri) # contactInfoOf
+    ardf = rdf_sink(ardf_sink)
+    vcard_uri = new_vivo_uri()
+    ardf.write(assert_resource_property(vcard_uri, 'rdf:type',
+                                        untag_predicate('vcard:Individual')))
+    ardf.write(assert_resource_property(person_uri, 'obo:ARG2000028',
+                                        vcard_uri)) # hasContactInfo
+    ardf.write(assert_resource_property(vcard_uri, 'obo:ARG2000029',
+                                        person_uri)) # contactInfoOf
 
     # Create the name entity and attach to vcard. For each key in the
     # name_table, assert its value to the name entity
 
-    name_uri = get_vivo_uri()
-    ardf = ardf + assert_resource_property(name_uri, 'rdf:type',
-                                           untag_predicate('vcard:Name'))
-    ardf = ardf + assert_resource_property(vcard_uri, 'vcard:hasName',
-                                           name_uri)
+    name_uri = new_vivo_uri()
+    ardf.write(assert_resource_property(name_uri, 'rdf:type',
+                                        untag_predicate('vcard:Name')))
+    ardf.write(assert_resource_property(vcard_uri, 'vcard:hasName',
+                                        name_uri))
     for key in vcard.keys():
         if key in name_table:
             pred = name_table[key]
             val = vcard[key]
-            ardf = ardf + assert_data_property(name_uri,
-                pred, val)            
+            ardf.write(assert_data_property(name_uri, pred, val))
 
     # Process single entry vcard bits of info:
     #   Go through the keys in the vcard.  If it's a single entry key, then
@@ -728,30 +3537,32 @@ def add_vcard(person_uri, vcard):
         if key in single_entry:
             val = vcard[key]
             entry = single_entry[key]
-            entry_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(entry_uri,
-                'rdf:type', untag_predicate(entry['type']))
-            ardf = ardf + assert_data_property(entry_uri,
-                entry['pred'], val)
-            ardf = ardf + assert_resource_property(vcard_uri,
-                entry['resource'], entry_uri)
-    return [ardf, vcard_uri]
+            entry_uri = new_vivo_uri()
+            ardf.write(assert_resource_property(entry_uri,
+                'rdf:type', untag_predicate(entry['type'])))
+            ardf.write(assert_data_property(entry_uri,
+                entry['pred'], val))
+            ardf.write(assert_resource_property(vcard_uri,
+                entry['resource'], entry_uri))
+    return [rdf_result(ardf_sink, ardf), vcard_uri]
 
-def update_vcard(vivo_vcard, source_vcard):
+def update_vcard(vivo_vcard, source_vcard, ardf_sink=None, srdf_sink=None):
     """
     Given a vivo vcard and a source vccard, generate the add and sub rdf
     necesary to update vivo the the values ion the source
+
+    If ardf_sink and srdf_sink are given, the add and sub rdf are written
+    to them and the sinks are returned in place of the rdf
     """
     
     from vivofoundation import update_entity
     from vivofoundation import update_data_property
-    from vivofoundation import get_vivo_uri
     from vivofoundation import assert_data_property
     from vivofoundation import assert_resource_property
     from vivofoundation import untag_predicate
 
-    ardf = ""
-    srdf = ""
+    ardf = rdf_sink(ardf_sink)
+    srdf = rdf_sink(srdf_sink)
 
     # Update the name entity
 
@@ -770,35 +3581,35 @@ def update_vcard(vivo_vcard, source_vcard):
     # Update name entity
     
     if 'name' in source_vcard and 'name' not in vivo_vcard:
-        name_uri = get_vivo_uri()
-        ardf = ardf + assert_resource_property(name_uri, 'rdf:type',
-                                           untag_predicate('vcard:Name'))
-        ardf = ardf + assert_resource_property(vcard['vcard_uri'],
-            'vcard:hasName', name_uri)
+        name_uri = new_vivo_uri()
+        ardf.write(assert_resource_property(name_uri, 'rdf:type',
+                                            untag_predicate('vcard:Name')))
+        ardf.write(assert_resource_property(vivo_vcard['vcard_uri'],
+            'vcard:hasName', name_uri))
         vivo_vcard['name_uri'] = name_uri
         vivo_vcard['name'] = {}
     if 'name' in source_vcard:
         vivo_vcard['name']['uri'] = vivo_vcard['name_uri']
         [add, sub] = update_entity(vivo_vcard['name'],
                                    source_vcard['name'], name_keys)
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.write(add)
+        srdf.write(sub)
 
     #   Update title
 
     if 'title' in source_vcard and 'title' not in vivo_vcard:
-        title_uri = get_vivo_uri()
-        ardf = ardf + assert_resource_property(title_uri, 'rdf:type',
-                                           untag_predicate('vcard:Title'))
-        ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-            'vcard:hasTitle', title_uri)
+        title_uri = new_vivo_uri()
+        ardf.write(assert_resource_property(title_uri, 'rdf:type',
+                                            untag_predicate('vcard:Title')))
+        ardf.write(assert_resource_property(vivo_vcard['vcard_uri'],
+            'vcard:hasTitle', title_uri))
         vivo_vcard['title_uri'] = title_uri
         vivo_vcard['title'] = None
     if 'title' in source_vcard:
         [add, sub] = update_data_property(vivo_vcard['title_uri'],
             'vcard:title', vivo_vcard['title'], source_vcard['title'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.write(add)
+        srdf.write(sub)
 
     #   Update phone.  For now, assert a phone.  We can't seem to tell which
     #   phone is to be "updated".  If VIVO has telephones a and b, and the
@@ -811,11 +3622,11 @@ def update_vcard(vivo_vcard, source_vcard):
 
     if 'phone' in source_vcard and source_vcard['phone'] is not None:
         if 'telephones' not in vivo_vcard or vivo_vcard['telephones'] == []:
-            telephone_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-                'vcard:hasTelephone', telephone_uri)
-            ardf = ardf + assert_resource_property(telephone_uri,
-                'rdf:type', untag_predicate('vcard:telephone'))
+            telephone_uri = new_vivo_uri()
+            ardf.write(assert_resource_property(vivo_vcard['vcard_uri'],
+                'vcard:hasTelephone', telephone_uri))
+            ardf.write(assert_resource_property(telephone_uri,
+                'rdf:type', untag_predicate('vcard:telephone')))
             telephone_value = None
         else:
             for telephone in vivo_vcard['telephones']:
@@ -825,18 +3636,18 @@ def update_vcard(vivo_vcard, source_vcard):
                     continue
         [add, sub] = update_data_property(telephone_uri,
             'vcard:telephone', telephone_value, source_vcard['phone'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.write(add)
+        srdf.write(sub)
 
     #   Analogous processing with analogous comments for a fax number
 
     if 'fax' in source_vcard and source_vcard['fax'] is not None:
         if 'telephones' not in vivo_vcard or vivo_vcard['telephones'] == []:
-            telephone_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-                'vcard:hasTelephone', telephone_uri)
-            ardf = ardf + assert_resource_property(telephone_uri,
-                'rdf:type', untag_predicate('vcard:Fax'))
+            telephone_uri = new_vivo_uri()
+            ardf.write(assert_resource_property(vivo_vcard['vcard_uri'],
+                'vcard:hasTelephone', telephone_uri))
+            ardf.write(assert_resource_property(telephone_uri,
+                'rdf:type', untag_predicate('vcard:Fax')))
             telephone_value = None
         else:
             for telephone in vivo_vcard['telephones']:
@@ -846,8 +3657,8 @@ def update_vcard(vivo_vcard, source_vcard):
                     continue
         [add, sub] = update_data_property(telephone_uri,
             'vcard:telephone', telephone_value, source_vcard['fax'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.write(add)
+        srdf.write(sub)
 
     #   Analogous processing with analogous comments for an email address
 
@@ -855,30 +3666,33 @@ def update_vcard(vivo_vcard, source_vcard):
        source_vcard['primary_email'] is not None:
         if 'email_addresses' not in vivo_vcard or \
            vivo_vcard['email_addresses'] == []:
-            email_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-                'vcard:hasEmail', email_uri)
-            ardf = ardf + assert_resource_property(email_uri,
-                'rdf:type', untag_predicate('vcard:Email'))
+            email_uri = new_vivo_uri()
+            ardf.write(assert_resource_property(vivo_vcard['vcard_uri'],
+                'vcard:hasEmail', email_uri))
+            ardf.write(assert_resource_property(email_uri,
+                'rdf:type', untag_predicate('vcard:Email')))
             email_value = None
         else:
-            email_uri = email_addresses[0]['email_uri']
-            email_value = email_address[0]['email_address']
+            email_uri = vivo_vcard['email_addresses'][0]['email_uri']
+            email_value = vivo_vcard['email_addresses'][0]['email_address']
         [add, sub] = update_data_property(email_uri,
             'vcard:email', email_value, source_vcard['primary_email'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.write(add)
+        srdf.write(sub)
     
-    return [ardf, srdf]
+    return [rdf_result(ardf_sink, ardf), rdf_result(srdf_sink, srdf)]
 
-def update_position(vivo_position, source_position):
+def update_position(vivo_position, source_position, ardf_sink=None,
+                    srdf_sink=None):
     """
     Given a position in VIVO and a position from an authoritative source,
     update the VIVO position to reflect the source
+
+    If ardf_sink and srdf_sink are given, the add and sub rdf are written
+    to them and the sinks are returned in place of the rdf
     """
     from vivofoundation import update_entity
     from vivofoundation import update_resource_property
-    from vivofoundation import add_dti
 
     #   Note: We do not label positions with
     #   harvest attributes.
@@ -890,54 +3704,59 @@ def update_position(vivo_position, source_position):
         'position_orguri': {'predicate':'vivo:relates','action':'resource'},
         'person_uri': {'predicate':'vivo:relates','action':'resource'}
         }
-    ardf = ""
-    srdf = ""
+    ardf = rdf_sink(ardf_sink)
+    srdf = rdf_sink(srdf_sink)
     [add, sub] = update_entity(vivo_position, source_position, update_keys)
-    ardf = ardf + add
-    srdf = srdf + sub
+    ardf.write(add)
+    srdf.write(sub)
 
     #  Compare the start and end dates of vivo and source.  If not
-    #  equal, replace the vivo referent with a new datetime interval
-    #  referent.  If a datetime interval already exists in VIVO with
-    #  the same start and end values, no attempt is made to find and
-    #  reuse it.  A separate process, absolute_dates, can be used to
-    #  find and merge duplicate dates.
+    #  equal, replace the vivo referent with a datetime interval
+    #  referent having the source start and end values.  If a DTIIndex
+    #  is in use and a datetime interval already exists in VIVO with
+    #  the same start and end values, it is reused.  Otherwise a new
+    #  interval is made.  A separate process, absolute_dates, can be
+    #  used to find and merge duplicate dates.
 
     if vivo_position.get('start_date', None) != \
        source_position.get('start_date', None) or \
        vivo_position.get('end_date', None) != \
        source_position.get('end_date', None):
         [add, dti_uri] = \
-            add_dti({'start':source_position.get('start_date', None),
+            find_or_add_dti({'start':source_position.get('start_date', None),
                                  'end':source_position.get('end_date', None)})
-        ardf = ardf + add
+        ardf.write(add)
         [add, sub] = update_resource_property(vivo_position['uri'],
             'vivo:dateTimeInterval', vivo_position.get('dti_uri',None), dti_uri)
-    return [ardf, srdf]
+        ardf.write(add)
+        srdf.write(sub)
+    return [rdf_result(ardf_sink, ardf), rdf_result(srdf_sink, srdf)]
 
-def add_person(person):
+def add_person(person, ardf_sink=None):
     """
     Add a person to VIVO.  The person structure may have any number of
     elements.  These elements may represent direct assertions (label,
     ufid, homeDept), vcard assertions (contact info, name parts),
     and/or position assertions (title, tye, dept, start, end dates)
+
+    If ardf_sink is given, the RDF is written to it and ardf_sink is
+    returned in place of the RDF
     """
     from vivofoundation import assert_data_property
     from vivofoundation import assert_resource_property
     from vivofoundation import untag_predicate
-    from vivofoundation import get_vivo_uri
     
-    ardf = ""
-    person_uri = get_vivo_uri()
+    ardf = rdf_sink(ardf_sink)
+    person_uri = new_vivo_uri()
 
     # Add direct assertions
 
     person_type = person['person_type']
-    ardf = ardf + assert_resource_property(person_uri, 'rdf:type', person_type)
-    ardf = ardf + assert_resource_property(person_uri, 'rdf:type',
-                        untag_predicate('ufv:UFEntity'))
-    ardf = ardf + assert_resource_property(person_uri, 'rdf:type',
-                        untag_predicate('ufv:UFCurrentEntity'))
+    ardf.write(assert_resource_property(person_uri, 'rdf:type', person_type))
+    ardf.write(assert_resource_property(person_uri, 'rdf:type',
+                        untag_predicate('ufv:UFEntity')))
+    ardf.write(assert_resource_property(person_uri, 'rdf:type',
+                        untag_predicate('ufv:UFCurrentEntity')))
 
     direct_data_preds = {'ufid':'ufv:ufid',
                          'privacy_flag':'ufv:privacyFlag',
@@ -949,12 +3768,12 @@ def add_person(person):
         if key in person:
             pred = direct_data_preds[key]
             val = person[key]
-            ardf = ardf + assert_data_property(person_uri, pred, val)
+            ardf.write(assert_data_property(person_uri, pred, val))
     for key in direct_resource_preds:
         if key in person:
             pred = direct_resource_preds[key]
             val = person[key]
-            ardf = ardf + assert_resource_property(person_uri, pred, val)
+            ardf.write(assert_resource_property(person_uri, pred, val))
 
     # Add Vcard Assertions
 
@@ -964,8 +3783,7 @@ def add_person(person):
                 ]:
         if key in person.keys():
             vcard[key] = person[key]
-    [add, vcard_uri] = add_vcard(person_uri, vcard)
-    ardf = ardf + add
+    [ardf, vcard_uri] = add_vcard(person_uri, vcard, ardf)
 
     # Add Position Assertions
 
@@ -975,12 +3793,40 @@ def add_person(person):
         if key in person.keys():
             position[key] = person[key]
 
-    [add, position_uri] = add_position(person_uri, position)
-    ardf = ardf + add
+    [ardf, position_uri] = add_position(person_uri, position, ardf)
     
-    return [ardf, person_uri]
+    return [rdf_result(ardf_sink, ardf), person_uri]
+
+# The source values used by update_person.  Key values are grouped into
+# three sets -- direct (attributes of the person directly), vcard attributes
+# and position attributes
+
+PERSON_KEY_TABLE = {
+    'privacy_flag': {'predicate': 'ufv:privacyFlag',
+                    'action': 'literal'},
+    'homedept_uri': {'predicate': 'ufv:homeDept',
+                    'action': 'resource'},
+    'display_name': {'predicate': 'rdfs:label',
+                    'action': 'literal'},
+    'ufid': {'predicate': 'ufv:ufid',
+                    'action': 'literal'},
+    'gatorlink': {'predicate': 'ufv:gatorlink',
+                    'action': 'literal'},
+    'person_type': {'predicate': 'rdf:type',
+                    'action': 'literal'},
+    'date_harvested': {'predicate': 'ufv:dateHarvested',
+                    'action': 'literal'},
+    'harvested_by': {'predicate': 'ufv:harvestedBy',
+                    'action': 'literal'}
+    }
+VCARD_NAMES = ['given_name', 'honorfic_prefix', 'honorific_suffix',
+               'additional_name', 'family_name']
+VCARD_FLAT = ['fax',  'phone', 'title']
+POSITION_KEYS = ['position_label', 'end_date', 'position_type',
+                 'position_orguri', 'start_date']
 
-def update_person(vivo_person, source_person):
+def update_person(vivo_person, source_person, ardf_sink=None, srdf_sink=None,
+                  debug=False):
     """
     Given a data structure representing a person in VIVO, and a data
     structure representing the same person with data values from source
@@ -997,6 +3843,11 @@ def update_person(vivo_person, source_person):
 
     There are only 22 attributes.  How difficult could it be to update
     them in VIVO?
+
+    If ardf_sink and srdf_sink are given, the add and sub rdf are written
+    to them and the sinks are returned in place of the rdf.  The vcards and
+    positions being compared are kept in the run report if instrumentation
+    is in use, and printed if debug is True
     """
     from vivopeople import get_position_uris
     from vivopeople import get_position
@@ -1004,34 +3855,10 @@ def update_person(vivo_person, source_person):
     from vivopeople import update_vcard
     from vivofoundation import update_entity
     import json
-    
-    direct_key_table = {
-    'privacy_flag': {'predicate': 'ufv:privacyFlag',
-                    'action': 'literal'},
-    'homedept_uri': {'predicate': 'ufv:homeDept',
-                    'action': 'resource'},
-    'display_name': {'predicate': 'rdfs:label',
-                    'action': 'literal'},
-    'ufid': {'predicate': 'ufv:ufid',
-                    'action': 'literal'},
-    'gatorlink': {'predicate': 'ufv:gatorlink',
-                    'action': 'literal'},
-    'person_type': {'predicate': 'rdf:type',
-                    'action': 'literal'},
-    'date_harvested': {'predicate': 'ufv:dateHarvested',
-                    'action': 'literal'},
-    'harvested_by': {'predicate': 'ufv:harvestedBy',
-                    'action': 'literal'}
-    }
 
-    vcard_names = ['given_name', 'honorfic_prefix', 'honorific_suffix',
-                   'additional_name', 'family_name']
-    vcard_flat = ['fax',  'phone', 'title']
-    position_keys = ['position_label', 'end_date', 'position_type',
-                     'position_orguri', 'start_date']
-    
-    ardf = ""
-    srdf = ""
+    direct_key_table = dict(PERSON_KEY_TABLE)
+    ardf = rdf_sink(ardf_sink)
+    srdf = rdf_sink(srdf_sink)
 
     #   Update some things.  This never goes well
     #   First.  The vivo entity has to have a key value 'uri'
@@ -1045,90 +3872,814 @@ def update_person(vivo_person, source_person):
 
     [add, sub] = update_entity(vivo_person, source_person, \
                                direct_key_table)
-    ardf = ardf + add
-    srdf = srdf + sub
+    ardf.write(add)
+    srdf.write(sub)
 
     #   Update vcard and its assertions
 
     vivo_vcard = vivo_person['vcard']
     source_vcard = {'name':{}}
     source_vcard['person_uri'] = person_uri
-    for key in vcard_names:
+    for key in VCARD_NAMES:
         if key in source_person:
             source_vcard['name'][key] = source_person[key]
-    for key in vcard_flat:
+    for key in VCARD_FLAT:
         if key in source_person:
             source_vcard[key] = source_person[key]
 
-    print "VIVO Vcard:\n",json.dumps(vivo_vcard, indent=4)
-    print "Source Vcard:\n",json.dumps(source_vcard, indent=4)
+    if debug or instrumentation is not None:
+        trace('update_person', debug, "VIVO Vcard:\n",
+              json.dumps(vivo_vcard, indent=4, default=str))
+        trace('update_person', debug, "Source Vcard:\n",
+              json.dumps(source_vcard, indent=4, default=str))
     
-    [add, sub] = update_vcard(vivo_vcard, source_vcard)
-    ardf = ardf + add
-    srdf = srdf + sub
+    [ardf, srdf] = update_vcard(vivo_vcard, source_vcard, ardf, srdf)
 
     #   Update position.  Examine each position.  If you find a match on
     #   department and title, update it.  Otherwise add it.
 
     source_position = {}
-    for key in position_keys:
+    for key in POSITION_KEYS:
         source_position[key] = source_person[key]
     source_position['person_uri'] = person_uri
     position_uris = get_position_uris(person_uri)
     updated = False
     for position_uri in position_uris:
         vivo_position = get_position(position_uri)
-        print "\nVIVO position",vivo_position
-        print "\nSource position",source_position
+        vivo_position['uri'] = position_uri
+        trace('update_person', debug, "\nVIVO position", vivo_position)
+        trace('update_person', debug, "\nSource position", source_position)
         if vivo_position.get('position_type',None) == \
            source_position.get('position_type',None) \
             and vivo_position.get('position_orguri',None) == \
             source_position.get('position_orguri',None):
-            [add, sub] = update_position(vivo_position, source_position)
+            [ardf, srdf] = update_position(vivo_position, source_position,
+                                           ardf, srdf)
             updated = True
-            ardf = ardf + add
-            srdf = srdf + sub
             continue
     if updated == False:
-        [add, sub] = add_position(person_uri, source_position)
-        ardf = ardf + add
-        srdf = srdf + sub
+        [ardf, position_uri] = add_position(person_uri, source_position, ardf)
     
-    return [ardf, srdf]
+    return [rdf_result(ardf_sink, ardf), rdf_result(srdf_sink, srdf)]
+
+def update_people(pairs, workers=8, mode='thread', ardf_sink=None,
+                  srdf_sink=None, debug=False, fingerprints=None,
+                  canonical=False):
+    """
+    Given a list of (vivo_person, source_person) pairs, generate the ADD and
+    SUB RDF to update each VIVO person from its source, as update_person
+    does.  vivo_person may be a structure returned by get_person, or the URI
+    of the person, in which case the person is read by the worker.
 
-def make_ufid_dictionary(debug=False):
+    The pairs are spread over workers threads (mode='thread') or processes
+    (mode='process').  The rdf is merged in the order of the pairs, so the
+    result does not depend on the number of workers.  A person that fails
+    does not stop the batch.  Returns [ardf, srdf, errors] where errors is a
+    list of dictionaries with the index and person_uri of each pair that
+    failed and the error.  If ardf_sink and srdf_sink are given, the rdf is
+    written to them as each person is finished and the sinks are returned
+    in place of the rdf.
+
+    If fingerprints is a FingerprintStore, people whose source has not
+    changed since the fingerprints were last committed are skipped without
+    reading VIVO.  The fingerprints of the people updated are staged in the
+    store.  Commit them once the rdf has been loaded into VIVO.
+
+    If canonical is True, the rdf of each person is put through
+    canonical_rdf, so it is written as sorted N-Triples
+    """
+    if mode not in ['thread', 'process']:
+        raise ValueError("mode must be 'thread' or 'process', not " +
+                         repr(mode))
+    ardf = rdf_sink(ardf_sink)
+    srdf = rdf_sink(srdf_sink)
+    errors = []
+    jobs = []
+    staged = {}
+    for i, (vivo_person, source_person) in enumerate(pairs):
+        if fingerprints is not None and 'ufid' in source_person:
+            fingerprint = source_fingerprint(source_person)
+            if fingerprints.get(source_person['ufid']) == fingerprint:
+                continue
+            staged[i] = (source_person['ufid'], fingerprint)
+        jobs.append((i, vivo_person, source_person, debug, canonical))
+    pool = None
+    if workers > 1 and len(jobs) > 1:
+        if mode == 'thread':
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(min(workers, len(jobs)))
+        else:
+            from multiprocessing import Pool
+            from multiprocessing import Value
+            processes = min(workers, len(jobs))
+            pool = Pool(processes, update_people_init,
+                        (Value('i', 0), processes))
+        results = pool.imap(update_people_job, jobs)
+    else:
+        results = (update_people_job(job) for job in jobs)
+    try:
+        for [i, person_uri, add, sub, error, issued] in results:
+            if len(issued) > 0 and uri_allocator is not None:
+                uri_allocator.merge(issued)
+            if error is not None:
+                errors.append({'index': i, 'person_uri': person_uri,
+                               'error': error})
+                continue
+            ardf.write(add)
+            srdf.write(sub)
+            if i in staged:
+                fingerprints.stage(*staged[i])
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return [rdf_result(ardf_sink, ardf), rdf_result(srdf_sink, srdf), errors]
+
+def update_people_job(job):
+    """
+    Update one person for update_people.  Returns [index, person_uri, ardf,
+    srdf, error, issued].  error is None, or the traceback of the failure.
+    issued is the list of uris a worker process handed out, for the
+    allocator of update_people
+    """
+    import traceback
+    (i, vivo_person, source_person, debug, canonical) = job
+    if isinstance(vivo_person, dict):
+        person_uri = vivo_person.get('person_uri')
+    else:
+        person_uri = vivo_person
+    try:
+        if not isinstance(vivo_person, dict):
+            vivo_person = get_person(person_uri)
+        [add, sub] = update_person(vivo_person, source_person, debug=debug)
+        if canonical:
+            [add, sub] = canonical_rdf(add, sub)
+        result = [i, person_uri, add, sub, None]
+    except Exception:
+        result = [i, person_uri, "", "", traceback.format_exc()]
+    allocator = uri_allocator
+    if allocator is None:
+        return result + [[]]
+    return result + [allocator.drain()]
+
+def update_people_init(counter=None, processes=1):
+    """
+    Start an update_people worker process.  Threads do not survive the
+    fork, so the process starts with dereferencing and async pools of its
+    own.  If a URIAllocator is in use, the process takes the next of
+    processes stripes of it, counting with counter
+    """
+    global deref_pool, deref_lock, deref_slots, async_pool
+    deref_pool = None
+    async_pool = None
+    deref_lock = threading.Lock()
+    deref_slots = threading.BoundedSemaphore(deref_connections)
+    if uri_allocator is not None and counter is not None:
+        with counter.get_lock():
+            stripe = counter.value
+            counter.value = counter.value + 1
+        uri_allocator.fork(stripe, processes)
+
+def fingerprint_value(value):
+    """
+    Return a value of a source person that json can not serialize, such as
+    a datetime, as a string for source_fingerprint
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return unicode(value)
+
+def source_fingerprint(source_person):
+    """
+    Given a source person, return a stable hash of the values used by
+    update_person.  Two sources with the same fingerprint produce the same
+    update.  date_harvested is left out, since it changes on every run
+    """
+    import json
+    import hashlib
+    keys = ['hr_position'] + PERSON_KEY_TABLE.keys() + VCARD_NAMES + \
+        VCARD_FLAT + POSITION_KEYS
+    record = {}
+    for key in keys:
+        if key in source_person and key != 'date_harvested':
+            record[key] = source_person[key]
+    text = json.dumps(record, sort_keys=True, default=fingerprint_value)
+    return hashlib.sha1(text).hexdigest()
+
+class FingerprintStore(object):
+    """
+    A persistent store of source fingerprints of people.  Key is UFID.
+    Value is the source_fingerprint of the person at the last successful
+    update.
+
+    The store is kept in a SQLite file.  Fingerprints are first staged and
+    only written by commit(), so a run that fails before its rdf is loaded
+    into VIVO leaves the store as it was and the people are updated again
+    by the next run.  Changes made to VIVO by other means are not seen by
+    the store.  Use a new store, or forget the people, to update them
+    anyway
+    """
+    def __init__(self, filename='fingerprints.db'):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS fingerprint
+            (ufid TEXT PRIMARY KEY, fingerprint TEXT)""")
+        self.connection.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM fingerprint").fetchone()[0]
+
+    def get(self, ufid, default=None):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT fingerprint FROM fingerprint WHERE ufid = ?",
+                (ufid,)).fetchone()
+        if row is None:
+            return default
+        return row[0]
+
+    def changed(self, source_person):
+        """
+        Return True if the source person is not in the store, or has
+        changed since its fingerprint was committed
+        """
+        return self.get(source_person['ufid']) != \
+            source_fingerprint(source_person)
+
+    def stage(self, ufid, fingerprint):
+        """
+        Stage the fingerprint of a person.  It is written by commit()
+        """
+        with self.lock:
+            self.pending[ufid] = fingerprint
+
+    def commit(self):
+        """
+        Write the staged fingerprints to the store.  Return the number
+        written
+        """
+        with self.lock:
+            rows = self.pending.items()
+            self.connection.executemany("""INSERT OR REPLACE INTO fingerprint
+                (ufid, fingerprint) VALUES (?, ?)""", rows)
+            self.connection.commit()
+            self.pending = {}
+        return len(rows)
+
+    def rollback(self):
+        """
+        Drop the staged fingerprints
+        """
+        with self.lock:
+            self.pending = {}
+
+    def forget(self, ufids):
+        """
+        Remove people from the store, so they are updated by the next run
+        """
+        with self.lock:
+            self.connection.executemany(
+                "DELETE FROM fingerprint WHERE ufid = ?",
+                [(ufid,) for ufid in ufids])
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+# HR deltas.  The source of update_person is a nightly HR extract, one
+# flat record per person.  hr_deltas compares two extracts, keyed by UFID,
+# and yields only the people inserted, changed and removed.  Each extract
+# is first split, by a hash of the key, into partition files on disk, so
+# only one partition of each extract is in memory at a time, however large
+# the extracts are.  apply_hr_deltas then reads VIVO for just those people
+
+HR_DELTA_IGNORE = ['date_harvested']
+
+def hr_key(value):
+    """
+    Return the key value of an HR record as compared by hr_deltas:  the
+    value as stripped unicode, so that a UFID read as a number matches the
+    same UFID read as a string.  None if there is no value
+    """
+    if value is None:
+        return None
+    value = unicode(value).strip()
+    if value == u'':
+        return None
+    return value
+
+def hr_partition(records, directory, name, partitions, key):
+    """
+    Write each record, with the hr_key of its key, to the partition file
+    for the hash of the hr_key.  Return the list of partition filenames.
+    Records with no key are left out
+    """
+    import cPickle
+    import os
+    import zlib
+    filenames = [os.path.join(directory, name + '.' + str(k))
+                 for k in range(partitions)]
+    partition_files = [open(filename, 'wb') for filename in filenames]
+    try:
+        for record in records:
+            value = hr_key(record.get(key, None))
+            if value is None:
+                continue
+            k = (zlib.crc32(value.encode('utf-8')) & 0xffffffff) % \
+                partitions
+            cPickle.dump([value, record], partition_files[k], 2)
+    finally:
+        for partition_file in partition_files:
+            partition_file.close()
+    return filenames
+
+def hr_partition_records(filename, key):
+    """
+    Read a partition file written by hr_partition.  Return a dictionary of
+    its records keyed by the hr_key of key, and the list of hr_keys in the
+    order first written.  A key written twice keeps its last record
+    """
+    import cPickle
+    records = {}
+    order = []
+    partition_file = open(filename, 'rb')
+    try:
+        while True:
+            try:
+                [value, record] = cPickle.load(partition_file)
+            except EOFError:
+                break
+            if value not in records:
+                order.append(value)
+            records[value] = record
+    finally:
+        partition_file.close()
+    return [records, order]
+
+def hr_changed_fields(old, new, ignore=HR_DELTA_IGNORE):
+    """
+    Return the sorted list of the fields of two records whose values
+    differ.  Fields in ignore are not compared
+    """
+    return sorted([field for field in set(old.keys()) | set(new.keys())
+                   if field not in ignore and
+                   old.get(field, None) != new.get(field, None)])
+
+def hr_deltas(yesterday, today, key='ufid', partitions=64, directory=None,
+              ignore=HR_DELTA_IGNORE):
+    """
+    Given yesterday's and today's HR extracts, each an iterable of source
+    person dictionaries such as update_person takes, yield a delta for each
+    person inserted, changed or removed.  A delta is a dictionary with the
+    action ('insert', 'change' or 'remove'), the key, as returned by
+    hr_key, the old and new records (None if there is none) and the sorted
+    list of the fields that changed.  People whose fields, other than those
+    in ignore, are the same in both extracts are not yielded.  The key
+    field of a person in both is compared by its hr_key.
+
+    The partition files are written in a temporary directory in directory,
+    and removed when the deltas have been read
+    """
+    import shutil
+    import tempfile
+    change_ignore = list(ignore) + [key]
+    work = tempfile.mkdtemp(prefix='hr_deltas', dir=directory)
+    try:
+        old_filenames = hr_partition(yesterday, work, 'yesterday',
+                                     partitions, key)
+        new_filenames = hr_partition(today, work, 'today', partitions, key)
+        for (old_filename, new_filename) in zip(old_filenames,
+                                                new_filenames):
+            [old_records, old_order] = hr_partition_records(old_filename,
+                                                            key)
+            [new_records, new_order] = hr_partition_records(new_filename,
+                                                            key)
+            for value in new_order:
+                new = new_records[value]
+                old = old_records.pop(value, None)
+                if old is None:
+                    yield {'action': 'insert', 'key': value, 'old': None,
+                           'new': new, 'fields': hr_changed_fields({}, new,
+                                                                   ignore)}
+                    continue
+                fields = hr_changed_fields(old, new, change_ignore)
+                if len(fields) > 0:
+                    yield {'action': 'change', 'key': value, 'old': old,
+                           'new': new, 'fields': fields}
+            for value in old_order:
+                if value in old_records:
+                    old = old_records[value]
+                    yield {'action': 'remove', 'key': value, 'old': old,
+                           'new': None, 'fields': hr_changed_fields(old, {},
+                                                                    ignore)}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def apply_hr_deltas(deltas, ufid_dictionary, workers=8, mode='thread',
+                    ardf_sink=None, srdf_sink=None, fingerprints=None):
+    """
+    Given deltas from hr_deltas, keyed by UFID, and the dictionary returned
+    by make_ufid_dictionary or a UfidIndex, generate the ADD and SUB RDF
+    for the people who changed.  People inserted or changed who are in VIVO
+    are read and updated by update_people.  People not in VIVO are added by
+    add_person.  Removed people are not changed in VIVO, since what leaving
+    the HR extract means for a person in VIVO is for the caller to decide.
+
+    Returns [ardf, srdf, removed, errors].  removed is the list of remove
+    deltas.  errors is as returned by update_people, with index the number
+    of the delta.  If ardf_sink and srdf_sink are given, the rdf is written
+    to them and the sinks are returned in place of the rdf
+    """
+    import traceback
+    ardf = rdf_sink(ardf_sink)
+    srdf = rdf_sink(srdf_sink)
+    pairs = []
+    pair_deltas = []
+    removed = []
+    errors = []
+    for i, delta in enumerate(deltas):
+        if delta['action'] == 'remove':
+            removed.append(delta)
+            continue
+        [found, person_uri] = find_person(delta['key'], ufid_dictionary)
+        if found:
+            pairs.append((person_uri, delta['new']))
+            pair_deltas.append(i)
+            continue
+        try:
+            [add, person_uri] = add_person(delta['new'])
+            ardf.write(add)
+        except Exception:
+            errors.append({'index': i, 'person_uri': None,
+                           'error': traceback.format_exc()})
+    [ardf, srdf, update_errors] = update_people(pairs, workers, mode, ardf,
+                                                srdf, fingerprints=fingerprints)
+    for error in update_errors:
+        error['index'] = pair_deltas[error['index']]
+    errors = sorted(errors + update_errors, key=lambda x: x['index'])
+    return [rdf_result(ardf_sink, ardf), rdf_result(srdf_sink, srdf),
+            removed, errors]
+
+# Loading into VIVO.  The add_ and update_ functions write RDF as a series
+# of rdf:Description elements.  A SparqlUpdateLoader turns ADD and SUB RDF
+# into SPARQL UPDATE requests of bounded size and sends them to the VIVO
+# SPARQL update API, several at a time.
+
+VIVO_GRAPH = "http://vitro.mannlib.cornell.edu/default/vitro-kb-2"
+
+NAMESPACES = {
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'rdfs': 'http://www.w3.org/2000/01/rdf-schema#',
+    'xsd': 'http://www.w3.org/2001/XMLSchema#',
+    'owl': 'http://www.w3.org/2002/07/owl#',
+    'vitro': 'http://vitro.mannlib.cornell.edu/ns/vitro/0.7#',
+    'vivo': 'http://vivoweb.org/ontology/core#',
+    'core': 'http://vivoweb.org/ontology/core#',
+    'foaf': 'http://xmlns.com/foaf/0.1/',
+    'obo': 'http://purl.obolibrary.org/obo/',
+    'vcard': 'http://www.w3.org/2006/vcard/ns#',
+    'bibo': 'http://purl.org/ontology/bibo/',
+    'skos': 'http://www.w3.org/2004/02/skos/core#',
+    'dcterms': 'http://purl.org/dc/terms/',
+    'event': 'http://purl.org/NET/c4dm/event.owl#',
+    'geo': 'http://aims.fao.org/aos/geopolitical.owl#',
+    'vitro-public': 'http://vitro.mannlib.cornell.edu/ns/vitro/public#',
+    'ufv': 'http://vivo.ufl.edu/ontology/vivo-ufl/',
+    'ufVivo': 'http://vivo.ufl.edu/ontology/vivo-ufl/'
+    }
+
+def ntriples_literal(value, datatype=None, language=None):
+    """
+    Return value as a literal in N-Triples and SPARQL form
+    """
+    value = value.replace('\\', '\\\\').replace('"', '\\"')\
+        .replace('\n', '\\n').replace('\r', '\\r')
+    literal = u'"' + value + u'"'
+    if datatype is not None:
+        literal = literal + u'^^<' + datatype + u'>'
+    elif language is not None:
+        literal = literal + u'@' + language
+    return literal
+
+def rdf_triples(rdf):
+    """
+    Given RDF as written by the add_ and update_ functions, a series of
+    rdf:Description elements using the prefixes of NAMESPACES, or N-Triples
+    as written by canonical_rdf, return a list of (subject, predicate,
+    object) triples.  Subject and predicate are uris.  The object is in
+    N-Triples form
+    """
+    import xml.etree.ElementTree as ET
+    text = rdf.lstrip()
+    if text != "" and not text.startswith('<rdf:'):
+        return ntriples_triples(rdf)
+    if isinstance(rdf, unicode):
+        rdf = rdf.encode('utf-8')
+    root = '<rdf:RDF' + "".join([' xmlns:' + prefix + '="' + uri + '"'
+        for prefix, uri in sorted(NAMESPACES.items())]) + '>'
+    try:
+        root = ET.fromstring(root + rdf + '</rdf:RDF>')
+    except ET.ParseError, error:
+        raise ValueError("RDF can not be read: " + str(error))
+    rdf_ns = '{' + NAMESPACES['rdf'] + '}'
+    xml_lang = '{http://www.w3.org/XML/1998/namespace}lang'
+    triples = []
+    for description in root:
+        subject = description.get(rdf_ns + 'about')
+        for element in description:
+            predicate = element.tag[1:].replace('}', '', 1)
+            resource = element.get(rdf_ns + 'resource')
+            if resource is not None:
+                o = u'<' + resource + u'>'
+            else:
+                o = ntriples_literal(element.text or u'',
+                    element.get(rdf_ns + 'datatype'), element.get(xml_lang))
+            triples.append((subject, predicate, o))
+    return triples
+
+def ntriples_triples(rdf):
+    """
+    Given N-Triples, return a list of (subject, predicate, object) triples
+    as returned by rdf_triples
+    """
+    if not isinstance(rdf, unicode):
+        rdf = rdf.decode('utf-8')
+    triples = []
+    for line in rdf.splitlines():
+        line = line.strip()
+        if line == "" or line.startswith('#'):
+            continue
+        match = NTRIPLE.match(line)
+        if match is None or not match.group(1).startswith('<'):
+            raise ValueError("Not an N-Triples line with a uri subject: " +
+                             line)
+        triples.append((match.group(1)[1:-1], match.group(2),
+                        match.group(3)))
+    return triples
+
+def ntriples(triples):
+    """
+    Given a list of triples from rdf_triples, return them as N-Triples
+    """
+    return u"".join([u'<' + s + u'> <' + p + u'> ' + o + u' .\n'
+                     for (s, p, o) in triples])
+
+def canonical_triples(ardf, srdf=""):
+    """
+    Given ADD rdf ardf and SUB rdf srdf, return [add_triples, sub_triples],
+    each a sorted list of distinct triples.  A triple in both is in
+    neither, since removing it and adding it again leaves VIVO as it was
+    """
+    add = set(rdf_triples(ardf))
+    sub = set(rdf_triples(srdf))
+    both = add & sub
+    return [sorted(add - both), sorted(sub - both)]
+
+def canonical_rdf(ardf, srdf=""):
+    """
+    Given ADD rdf ardf and SUB rdf srdf, return [ardf, srdf] as sorted
+    N-Triples with duplicates and triples in both removed.  The same update
+    always gives the same text, so runs can be compared with diff
+    """
+    [add, sub] = canonical_triples(ardf, srdf)
+    return [ntriples(add), ntriples(sub)]
+
+def sparql_update(sub_triples, add_triples, graph=VIVO_GRAPH):
+    """
+    Given lists of triples from rdf_triples, return a SPARQL UPDATE that
+    removes the sub triples from graph, then adds the add triples
+    """
+    update = []
+    for (operation, triples) in [('DELETE', sub_triples),
+                                 ('INSERT', add_triples)]:
+        if len(triples) > 0:
+            update.append(operation + ' DATA { GRAPH <' + graph + '> {\n' +
+                ntriples(triples) + '} }')
+    return " ;\n".join(update)
+
+class SparqlUpdateLoader(object):
+    """
+    Load ADD and SUB RDF into VIVO through its SPARQL update API, for
+    example
+
+        loader = SparqlUpdateLoader('https://vivo.ufl.edu/api/sparqlUpdate',
+                                    email, password)
+        result = loader.load(ardf, srdf)
+
+    The triples are grouped by subject and the subjects split into chunks
+    of about chunk_size triples.  Each chunk is one request that removes
+    the SUB triples of its subjects, then adds their ADD triples, so no
+    chunk depends on another.  Chunks are sent by workers threads, each
+    keeping its connection to VIVO open from load to load until close().
+    A chunk that fails is tried again up to retries times, waiting backoff
+    seconds, then twice as long, and so on.  Chunks that still fail are
+    reported by load and the rest are loaded
+    """
+    def __init__(self, url, email=None, password=None, graph=VIVO_GRAPH,
+                 chunk_size=1000, workers=4, retries=3, backoff=1.0,
+                 timeout=300):
+        from urlparse import urlparse
+        self.url = url
+        self.parts = urlparse(url)
+        self.email = email
+        self.password = password
+        self.graph = graph
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.pool = None
+
+    def chunks(self, ardf, srdf=""):
+        """
+        Return the list of chunks for ADD rdf ardf and SUB rdf srdf.  Each
+        chunk is [subjects, sub_triples, add_triples].  The triples are
+        those of canonical_triples
+        """
+        triples_for = {}
+        subjects = []
+        [add_triples, sub_triples] = canonical_triples(ardf, srdf)
+        for (k, triples) in [(0, sub_triples), (1, add_triples)]:
+            for triple in triples:
+                if triple[0] not in triples_for:
+                    triples_for[triple[0]] = [[], []]
+                    subjects.append(triple[0])
+                triples_for[triple[0]][k].append(triple)
+        chunks = []
+        chunk = [[], [], []]
+        for subject in subjects:
+            [sub, add] = triples_for[subject]
+            if len(chunk[0]) > 0 and len(chunk[1]) + len(chunk[2]) + \
+                len(sub) + len(add) > self.chunk_size:
+                chunks.append(chunk)
+                chunk = [[], [], []]
+            chunk[0].append(subject)
+            chunk[1].extend(sub)
+            chunk[2].extend(add)
+        if len(chunk[0]) > 0:
+            chunks.append(chunk)
+        return chunks
+
+    def load(self, ardf, srdf=""):
+        """
+        Load ADD rdf ardf and SUB rdf srdf into VIVO.  Return a dictionary
+        with the number of chunks, the number of triples loaded and a list
+        of the chunks that failed, each with its subjects and error.  The
+        subjects loaded are dropped from the triple cache
+        """
+        from multiprocessing.pool import ThreadPool
+        chunks = self.chunks(ardf, srdf)
+        if len(chunks) > 1 and self.workers > 1:
+            if self.pool is None:
+                self.pool = ThreadPool(self.workers)
+            errors = self.pool.map(self.send, chunks)
+        else:
+            errors = [self.send(chunk) for chunk in chunks]
+        result = {'chunks': len(chunks), 'triples': 0, 'failed': []}
+        loaded = []
+        for ([subjects, sub, add], error) in zip(chunks, errors):
+            if error is None:
+                result['triples'] = result['triples'] + len(sub) + len(add)
+                loaded.extend(subjects)
+            else:
+                result['failed'].append({'subjects': subjects,
+                                         'error': error})
+        invalidate_triple_cache(loaded)
+        return result
+
+    def send(self, chunk):
+        """
+        Send one chunk to VIVO.  Return None, or the error if every try
+        failed
+        """
+        import time
+        [subjects, sub, add] = chunk
+        update = sparql_update(sub, add, self.graph)
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            [retry, error] = self.post(update)
+            if error is None or not retry:
+                break
+        return error
+
+    def post(self, update):
+        """
+        Post a SPARQL UPDATE to VIVO on this thread's connection.  Return
+        [retry, error].  error is None if VIVO accepted the update.  retry
+        is True if the update may succeed if sent again
+        """
+        import httplib
+        import socket
+        import urllib
+        form = {'update': update.encode('utf-8')}
+        if self.email is not None:
+            form['email'] = self.email
+            form['password'] = self.password
+        body = urllib.urlencode(form)
+        path = self.parts.path
+        if self.parts.query:
+            path = path + '?' + self.parts.query
+        connection = self.connection()
+        try:
+            connection.request('POST', path, body,
+                {'Content-Type': 'application/x-www-form-urlencoded',
+                 'Connection': 'keep-alive'})
+            response = connection.getresponse()
+            text = response.read()
+        except (httplib.HTTPException, socket.error), error:
+            self.drop(connection)
+            return [True, repr(error)]
+        if response.will_close:
+            self.drop(connection)
+        if response.status >= 500:
+            return [True, str(response.status) + " " + text]
+        if response.status >= 300:
+            return [False, str(response.status) + " " + text]
+        return [False, None]
+
+    def close(self):
+        """
+        Stop the worker threads and close every thread's connection
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        with self.lock:
+            connections = self.connections
+            self.connections = set()
+        for connection in connections:
+            connection.close()
+        self.local = threading.local()
+
+    def connection(self):
+        """
+        Return this thread's connection to VIVO, opening it if need be
+        """
+        import httplib
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            if self.parts.scheme == 'https':
+                connection = httplib.HTTPSConnection(self.parts.netloc,
+                    timeout=self.timeout)
+            else:
+                connection = httplib.HTTPConnection(self.parts.netloc,
+                    timeout=self.timeout)
+            self.local.connection = connection
+            with self.lock:
+                self.connections.add(connection)
+        return connection
+
+    def drop(self, connection):
+        """
+        Close this thread's connection, to open a new one on next use
+        """
+        connection.close()
+        self.local.connection = None
+        with self.lock:
+            self.connections.discard(connection)
+
+def make_ufid_dictionary(debug=False, page_size=10000):
     """
     Make a dictionary for people in UF VIVO.  Key is UFID.  Value is URI.
+
+    The UFIDs are read page_size at a time, so the full query result is
+    never held in memory
     """
-    from vivofoundation import vivo_sparql_query
     query = """
     SELECT ?x ?ufid WHERE
     {
     ?x ufVivo:ufid ?ufid .
-    }"""
-    result = vivo_sparql_query(query)
-    try:
-        count = len(result["results"]["bindings"])
-    except:
-        count = 0
-    if debug:
-        print query, count, result["results"]["bindings"][0], \
-            result["results"]["bindings"][1]
-    #
+    }
+    ORDER BY ?x ?ufid"""
     ufid_dictionary = {}
-    i = 0
-    while i < count:
-        b = result["results"]["bindings"][i]
+    first = []
+    for b in sparql_bindings(query, page_size):
         ufid = b['ufid']['value']
         uri = b['x']['value']
         ufid_dictionary[ufid] = uri
-        i = i + 1
+        if len(first) < 2:
+            first.append(b)
+    trace('make_ufid_dictionary', debug, query, len(ufid_dictionary), first)
     return ufid_dictionary
 
 def find_person(ufid, ufid_dictionary):
     """
     Given a UFID, and a dictionary, find the person with that UFID.  Return True
     and URI if found. Return False and None if not found
+
+    The dictionary may be the one returned by make_ufid_dictionary or a
+    UfidIndex
     """
     try:
         uri = ufid_dictionary[ufid]
@@ -1137,3 +4688,152 @@ def find_person(ufid, ufid_dictionary):
         uri = None
         found = False
     return [found, uri]
+
+class UfidIndex(object):
+    """
+    A persistent index of people in UF VIVO.  Key is UFID.  Value is URI.
+
+    The index is kept in a SQLite file, so opening it at startup is
+    immediate regardless of the number of people.  refresh() brings the
+    index up to date.  The first refresh, or a refresh with full=True,
+    reads every UFID in VIVO.  Later refreshes read only the people
+    harvested since the last refresh, using ufVivo:dateHarvested.  People
+    removed from VIVO are only dropped by a full refresh.
+
+    The index can be used wherever a ufid dictionary is used, for example
+    find_person(ufid, UfidIndex('ufid_index.db'))
+    """
+    def __init__(self, filename='ufid_index.db'):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS ufid
+            (ufid TEXT PRIMARY KEY, uri TEXT)""")
+        self.connection.execute("""CREATE INDEX IF NOT EXISTS ufid_uri
+            ON ufid (uri)""")
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS meta
+            (key TEXT PRIMARY KEY, value TEXT)""")
+        self.connection.commit()
+
+    def __getitem__(self, ufid):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT uri FROM ufid WHERE ufid = ?", (ufid,)).fetchone()
+        if row is None:
+            raise KeyError(ufid)
+        return row[0]
+
+    def __contains__(self, ufid):
+        return self.get(ufid) is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM ufid").fetchone()[0]
+
+    def get(self, ufid, default=None):
+        try:
+            return self[ufid]
+        except KeyError:
+            return default
+
+    def keys(self):
+        with self.lock:
+            return [row[0] for row in
+                    self.connection.execute("SELECT ufid FROM ufid")]
+
+    def harvested_since(self):
+        """
+        Return the latest dateHarvested seen by a refresh, or None if the
+        index has never been refreshed
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM meta WHERE key = 'harvested_since'")\
+                .fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def refresh(self, full=False, debug=False, page_size=10000):
+        """
+        Bring the index up to date with VIVO.  Return the number of
+        people read from VIVO.  People are read page_size at a time into a
+        staging table, and the index is changed in one transaction after
+        the last page, so readers see the old index until then.  If the
+        refresh fails, the index and its harvest date are left as they
+        were.  If no harvest date is known, the index is rebuilt, so
+        people removed from VIVO are removed from the index
+        """
+        since = self.harvested_since()
+        if since is None:
+            full = True
+        if full:
+            query = """
+            SELECT ?x ?ufid ?date_harvested WHERE
+            {
+            ?x ufVivo:ufid ?ufid .
+            OPTIONAL { ?x ufVivo:dateHarvested ?date_harvested . }
+            }
+            ORDER BY ?x ?ufid ?date_harvested"""
+        else:
+            query = """
+            SELECT ?x ?ufid ?date_harvested WHERE
+            {
+            ?x ufVivo:ufid ?ufid .
+            ?x ufVivo:dateHarvested ?date_harvested .
+            FILTER (str(?date_harvested) >= "harvested_since")
+            }
+            ORDER BY ?x ?ufid ?date_harvested"""
+            query = query.replace('harvested_since', since)
+        with self.lock:
+            self.connection.execute("DROP TABLE IF EXISTS ufid_refresh")
+            self.connection.execute("""CREATE TEMP TABLE ufid_refresh
+                (ufid TEXT PRIMARY KEY, uri TEXT)""")
+        try:
+            count = 0
+            rows = []
+            for b in sparql_bindings(query, page_size):
+                rows.append((b['ufid']['value'], b['x']['value']))
+                if 'date_harvested' in b and \
+                    (since is None or b['date_harvested']['value'] > since):
+                    since = b['date_harvested']['value']
+                if len(rows) == page_size:
+                    count = count + self.store(rows)
+                    rows = []
+            count = count + self.store(rows)
+            with self.lock:
+                if full:
+                    self.connection.execute("DELETE FROM ufid")
+                else:
+                    self.connection.execute("""DELETE FROM ufid WHERE uri IN
+                        (SELECT uri FROM ufid_refresh)""")
+                self.connection.execute("""INSERT OR REPLACE INTO ufid
+                    (ufid, uri) SELECT ufid, uri FROM ufid_refresh""")
+                if since is not None:
+                    self.connection.execute("""INSERT OR REPLACE INTO meta
+                        (key, value) VALUES ('harvested_since', ?)""",
+                        (since,))
+                self.connection.commit()
+        except:
+            with self.lock:
+                self.connection.rollback()
+            raise
+        finally:
+            with self.lock:
+                self.connection.execute("DROP TABLE IF EXISTS ufid_refresh")
+        trace('UfidIndex.refresh', debug, query, count)
+        return count
+
+    def store(self, rows):
+        """
+        Stage a list of (ufid, uri) rows for the refresh in progress.
+        Return the number of rows
+        """
+        with self.lock:
+            self.connection.executemany("""INSERT OR REPLACE INTO
+                ufid_refresh (ufid, uri) VALUES (?, ?)""", rows)
+        return len(rows)
+
+    def close(self):
+        self.connection.close()